@@ -3,8 +3,35 @@ import pandas as pd
 import numpy as np
 import plotly.express as px
 import plotly.graph_objects as go
+import os
+import uuid
+import zlib
 from datetime import datetime, timedelta
-import yfinance as yf
+from market_data import MarketDataCache, YFinanceProvider
+from price_warehouse import PriceWarehouse
+from scheduler import RefreshScheduler, HISTORY_PARAMS
+from intents import IntentRouter, INTENTS, GLOSSARY, glossary_intents, load_glossary
+from assistant import LocalBackend
+from chat_history import ChatHistory, DEFAULT_VISIBLE, prune_spills
+from scenarios import (ScenarioEngine, ScenarioError, SecurityResolver, parse_scenario, describe_result, mentions_scenario,
+                       MARKET_PROXY)
+from projection import book_model, project
+from fetch import fetch_concurrently
+from revaluation import PositionBook
+from quotes import QuoteService
+from performance import PerformanceEngine, TIMERANGES, constant_quantities
+from risk import compute_risk_metrics
+from correlation import CorrelationService
+from ingest import import_csv, UnrecognizedStatementError
+from pdf_ingest import import_pdf
+from portfolio_store import PortfolioStore, COMBINED
+from search import SearchIndex, load_security_master
+from facets import FacetIndex, pack
+from downsample import CANDLE_POINT_BUDGET, downsample_line, resample_ohlc
+from views import (
+    ViewCache, HOLDINGS_COLUMN_CONFIG, DEFAULT_PAGE_SIZE, sorted_holdings, search_mask, format_holdings,
+    sort_index, page_count, page_rows
+)
 
 # Set page configuration
 st.set_page_config(
@@ -79,119 +106,417 @@ page = st.sidebar.radio(
     ["Dashboard", "Holdings", "Charts", "Stock Analysis", "AI Assistant", "Upload"]
 )
 
+live_prices = st.sidebar.checkbox("Live prices", value=False)
+
+PRICE_WAREHOUSE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "prices")
+
+# Market data cache shared by every session in this server process; daily and
+# coarser price history comes from the local warehouse, which only downloads new bars
+@st.cache_resource
+def get_market_data():
+    return MarketDataCache(provider=PriceWarehouse(PRICE_WAREHOUSE_DIR, YFinanceProvider()))
+
 # Mock data for demonstration
-def generate_mock_portfolio_data():
-    accounts = ["Schwab", "Interactive Brokers", "Robinhood", "Combined"]
-    
-    portfolio_data = {
-        "Schwab": {
-            "symbols": 12,
-            "cost_basis": 45000,
-            "market_value": 52000,
-            "day_change_pct": 1.2,
-            "unrealized_gain": 7000,
-            "realized_gain": 3500,
-            "holdings": [
-                {"ticker": "AAPL", "quantity": 25, "cost_basis": 3750, "market_value": 4385, "day_change_pct": 1.35, "total_gain_loss": 635},
-                {"ticker": "MSFT", "quantity": 15, "cost_basis": 4500, "market_value": 4878, "day_change_pct": 1.32, "total_gain_loss": 378},
-                {"ticker": "GOOGL", "quantity": 10, "cost_basis": 2800, "market_value": 2768, "day_change_pct": -0.86, "total_gain_loss": -32},
-                {"ticker": "AMZN", "quantity": 8, "cost_basis": 2400, "market_value": 2680, "day_change_pct": 0.95, "total_gain_loss": 280},
-                {"ticker": "TSLA", "quantity": 12, "cost_basis": 3000, "market_value": 2880, "day_change_pct": -1.25, "total_gain_loss": -120}
-            ]
-        },
-        "Interactive Brokers": {
-            "symbols": 8,
-            "cost_basis": 35000,
-            "market_value": 38500,
-            "day_change_pct": 0.8,
-            "unrealized_gain": 3500,
-            "realized_gain": 1800,
-            "holdings": [
-                {"ticker": "NVDA", "quantity": 20, "cost_basis": 5000, "market_value": 5800, "day_change_pct": 2.1, "total_gain_loss": 800},
-                {"ticker": "AMD", "quantity": 30, "cost_basis": 3600, "market_value": 3900, "day_change_pct": 1.5, "total_gain_loss": 300},
-                {"ticker": "INTC", "quantity": 40, "cost_basis": 2000, "market_value": 1920, "day_change_pct": -0.8, "total_gain_loss": -80},
-                {"ticker": "META", "quantity": 15, "cost_basis": 4500, "market_value": 4950, "day_change_pct": 1.2, "total_gain_loss": 450}
-            ]
-        },
-        "Robinhood": {
-            "symbols": 5,
-            "cost_basis": 10000,
-            "market_value": 10800,
-            "day_change_pct": 1.5,
-            "unrealized_gain": 800,
-            "realized_gain": 500,
-            "holdings": [
-                {"ticker": "DIS", "quantity": 15, "cost_basis": 2250, "market_value": 2400, "day_change_pct": 0.9, "total_gain_loss": 150},
-                {"ticker": "NFLX", "quantity": 5, "cost_basis": 2500, "market_value": 2650, "day_change_pct": 1.2, "total_gain_loss": 150},
-                {"ticker": "SBUX", "quantity": 20, "cost_basis": 1800, "market_value": 1880, "day_change_pct": 0.7, "total_gain_loss": 80}
-            ]
-        }
-    }
+MOCK_POSITIONS = {
+    "Schwab": [
+        {"ticker": "AAPL", "quantity": 25, "cost_basis": 3750},
+        {"ticker": "MSFT", "quantity": 15, "cost_basis": 4500},
+        {"ticker": "GOOGL", "quantity": 10, "cost_basis": 2800},
+        {"ticker": "AMZN", "quantity": 8, "cost_basis": 2400},
+        {"ticker": "TSLA", "quantity": 12, "cost_basis": 3000}
+    ],
+    "Interactive Brokers": [
+        {"ticker": "NVDA", "quantity": 20, "cost_basis": 5000},
+        {"ticker": "AMD", "quantity": 30, "cost_basis": 3600},
+        {"ticker": "INTC", "quantity": 40, "cost_basis": 2000},
+        {"ticker": "META", "quantity": 15, "cost_basis": 4500}
+    ],
+    "Robinhood": [
+        {"ticker": "DIS", "quantity": 15, "cost_basis": 2250},
+        {"ticker": "NFLX", "quantity": 5, "cost_basis": 2500},
+        {"ticker": "SBUX", "quantity": 20, "cost_basis": 1800}
+    ]
+}
+
+MOCK_REALIZED_GAINS = {"Schwab": 3500, "Interactive Brokers": 1800, "Robinhood": 500}
+
+# Mock (last price, day change %) per ticker
+MOCK_QUOTES = {
+    "AAPL": (175.40, 1.35), "MSFT": (325.20, 1.32), "GOOGL": (276.80, -0.86),
+    "AMZN": (335.00, 0.95), "TSLA": (240.00, -1.25), "NVDA": (290.00, 2.1),
+    "AMD": (130.00, 1.5), "INTC": (48.00, -0.8), "META": (330.00, 1.2),
+    "DIS": (160.00, 0.9), "NFLX": (530.00, 1.2), "SBUX": (94.00, 0.7)
+}
+
+def generate_mock_portfolio_data(quotes=None):
+    prices = {ticker: price for ticker, (price, _) in MOCK_QUOTES.items()}
+    previous_close = {ticker: price / (1 + change / 100) for ticker, (price, change) in MOCK_QUOTES.items()}
+    
+    # Live quotes override the mock ones where available
+    if quotes is not None:
+        prices.update(quotes["price"].dropna())
+        previous_close.update(quotes["previous_close"].dropna())
+    
+    # Revalue every account and the combined portfolio in one vectorized pass
+    book = PositionBook.from_positions(MOCK_POSITIONS)
+    return book.revalue(prices, previous_close).to_portfolio_data(MOCK_REALIZED_GAINS)
+
+PORTFOLIO_STORE_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "portfolios")
+
+# On-disk portfolio store shared by every session, seeded with the demo accounts on first run
+@st.cache_resource
+def get_portfolio_store():
+    store = PortfolioStore(PORTFOLIO_STORE_DIR)
+    if not store.accounts():
+        mock_data = generate_mock_portfolio_data()
+        store.save_accounts({
+            account: (mock_data[account]["holdings"], MOCK_REALIZED_GAINS[account]) for account in MOCK_POSITIONS
+        })
+    return store
+
+SECURITY_MASTER_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "security_master.csv")
+
+# Company names for the demo tickers and benchmark ETFs
+MOCK_COMPANY_NAMES = {
+    "AAPL": "Apple Inc.", "MSFT": "Microsoft Corporation", "GOOGL": "Alphabet Inc.",
+    "AMZN": "Amazon.com, Inc.", "TSLA": "Tesla, Inc.", "NVDA": "NVIDIA Corporation",
+    "AMD": "Advanced Micro Devices, Inc.", "INTC": "Intel Corporation", "META": "Meta Platforms, Inc.",
+    "DIS": "The Walt Disney Company", "NFLX": "Netflix, Inc.", "SBUX": "Starbucks Corporation",
+    "SPY": "SPDR S&P 500 ETF Trust", "QQQ": "Invesco QQQ Trust", "IWM": "iShares Russell 2000 ETF",
+    "DIA": "SPDR Dow Jones Industrial Average ETF Trust"
+}
+
+# Ticker to company name, from the security master file when one is installed
+@st.cache_resource
+def get_security_master():
+    return {**MOCK_COMPANY_NAMES, **load_security_master(SECURITY_MASTER_PATH)}
+
+# Ticker/name search index over the security master, shared by every session
+@st.cache_resource
+def get_search_index():
+    return SearchIndex({("ticker", ticker): (ticker, name) for ticker, name in get_security_master().items()})
+
+# Search index brought up to date with the held tickers and accounts; only new ones are indexed
+def get_holdings_search_index(holdings):
+    index = get_search_index()
+    names = get_security_master()
+    documents = {("ticker", ticker): (ticker, names.get(ticker, "")) for ticker in holdings["ticker"].unique()}
+    if "account" in holdings.columns:
+        documents.update({("account", account): (account,) for account in holdings["account"].unique()})
+    index.update(documents)
+    return index
+
+GLOSSARY_PATH = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "glossary.csv")
+
+# Intent router over the assistant's topics and the glossary, extended from the glossary file when one is installed
+@st.cache_resource
+def get_intent_router():
+    glossary = {**GLOSSARY, **load_glossary(GLOSSARY_PATH)}
+    return IntentRouter({**INTENTS, **glossary_intents(glossary)})
+
+CHAT_SPILL_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "data", "chat")
+CHAT_GREETING = "Hello! I'm your DAJANIII AI Assistant. I can help explain financial terms, suggest investment strategies, or answer questions about your portfolio. What would you like to know?"
+
+# Resolver of the tickers and company names in "what if" questions, held tickers first
+@st.cache_resource
+def get_security_resolver(held):
+    return SecurityResolver(get_security_master(), preferred=held)
+
+# Monte Carlo projection of the Combined book with a hypothetical trade or shock, or None for other
+# questions, which the intent router answers. Runs inside the reply stream, so questions without a
+# trade or move and a size are turned away before any holdings, names or prices are loaded.
+def answer_scenario(prompt):
+    if not mentions_scenario(prompt):
+        return None
+    holdings = get_portfolio_store().load_holdings(COMBINED)
+    scenario = parse_scenario(prompt, get_security_resolver(tuple(sorted(holdings["ticker"].unique()))))
+    if scenario is None:
+        return None
+    
+    tickers = sorted(set(holdings["ticker"]) | set(scenario.tickers()) | {MARKET_PROXY})
+    try:
+        result = ScenarioEngine(holdings, get_price_history(tickers)[0]).run(scenario)
+    except ScenarioError as e:
+        return f"I couldn't project that scenario. {e}"
+    return describe_result(scenario, result)
+
+# Backend generating the assistant's replies; the local stand-in answers "what if" questions
+# about the portfolio by simulation and everything else, including "what if" questions without
+# an amount, from the intent router, offline
+@st.cache_resource
+def get_assistant_backend():
+    return LocalBackend(get_intent_router(), handlers=[answer_scenario])
+
+# Holdings columns offered as filters on the Holdings page, when present
+HOLDINGS_FACETS = {"account": "Account", "sector": "Sector", "asset_class": "Asset Class", "currency": "Currency"}
+
+# Derived holdings views shared by every session in this server process
+@st.cache_resource
+def get_view_cache():
+    return ViewCache()
+
+# Portfolio data from the store, revalued against batched live quotes when enabled in the sidebar.
+# Returned with a data version that changes whenever the holdings or their prices do.
+def get_portfolio_data():
+    store = get_portfolio_store()
+    if not live_prices:
+        return store.load_portfolio_data(), ("stored", store.version)
+    
+    holdings = store.load_holdings(COMBINED)
+    
+    # Stored prices stand in for tickers without a live quote
+    by_ticker = holdings.groupby("ticker", sort=False)[["quantity", "market_value", "day_change_pct"]].first()
+    prices = (by_ticker["market_value"] / by_ticker["quantity"]).replace([np.inf, -np.inf], np.nan)
+    previous_close = prices / (1 + by_ticker["day_change_pct"] / 100)
+    
+    # Quotes are kept warm by the background refresher; rendering only reads them
+    scheduler = track_held_tickers()
+    quotes = QuoteService(get_market_data()).cached(list(by_ticker.index))
+    prices.update(quotes["price"].dropna())
+    previous_close.update(quotes["previous_close"].dropna())
+    if quotes["price"].isna().all():
+        if scheduler.failing("quote"):
+            st.warning("Live prices are currently unavailable. Showing last known prices.")
+        else:
+            st.info("Live prices are loading in the background. Showing last known prices.")
+    
+    book = PositionBook.from_frame(holdings)
+    version = ("live", store.version, hash((prices.to_numpy().tobytes(), previous_close.to_numpy().tobytes())))
+    return book.revalue(prices, previous_close).to_portfolio_data(store.realized_gains()), version
+
+# Memoized derived frame for the current portfolio and data version
+def get_view(version, view, account, filters, build):
+    return get_view_cache().get((PORTFOLIO_STORE_DIR, version, view, account, filters), build)
+
+# Total quantity per ticker held in an account, or across all accounts for Combined
+def get_quantities(account=COMBINED):
+    holdings = get_portfolio_store().load_holdings(account)
+    return holdings.groupby("ticker", sort=False)["quantity"].sum().to_dict()
+
+# Benchmark indices and the ETFs used to track them
+BENCHMARKS = {"S&P 500": "SPY", "NASDAQ": "QQQ", "Russell 2000": "IWM", "Dow Jones": "DIA"}
+
+# Background refresher of quotes, daily history and fundamentals, shared by every session
+@st.cache_resource
+def get_refresh_scheduler():
+    scheduler = RefreshScheduler(get_market_data(), benchmarks=list(BENCHMARKS.values()))
+    scheduler.start()
+    return scheduler
+
+# Refresher following the tickers currently held, plus the benchmarks
+def track_held_tickers():
+    scheduler = get_refresh_scheduler()
+    scheduler.set_universe(get_quantities())
+    return scheduler
+
+MOCK_INCEPTION = "2015-01-02"
+
+# Performance curves shared by every session in this server process
+@st.cache_resource
+def get_performance_engine():
+    return PerformanceEngine()
+
+# Trailing one-year correlation trackers shared by every session in this server process
+@st.cache_resource
+def get_correlation_service():
+    return CorrelationService(window=252)
+
+# Mock daily closes from a fixed inception, so each new day only appends a row
+@st.cache_data(ttl=3600)
+def generate_mock_price_history(tickers, as_of):
+    index = pd.bdate_range(MOCK_INCEPTION, as_of)
+    closes = {}
+    
+    # Every ticker loads on a common market factor so correlations and betas are realistic
+    market = np.random.default_rng(0).normal(0.0004, 0.01, len(index))
+    
+    for ticker in tickers:
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        beta, volatility = (rng.uniform(0.9, 1.1), 0.003) if ticker in BENCHMARKS.values() else (rng.uniform(0.7, 1.6), 0.015)
+        steps = beta * market + rng.normal(0.0002, volatility, len(index))
+        steps[0] = 0
+        start_price = MOCK_QUOTES.get(ticker, (100, 0))[0] / 3
+        closes[ticker] = start_price * np.exp(np.cumsum(steps))
+    
+    return pd.DataFrame(closes, index=index)
+
+# Daily closes for the given tickers and their source: "live" from Yahoo Finance when live prices
+# are enabled and the history has landed, otherwise "mock" for the simulated history. Views built
+# from the closes carry the source in their cache keys, so simulated stand-ins are not served as live.
+def get_price_history(tickers):
+    if live_prices:
+        # Daily history of the held tickers and benchmarks is kept warm by the background
+        # refresher; this only reads it, falling back to simulated history until it lands
+        scheduler = track_held_tickers()
+        results = get_market_data().peek_many("history", tickers, **HISTORY_PARAMS)
+        
+        if len(results) == len(tickers) and all(not results[ticker].empty for ticker in tickers):
+            closes = pd.DataFrame({
+                ticker: results[ticker]["Close"].set_axis(results[ticker].index.tz_localize(None).normalize())
+                for ticker in tickers
+            })
+            return closes.sort_index(), "live"
+        
+        if scheduler.failing("history"):
+            st.warning("Live price history is currently unavailable. Showing simulated history.")
+        else:
+            st.info("Live price history is loading in the background. Showing simulated history.")
     
-    # Create combined portfolio
-    combined_holdings = []
-    for account in ["Schwab", "Interactive Brokers", "Robinhood"]:
-        for holding in portfolio_data[account]["holdings"]:
-            holding_copy = holding.copy()
-            holding_copy["account"] = account
-            combined_holdings.append(holding_copy)
-    
-    portfolio_data["Combined"] = {
-        "symbols": sum(portfolio_data[account]["symbols"] for account in ["Schwab", "Interactive Brokers", "Robinhood"]),
-        "cost_basis": sum(portfolio_data[account]["cost_basis"] for account in ["Schwab", "Interactive Brokers", "Robinhood"]),
-        "market_value": sum(portfolio_data[account]["market_value"] for account in ["Schwab", "Interactive Brokers", "Robinhood"]),
-        "day_change_pct": 1.1,  # Average
-        "unrealized_gain": sum(portfolio_data[account]["unrealized_gain"] for account in ["Schwab", "Interactive Brokers", "Robinhood"]),
-        "realized_gain": sum(portfolio_data[account]["realized_gain"] for account in ["Schwab", "Interactive Brokers", "Robinhood"]),
-        "holdings": combined_holdings
-    }
+    return generate_mock_price_history(tuple(tickers), datetime.now().strftime("%Y-%m-%d")), "mock"
+
+# Indexed performance curves for an account and every benchmark, and the source of their history
+def get_performance_curves(timerange="1Y", account="Combined"):
+    quantities = get_quantities(account)
+    tickers = list(quantities)
+    closes, source = get_price_history(tickers + list(BENCHMARKS.values()))
+    
+    # Curves are extended incrementally, so reruns only process days not seen before;
+    # a new store version (an imported statement) starts the account's curve afresh
+    engine = get_performance_engine()
+    key = (source, account, get_portfolio_store().version)
+    engine.update(key, closes[tickers], constant_quantities(closes.index, quantities))
+    for symbol in BENCHMARKS.values():
+        engine.update((source, symbol), closes[[symbol]], constant_quantities(closes.index, {symbol: 1}))
+    
+    curves = {"Your Portfolio": engine.curve(key, timerange)}
+    for name, symbol in BENCHMARKS.items():
+        curves[name] = engine.curve((source, symbol), timerange)
+    
+    return pd.DataFrame(curves), source
+
+# Generate performance data for charts, with the source of their history
+def generate_performance_data(timerange="1Y", account="Combined"):
+    curves, source = get_performance_curves(timerange, account)
+    dates = curves.index.strftime("%Y-%m-%d")
     
-    return portfolio_data
+    return dates, curves["Your Portfolio"].to_numpy(), curves["S&P 500"].to_numpy(), curves["NASDAQ"].to_numpy(), source
+
+# Version of the performance curves behind a chart: their source, the stored holdings and the last day plotted
+def get_curves_version(source, dates):
+    return source, get_portfolio_store().version, dates[-1] if len(dates) else None
+
+# Memoized Plotly figure for a data version and chart options, shared by every session. Streamlit
+# serializes the figure on each render either way; reusing it skips building and validating the
+# traces. Cached figures are shared and must be treated as read-only.
+def get_figure(version, chart, options, build):
+    return get_view_cache().get((PORTFOLIO_STORE_DIR, version, "figure", chart, options), build)
 
-# Generate performance data for charts
-def generate_performance_data(timerange="1Y"):
-    dates = []
-    portfolio_values = []
-    spy_values = []
-    nasdaq_values = []
-    
-    if timerange == "5D":
-        start_date = datetime.now() - timedelta(days=5)
-        for i in range(5):
-            dates.append((start_date + timedelta(days=i)).strftime("%Y-%m-%d"))
-        portfolio_values = [100, 101.2, 100.8, 102.5, 103.7]
-        spy_values = [100, 100.5, 100.2, 101.3, 101.8]
-        nasdaq_values = [100, 101.8, 101.2, 103.1, 104.2]
-    elif timerange == "1M":
-        start_date = datetime.now() - timedelta(days=30)
-        for i in range(0, 30, 7):
-            dates.append((start_date + timedelta(days=i)).strftime("%Y-%m-%d"))
-        portfolio_values = [100, 103.5, 105.2, 108.7]
-        spy_values = [100, 101.8, 103.2, 104.5]
-        nasdaq_values = [100, 104.2, 106.5, 109.8]
-    elif timerange == "6M":
-        start_date = datetime.now() - timedelta(days=180)
-        for i in range(0, 180, 30):
-            dates.append((start_date + timedelta(days=i)).strftime("%Y-%m-%d"))
-        portfolio_values = [100, 105, 103, 107, 110, 115]
-        spy_values = [100, 102, 104, 103, 106, 108]
-        nasdaq_values = [100, 106, 104, 109, 112, 118]
-    elif timerange == "1Y":
-        start_date = datetime.now() - timedelta(days=365)
-        for i in range(0, 365, 30):
-            dates.append((start_date + timedelta(days=i)).strftime("%Y-%m-%d"))
-        portfolio_values = [100, 103, 107, 110, 112, 115, 113, 118, 122, 125, 128, 132]
-        spy_values = [100, 102, 104, 105, 107, 108, 106, 109, 111, 113, 115, 117]
-        nasdaq_values = [100, 104, 108, 112, 115, 119, 116, 122, 126, 130, 134, 138]
-    
-    return dates, portfolio_values, spy_values, nasdaq_values
+# Line colors of the benchmarks plotted against the portfolio
+BENCHMARK_COLORS = {"S&P 500": "#03dac6", "NASDAQ": "#ff9800"}
+
+# Portfolio performance chart with a line per benchmark, given as {name: values}
+def build_performance_figure(dates, portfolio_values, benchmark_values):
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=portfolio_values,
+        mode='lines',
+        name='Your Portfolio',
+        line=dict(color='#6200ee', width=3),
+        fill='tozeroy',
+        fillcolor='rgba(98, 0, 238, 0.1)'
+    ))
+    
+    for name, values in benchmark_values.items():
+        fig.add_trace(go.Scatter(
+            x=dates,
+            y=values,
+            mode='lines',
+            name=name,
+            line=dict(color=BENCHMARK_COLORS[name], width=2)
+        ))
+    
+    fig.update_layout(
+        title='Portfolio Performance vs. Benchmarks',
+        xaxis_title='Date',
+        yaxis_title='Value (Indexed to 100)',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        template='plotly_white',
+        height=500,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig
+
+PROJECTION_PATHS = 10_000
+
+# Simulated P5/P50/P95 and mean of the Combined book's value over the next year, per trading day, or None
+# when its holdings cannot be simulated, and its version. Simulated once per stored portfolio and history
+# source, not on every quote refresh; a projection from simulated history is replaced once live history lands.
+def get_projection(version):
+    holdings = get_portfolio_store().load_holdings(COMBINED)
+    closes, source = get_price_history(sorted(holdings["ticker"].unique()))
+    
+    def build_projection():
+        try:
+            model = book_model(holdings, closes)
+        except ScenarioError:
+            return None
+        return project(model, PROJECTION_PATHS, seed=0).percentiles()
+    
+    version = (source, version[1])
+    return get_view(version, "projection", COMBINED, (), build_projection), version
+
+# Fan chart of a projection: the 5th-95th percentile band around the median, from the next trading day
+def build_projection_figure(projection):
+    dates = pd.bdate_range(datetime.now().date() + timedelta(days=1), periods=len(projection))
+    fig = go.Figure()
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=projection["P95"],
+        mode='lines',
+        name='95th percentile',
+        line=dict(color='rgba(98, 0, 238, 0.3)', width=1)
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=projection["P5"],
+        mode='lines',
+        name='5th percentile',
+        line=dict(color='rgba(98, 0, 238, 0.3)', width=1),
+        fill='tonexty',
+        fillcolor='rgba(98, 0, 238, 0.1)'
+    ))
+    
+    fig.add_trace(go.Scatter(
+        x=dates,
+        y=projection["P50"],
+        mode='lines',
+        name='Median',
+        line=dict(color='#6200ee', width=3)
+    ))
+    
+    fig.update_layout(
+        title=f'Projected Combined Value ({PROJECTION_PATHS:,} simulated paths)',
+        xaxis_title='Date',
+        yaxis_title='Value ($)',
+        legend=dict(
+            orientation="h",
+            yanchor="bottom",
+            y=1.02,
+            xanchor="right",
+            x=1
+        ),
+        template='plotly_white',
+        height=400,
+        margin=dict(l=20, r=20, t=50, b=20)
+    )
+    return fig
 
 # Dashboard page
 def show_dashboard():
     st.markdown('<div class="main-header">Portfolio Dashboard</div>', unsafe_allow_html=True)
     
     # Get portfolio data
-    portfolio_data = generate_mock_portfolio_data()
+    portfolio_data, version = get_portfolio_data()
     
     # Account selection
     account_options = list(portfolio_data.keys())
@@ -244,68 +569,40 @@ def show_dashboard():
     # Performance chart
     st.markdown('<div class="sub-header">Performance</div>', unsafe_allow_html=True)
     
-    timerange_options = ["5D", "1M", "6M", "1Y"]
+    timerange_options = TIMERANGES
     timerange = st.select_slider("Time Period", options=timerange_options, value="1M")
     
-    dates, portfolio_values, spy_values, nasdaq_values = generate_performance_data(timerange)
-    
-    # Create performance chart
-    fig = go.Figure()
-    
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=portfolio_values,
-        mode='lines',
-        name='Your Portfolio',
-        line=dict(color='#6200ee', width=3),
-        fill='tozeroy',
-        fillcolor='rgba(98, 0, 238, 0.1)'
-    ))
-    
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=spy_values,
-        mode='lines',
-        name='S&P 500',
-        line=dict(color='#03dac6', width=2)
-    ))
+    dates, portfolio_values, spy_values, nasdaq_values, source = generate_performance_data(timerange, selected_account)
     
-    fig.add_trace(go.Scatter(
-        x=dates,
-        y=nasdaq_values,
-        mode='lines',
-        name='NASDAQ',
-        line=dict(color='#ff9800', width=2)
-    ))
-    
-    fig.update_layout(
-        title='Portfolio Performance vs. Benchmarks',
-        xaxis_title='Date',
-        yaxis_title='Value (Indexed to 100)',
-        legend=dict(
-            orientation="h",
-            yanchor="bottom",
-            y=1.02,
-            xanchor="right",
-            x=1
-        ),
-        template='plotly_white',
-        height=500,
-        margin=dict(l=20, r=20, t=50, b=20)
+    # The figure is built once per data version and time period, then shared by every session
+    fig = get_figure(
+        get_curves_version(source, dates), "performance", (selected_account, timerange, ("S&P 500", "NASDAQ")),
+        lambda: build_performance_figure(dates, portfolio_values, {"S&P 500": spy_values, "NASDAQ": nasdaq_values})
     )
     
     st.plotly_chart(fig, use_container_width=True)
     
+    # Forward projection of the Combined account over the next year
+    st.markdown('<div class="sub-header">Projected Value</div>', unsafe_allow_html=True)
+    
+    projection, projection_version = get_projection(version)
+    if projection is None:
+        st.info("A projection needs price history for every holding.")
+    else:
+        fig = get_figure(projection_version, "projection", (datetime.now().date(),), lambda: build_projection_figure(projection))
+        st.plotly_chart(fig, use_container_width=True)
+        end = projection.iloc[-1]
+        st.caption(f"In one year: median ${end['P50']:,.0f}, 5th percentile ${end['P5']:,.0f}, "
+                   f"95th percentile ${end['P95']:,.0f}. Simulated from the correlations of recent daily returns; "
+                   f"not a forecast.")
+    
     # Top holdings
     st.markdown('<div class="sub-header">Top Holdings</div>', unsafe_allow_html=True)
     
-    holdings = account_data["holdings"]
-    holdings_df = pd.DataFrame(holdings)
+    # Sorted and formatted holdings are shared across sessions until the data version changes
+    holdings_df = get_view(version, "sorted", selected_account, (), lambda: sorted_holdings(account_data["holdings"]))
     
     if not holdings_df.empty:
-        # Sort by market value
-        holdings_df = holdings_df.sort_values(by="market_value", ascending=False)
-        
         # Display top 5 holdings
         top_holdings = holdings_df.head(5)
         
@@ -339,45 +636,35 @@ def show_dashboard():
     st.markdown('<div class="sub-header">Holdings Breakdown</div>', unsafe_allow_html=True)
     
     if not holdings_df.empty:
-        # Format the dataframe for display
-        display_df = holdings_df.copy()
-        
-        # Add % gain/loss column
-        display_df["gain_loss_pct"] = (display_df["total_gain_loss"] / (display_df["market_value"] - display_df["total_gain_loss"])) * 100
-        
-        # Format columns
-        display_df["cost_basis"] = display_df["cost_basis"].map("${:,.2f}".format)
-        display_df["market_value"] = display_df["market_value"].map("${:,.2f}".format)
-        display_df["day_change_pct"] = display_df["day_change_pct"].map("{:+.2f}%".format)
-        display_df["total_gain_loss"] = display_df["total_gain_loss"].map("${:+,.2f}".format)
-        display_df["gain_loss_pct"] = display_df["gain_loss_pct"].map("{:+.2f}%".format)
-        
-        # Rename columns for display
-        display_df = display_df.rename(columns={
-            "ticker": "Ticker",
-            "quantity": "Quantity",
-            "cost_basis": "Cost Basis",
-            "market_value": "Market Value",
-            "day_change_pct": "Day Change",
-            "total_gain_loss": "Total Gain/Loss",
-            "gain_loss_pct": "Gain/Loss %"
-        })
-        
-        if "account" in display_df.columns:
-            display_df = display_df.rename(columns={"account": "Account"})
-        
-        st.dataframe(display_df, use_container_width=True)
+        display_df = get_view(version, "sorted_display", selected_account, (), lambda: format_holdings(holdings_df))
+        st.dataframe(display_df, use_container_width=True, column_config=HOLDINGS_COLUMN_CONFIG)
 
 # Holdings page
 def show_holdings():
     st.markdown('<div class="main-header">Holdings Breakdown</div>', unsafe_allow_html=True)
     
     # Get portfolio data
-    portfolio_data = generate_mock_portfolio_data()
+    portfolio_data, version = get_portfolio_data()
     
     # Use combined portfolio data for holdings
-    holdings = portfolio_data["Combined"]["holdings"]
-    holdings_df = pd.DataFrame(holdings)
+    holdings_df = pd.DataFrame(portfolio_data[COMBINED]["holdings"])
+    facet_index = get_view(version, "facets", COMBINED, (), lambda: FacetIndex(holdings_df, HOLDINGS_FACETS))
+    
+    # Filter values are read ahead of their widgets so each option can show its live count
+    search_term = st.session_state.get("holdings_search", "")
+    selections = {}
+    for column in facet_index.columns:
+        key = f"holdings_facet_{column}"
+        st.session_state[key] = [value for value in st.session_state.get(key, []) if value in facet_index.values[column]]
+        selections[column] = st.session_state[key]
+    
+    # Facets combine as bitmaps over the search matches; results are shared across sessions per filter set
+    filters = (tuple((column, tuple(selected)) for column, selected in selections.items()), search_term)
+    search_rows = get_view(version, "search", COMBINED, (search_term,), lambda: pack(search_mask(
+        holdings_df, search_term, get_holdings_search_index(holdings_df)
+    ))) if search_term else None
+    rows, counts = get_view(version, "facet_query", COMBINED, filters, lambda: facet_index.query(selections, search_rows))
+    filtered_df = get_view(version, "filtered", COMBINED, filters, lambda: holdings_df.iloc[rows])
     
     # Filters
     st.markdown('<div class="sub-header">Filters</div>', unsafe_allow_html=True)
@@ -385,23 +672,17 @@ def show_holdings():
     col1, col2 = st.columns(2)
     
     with col1:
-        account_filter = st.multiselect(
-            "Account",
-            options=["Schwab", "Interactive Brokers", "Robinhood"],
-            default=["Schwab", "Interactive Brokers", "Robinhood"]
-        )
+        for column in facet_index.columns:
+            st.multiselect(
+                HOLDINGS_FACETS[column],
+                options=facet_index.values[column],
+                format_func=lambda value, column=column: f"{value} ({counts[column][value]:,})",
+                placeholder=f"All ({len(facet_index.values[column])})",
+                key=f"holdings_facet_{column}"
+            )
     
     with col2:
-        search_term = st.text_input("Search by Ticker or Name", "")
-    
-    # Apply filters
-    filtered_df = holdings_df.copy()
-    
-    if "account" in filtered_df.columns and account_filter:
-        filtered_df = filtered_df[filtered_df["account"].isin(account_filter)]
-    
-    if search_term:
-        filtered_df = filtered_df[filtered_df["ticker"].str.contains(search_term, case=False)]
+        st.text_input("Search by Ticker, Name or Account", key="holdings_search")
     
     # Summary statistics
     total_market_value = filtered_df["market_value"].sum()
@@ -444,32 +725,31 @@ def show_holdings():
     st.markdown('<div class="sub-header">Holdings</div>', unsafe_allow_html=True)
     
     if not filtered_df.empty:
-        # Format the dataframe for display
-        display_df = filtered_df.copy()
+        display_df = get_view(version, "filtered_display", COMBINED, filters, lambda: format_holdings(filtered_df))
+        
+        # Sorting and paging happen on the server; only the visible page is sent to the browser
+        col1, col2, col3 = st.columns([2, 1, 1])
         
-        # Add % gain/loss column
-        display_df["gain_loss_pct"] = (display_df["total_gain_loss"] / (display_df["market_value"] - display_df["total_gain_loss"])) * 100
+        with col1:
+            sort_columns = list(display_df.columns)
+            sort_column = st.selectbox("Sort by", sort_columns, index=sort_columns.index("Market Value"))
+        
+        with col2:
+            ascending = st.toggle("Ascending", value=False)
         
-        # Format columns
-        display_df["cost_basis"] = display_df["cost_basis"].map("${:,.2f}".format)
-        display_df["market_value"] = display_df["market_value"].map("${:,.2f}".format)
-        display_df["day_change_pct"] = display_df["day_change_pct"].map("{:+.2f}%".format)
-        display_df["total_gain_loss"] = display_df["total_gain_loss"].map("${:+,.2f}".format)
-        display_df["gain_loss_pct"] = display_df["gain_loss_pct"].map("{:+.2f}%".format)
+        with col3:
+            pages = page_count(len(display_df))
+            # Keep the page in range when filters shrink the table
+            st.session_state["holdings_page"] = min(st.session_state.get("holdings_page", 1), pages)
+            page = st.number_input("Page", min_value=1, max_value=pages, key="holdings_page")
         
-        # Rename columns for display
-        display_df = display_df.rename(columns={
-            "ticker": "Ticker",
-            "quantity": "Quantity",
-            "cost_basis": "Cost Basis",
-            "market_value": "Market Value",
-            "day_change_pct": "Day Change",
-            "total_gain_loss": "Total Gain/Loss",
-            "gain_loss_pct": "Gain/Loss %",
-            "account": "Account"
-        })
+        index = get_view(version, "sort_index", COMBINED, filters + (sort_column,), lambda: sort_index(display_df, sort_column))
+        rows = page_rows(index, page, ascending)
         
-        st.dataframe(display_df, use_container_width=True)
+        st.dataframe(display_df.iloc[rows], use_container_width=True, column_config=HOLDINGS_COLUMN_CONFIG)
+        
+        first_row = (page - 1) * DEFAULT_PAGE_SIZE
+        st.caption(f"Showing {first_row + 1:,}-{first_row + len(rows):,} of {len(display_df):,} holdings")
     else:
         st.info("No holdings match the selected filters.")
 
@@ -482,7 +762,7 @@ def show_charts():
     
     with tab1:
         # Time range selection
-        timerange_options = ["5D", "1M", "6M", "1Y"]
+        timerange_options = TIMERANGES
         timerange = st.select_slider("Time Period", options=timerange_options, value="1M")
         
         # Benchmark selection
@@ -493,53 +773,14 @@ def show_charts():
         )
         
         # Get performance data
-        dates, portfolio_values, spy_values, nasdaq_values = generate_performance_data(timerange)
-        
-        # Create performance chart
-        fig = go.Figure()
+        dates, portfolio_values, spy_values, nasdaq_values, source = generate_performance_data(timerange)
         
-        fig.add_trace(go.Scatter(
-            x=dates,
-            y=portfolio_values,
-            mode='lines',
-            name='Your Portfolio',
-            line=dict(color='#6200ee', width=3),
-            fill='tozeroy',
-            fillcolor='rgba(98, 0, 238, 0.1)'
-        ))
-        
-        if "S&P 500" in benchmark_options:
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=spy_values,
-                mode='lines',
-                name='S&P 500',
-                line=dict(color='#03dac6', width=2)
-            ))
-        
-        if "NASDAQ" in benchmark_options:
-            fig.add_trace(go.Scatter(
-                x=dates,
-                y=nasdaq_values,
-                mode='lines',
-                name='NASDAQ',
-                line=dict(color='#ff9800', width=2)
-            ))
-        
-        fig.update_layout(
-            title='Portfolio Performance vs. Benchmarks',
-            xaxis_title='Date',
-            yaxis_title='Value (Indexed to 100)',
-            legend=dict(
-                orientation="h",
-                yanchor="bottom",
-                y=1.02,
-                xanchor="right",
-                x=1
-            ),
-            template='plotly_white',
-            height=500,
-            margin=dict(l=20, r=20, t=50, b=20)
+        benchmark_values = {
+            name: values for name, values in [("S&P 500", spy_values), ("NASDAQ", nasdaq_values)] if name in benchmark_options
+        }
+        fig = get_figure(
+            get_curves_version(source, dates), "performance", (COMBINED, timerange, tuple(benchmark_values)),
+            lambda: build_performance_figure(dates, portfolio_values, benchmark_values)
         )
         
         st.plotly_chart(fig, use_container_width=True)
@@ -550,9 +791,27 @@ def show_charts():
         with col1:
             st.markdown('<div class="sub-header">Performance Statistics</div>', unsafe_allow_html=True)
             
+            # Risk metrics from the daily returns over the selected period, alpha and beta against the S&P 500
+            curves, _ = get_performance_curves(timerange)
+            daily_returns = curves.pct_change().iloc[1:]
+            benchmark_names = list(BENCHMARKS)
+            metrics = compute_risk_metrics(daily_returns[["Your Portfolio"]], daily_returns[benchmark_names])
+            summary = metrics["summary"].loc["Your Portfolio"]
+            alpha = metrics['alpha'].loc['Your Portfolio', 'S&P 500']
+            
+            # Ranges too short to annualize show the return over the period, without Sharpe ratio or alpha
+            annualized = not np.isnan(summary['annualized_return'])
             stats_data = {
-                "Metric": ["Annualized Return", "Volatility", "Sharpe Ratio", "Max Drawdown", "Alpha", "Beta"],
-                "Value": ["18.5%", "12.3%", "1.42", "-15.2%", "5.3%", "1.15"]
+                "Metric": ["Annualized Return" if annualized else "Period Return", "Volatility", "Sharpe Ratio",
+                           "Max Drawdown", "Alpha", "Beta"],
+                "Value": [
+                    f"{(summary['annualized_return'] if annualized else summary['period_return']) * 100:.1f}%",
+                    f"{summary['volatility'] * 100:.1f}%",
+                    f"{summary['sharpe']:.2f}" if annualized else "n/a",
+                    f"{summary['max_drawdown'] * 100:.1f}%",
+                    f"{alpha * 100:.1f}%" if annualized else "n/a",
+                    f"{metrics['beta'].loc['Your Portfolio', 'S&P 500']:.2f}"
+                ]
             }
             
             stats_df = pd.DataFrame(stats_data)
@@ -561,10 +820,11 @@ def show_charts():
         with col2:
             st.markdown('<div class="sub-header">Benchmark Comparison</div>', unsafe_allow_html=True)
             
+            period_returns = (curves.iloc[-1] / curves.iloc[0] - 1) * 100
             benchmark_data = {
-                "Benchmark": ["S&P 500", "NASDAQ", "Russell 2000", "Dow Jones"],
-                "Return": ["+15.0%", "+20.2%", "+12.5%", "+13.8%"],
-                "Difference": ["+3.5%", "-1.7%", "+6.0%", "+4.7%"]
+                "Benchmark": benchmark_names,
+                "Return": [f"{period_returns[name]:+.1f}%" for name in benchmark_names],
+                "Difference": [f"{period_returns['Your Portfolio'] - period_returns[name]:+.1f}%" for name in benchmark_names]
             }
             
             benchmark_df = pd.DataFrame(benchmark_data)
@@ -580,55 +840,64 @@ def show_charts():
         
         returns_df = pd.DataFrame(returns_data)
         
-        fig = px.bar(
-            returns_df, 
-            x="Period", 
-            y=["Your Portfolio", "S&P 500"],
-            barmode="group",
-            title="Returns Comparison",
-            color_discrete_map={"Your Portfolio": "#6200ee", "S&P 500": "#03dac6"}
-        )
-        
-        fig.update_layout(
-            xaxis_title="",
-            yaxis_title="Return (%)",
-            legend_title="",
-            template="plotly_white",
-            height=500,
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
+        def build_returns_figure():
+            fig = px.bar(
+                returns_df, 
+                x="Period", 
+                y=["Your Portfolio", "S&P 500"],
+                barmode="group",
+                title="Returns Comparison",
+                color_discrete_map={"Your Portfolio": "#6200ee", "S&P 500": "#03dac6"}
+            )
+            
+            fig.update_layout(
+                xaxis_title="",
+                yaxis_title="Return (%)",
+                legend_title="",
+                template="plotly_white",
+                height=500,
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
+            return fig
         
+        # The returns table is fixed, so one figure serves every rerun
+        fig = get_figure((), "returns", (), build_returns_figure)
         st.plotly_chart(fig, use_container_width=True)
     
     with tab3:
         st.markdown('<div class="sub-header">Correlation Matrix</div>', unsafe_allow_html=True)
         
-        # Mock correlation data
-        correlation_data = {
-            "": ["Portfolio", "S&P 500", "NASDAQ", "Russell 2000", "Dow Jones"],
-            "Portfolio": [1.00, 0.85, 0.88, 0.72, 0.80],
-            "S&P 500": [0.85, 1.00, 0.92, 0.78, 0.95],
-            "NASDAQ": [0.88, 0.92, 1.00, 0.75, 0.85],
-            "Russell 2000": [0.72, 0.78, 0.75, 1.00, 0.70],
-            "Dow Jones": [0.80, 0.95, 0.85, 0.70, 1.00]
-        }
+        show_holdings_matrix = st.checkbox("Include individual holdings", value=False)
         
-        correlation_df = pd.DataFrame(correlation_data)
-        correlation_df = correlation_df.set_index("")
+        # Trailing one-year correlations of daily returns, updated day by day from running sums
+        curves, source = get_performance_curves("All")
+        daily_returns = curves.pct_change().iloc[1:].rename(columns={"Your Portfolio": "Portfolio"})
         
-        fig = px.imshow(
-            correlation_df,
-            text_auto=True,
-            color_continuous_scale="Viridis",
-            aspect="auto"
-        )
+        if show_holdings_matrix:
+            holding_closes, holdings_source = get_price_history(list(get_quantities()))
+            daily_returns = daily_returns.join(holding_closes.pct_change().iloc[1:])
+            source = source if holdings_source == source else "mock"
         
-        fig.update_layout(
-            title="Correlation Matrix",
-            height=500,
-            margin=dict(l=20, r=20, t=50, b=20)
-        )
+        key = (source, show_holdings_matrix, get_portfolio_store().version)
+        correlation_df = get_correlation_service().update(key, daily_returns).round(2)
+        
+        def build_correlation_figure():
+            fig = px.imshow(
+                correlation_df,
+                text_auto=True,
+                color_continuous_scale="Viridis",
+                aspect="auto"
+            )
+            
+            fig.update_layout(
+                title="Correlation Matrix",
+                height=500,
+                margin=dict(l=20, r=20, t=50, b=20)
+            )
+            return fig
         
+        # The matrix only changes with the holdings, the matrix options or a new trading day
+        fig = get_figure(key + (daily_returns.index[-1],), "correlation", (), build_correlation_figure)
         st.plotly_chart(fig, use_container_width=True)
 
 # Stock Analysis page
@@ -642,9 +911,37 @@ def show_stock_analysis():
         ticker = ticker_input.upper()
         
         try:
-            # Try to get real data from Yahoo Finance
-            stock = yf.Ticker(ticker)
-            info = stock.info
+            # Try to get real data from Yahoo Finance through the shared cache. The background
+            # refresher keeps held tickers warm and watches the ticker and chart shown here, so
+            # only the first view of a new ticker or chart setting waits on upstream calls.
+            scheduler = track_held_tickers()
+            market_data = get_market_data()
+            
+            # Chart options are read ahead of their widgets so every tab can be fetched at once
+            selected_period = st.session_state.get("stock_period", "1y")
+            selected_interval = st.session_state.get("stock_interval", "1d")
+            scheduler.watch(ticker, [
+                ("history", {"period": "1y", "interval": "1d"}),
+                ("history", {"period": selected_period, "interval": selected_interval}),
+                ("news", {}),
+                ("info", {}),
+            ])
+            
+            # Fetch all tabs concurrently; slow or failing sources are reported per tab
+            results, errors = fetch_concurrently({
+                "info": lambda: market_data.info(ticker),
+                "overview_history": lambda: market_data.history(ticker, period="1y"),
+                "chart_history": lambda: market_data.history(ticker, period=selected_period, interval=selected_interval),
+                "income_stmt": lambda: market_data.income_stmt(ticker),
+                "balance_sheet": lambda: market_data.balance_sheet(ticker),
+                "cash_flow": lambda: market_data.cashflow(ticker),
+                "news": lambda: market_data.news(ticker)
+            })
+            
+            if "info" in errors:
+                raise errors["info"]
+            
+            info = results["info"]
             
             # Check if we got valid data
             if "longName" not in info:
@@ -682,14 +979,19 @@ def show_stock_analysis():
                     st.markdown('<div class="sub-header">Price Chart</div>', unsafe_allow_html=True)
                     
                     # Get historical data
-                    hist = stock.history(period="1y")
+                    hist = results.get("overview_history")
                     
-                    if not hist.empty:
+                    if hist is None:
+                        st.warning("Price history is temporarily unavailable")
+                    elif not hist.empty:
+                        # Long histories are reduced to the chart's point budget before plotting
+                        close = downsample_line(hist['Close'])
+                        
                         fig = go.Figure()
                         
                         fig.add_trace(go.Scatter(
-                            x=hist.index,
-                            y=hist['Close'],
+                            x=close.index,
+                            y=close,
                             mode='lines',
                             name='Price',
                             line=dict(color='#6200ee', width=2),
@@ -836,23 +1138,44 @@ def show_stock_analysis():
                 
                 # Time period selection
                 period_options = ["1mo", "3mo", "6mo", "1y", "2y", "5y", "max"]
-                selected_period = st.select_slider("Time Period", options=period_options, value="1y")
+                st.select_slider("Time Period", options=period_options, value="1y", key="stock_period")
                 
                 # Interval selection
                 interval_options = ["1d", "5d", "1wk", "1mo", "3mo"]
-                selected_interval = st.select_slider("Interval", options=interval_options, value="1d")
+                st.select_slider("Interval", options=interval_options, value="1d", key="stock_interval")
                 
                 # Get historical data
-                hist = stock.history(period=selected_period, interval=selected_interval)
+                hist = results.get("chart_history")
                 
-                if not hist.empty:
+                if hist is None:
+                    st.warning("Price history is temporarily unavailable")
+                elif not hist.empty:
+                    if len(hist) > CANDLE_POINT_BUDGET:
+                        # Zooming happens on the server, so a narrower window is re-aggregated at full detail
+                        dates = hist.index.tz_localize(None) if hist.index.tz is not None else hist.index
+                        first_date, last_date = dates[0].date(), dates[-1].date()
+                        zoom_start, zoom_end = st.slider(
+                            "Zoom",
+                            min_value=first_date,
+                            max_value=last_date,
+                            value=(first_date, last_date),
+                            format="YYYY-MM-DD",
+                            key=f"stock_zoom_{ticker}_{selected_period}_{selected_interval}"
+                        )
+                        in_window = (dates >= pd.Timestamp(zoom_start)) & (dates < pd.Timestamp(zoom_end) + pd.Timedelta(days=1))
+                        hist = hist[in_window]
+                    
+                    bars = resample_ohlc(hist)
+                    if len(bars) < len(hist):
+                        st.caption(f"{len(hist):,} bars combined into {len(bars):,}; zoom in for more detail")
+                    
                     # Create candlestick chart
                     fig = go.Figure(data=[go.Candlestick(
-                        x=hist.index,
-                        open=hist['Open'],
-                        high=hist['High'],
-                        low=hist['Low'],
-                        close=hist['Close'],
+                        x=bars.index,
+                        open=bars['Open'],
+                        high=bars['High'],
+                        low=bars['Low'],
+                        close=bars['Close'],
                         increasing_line_color='#4caf50',
                         decreasing_line_color='#f44336'
                     )])
@@ -876,11 +1199,13 @@ def show_stock_analysis():
                 st.markdown('<div class="sub-header">Financial Information</div>', unsafe_allow_html=True)
                 
                 # Get financial data
-                income_stmt = stock.income_stmt
-                balance_sheet = stock.balance_sheet
-                cash_flow = stock.cashflow
+                income_stmt = results.get("income_stmt")
+                balance_sheet = results.get("balance_sheet")
+                cash_flow = results.get("cash_flow")
                 
-                if not income_stmt.empty:
+                if income_stmt is None:
+                    st.warning("Financial data is temporarily unavailable")
+                elif not income_stmt.empty:
                     # Revenue and earnings chart
                     st.markdown('<div class="sub-header">Revenue and Earnings</div>', unsafe_allow_html=True)
                     
@@ -982,9 +1307,11 @@ def show_stock_analysis():
                 st.markdown('<div class="sub-header">Latest News & Headlines</div>', unsafe_allow_html=True)
                 
                 # Get news data
-                news = stock.news
+                news = results.get("news")
                 
-                if news:
+                if news is None:
+                    st.warning("News is temporarily unavailable")
+                elif news:
                     for article in news[:5]:
                         title = article.get('title', 'No title')
                         publisher = article.get('publisher', 'Unknown source')
@@ -1082,56 +1409,70 @@ def show_ai_assistant():
     with col2:
         st.markdown('<div class="sub-header">Chat with AI</div>', unsafe_allow_html=True)
         
-        # Initialize chat history
-        if "messages" not in st.session_state:
-            st.session_state.messages = [
-                {"role": "assistant", "content": "Hello! I'm your DAJANIII AI Assistant. I can help explain financial terms, suggest investment strategies, or answer questions about your portfolio. What would you like to know?"}
-            ]
+        # Initialize chat history; older turns are compacted into a summary and spilled to disk.
+        # Spill files of sessions that ended long ago are pruned as new sessions start.
+        if "chat_history" not in st.session_state:
+            prune_spills(CHAT_SPILL_DIR)
+            st.session_state.chat_history = ChatHistory(
+                greeting=CHAT_GREETING,
+                spill_path=os.path.join(CHAT_SPILL_DIR, f"{uuid.uuid4().hex}.jsonl")
+            )
+        history = st.session_state.chat_history
         
-        # Display chat messages
-        for message in st.session_state.messages:
+        if len(history) > 1 and st.button("Clear chat", key="chat_clear"):
+            history.clear(greeting=CHAT_GREETING)
+        
+        summary = history.summary()
+        if summary:
+            st.caption(summary)
+        
+        # Only the newest messages are drawn unless the whole kept window is asked for
+        show_all = len(history.messages) > DEFAULT_VISIBLE and st.toggle("Show earlier messages", key="chat_show_all")
+        for message in history.visible(None if show_all else DEFAULT_VISIBLE):
             with st.chat_message(message["role"]):
                 st.markdown(message["content"])
         
         # Chat input
         if prompt := st.chat_input("Ask a question..."):
             # Add user message to chat history
-            st.session_state.messages.append({"role": "user", "content": prompt})
+            history.append("user", prompt)
             
             # Display user message
             with st.chat_message("user"):
                 st.markdown(prompt)
             
-            # Generate response based on prompt
-            response = ""
-            
-            # Simple keyword-based responses
-            prompt_lower = prompt.lower()
-            
-            if "p/e ratio" in prompt_lower or "pe ratio" in prompt_lower:
-                response = "The Price-to-Earnings (P/E) ratio is a valuation metric that compares a company's current share price to its earnings per share (EPS). A high P/E ratio could suggest that a stock's price is high relative to earnings, indicating that investors expect high growth rates in the future."
-            
-            elif "dividend yield" in prompt_lower:
-                response = "Dividend Yield is a financial ratio that shows how much a company pays out in dividends each year relative to its stock price. It's calculated as the annual dividend per share divided by the stock price per share."
-            
-            elif "dollar cost averaging" in prompt_lower:
-                response = "Dollar-Cost Averaging (DCA) is an investment strategy where you divide the total amount to be invested across periodic purchases of a target asset to reduce the impact of volatility on the overall purchase. The purchases occur regardless of the asset's price and at regular intervals."
-            
-            elif "invest" in prompt_lower and "apple" in prompt_lower:
-                response = "If you invest in Apple (AAPL) today, based on historical average annual returns of around 25% over the past decade, your investment could potentially grow significantly over time. However, past performance doesn't guarantee future results, and the technology sector can be volatile. It's important to consider your investment goals, time horizon, and risk tolerance."
-            
-            elif "diversify" in prompt_lower:
-                response = "Diversifying your portfolio involves spreading your investments across different asset classes, sectors, and geographic regions to reduce risk. This strategy helps protect against significant losses if one particular investment or sector performs poorly. Consider adding a mix of stocks, bonds, real estate, and possibly alternative investments based on your risk tolerance and investment goals."
-            
-            else:
-                response = "I don't have specific information about that. Would you like me to help you with understanding financial terms, suggesting investment strategies, or analyzing your portfolio?"
+            # Stream the assistant response as it is generated, so text appears from the first token
+            with st.chat_message("assistant"):
+                response = st.write_stream(get_assistant_backend().stream(prompt, history.messages))
             
             # Add assistant response to chat history
-            st.session_state.messages.append({"role": "assistant", "content": response})
-            
-            # Display assistant response
-            with st.chat_message("assistant"):
-                st.markdown(response)
+            history.append("assistant", response)
+        
+        stats = history.stats()
+        st.caption(f"{stats['kept']} messages kept in this session ({stats['bytes'] / 1024:,.1f} KB), "
+                   f"{stats['compacted']} compacted")
+
+# Summary and holdings of an imported statement
+def show_import_summary(account, holdings):
+    st.markdown('<div class="sub-header">Portfolio Summary</div>', unsafe_allow_html=True)
+    
+    total_value = holdings["market_value"].sum()
+    cost_basis = holdings["cost_basis"].sum()
+    gain_loss = total_value - cost_basis
+    gain_loss_pct = (gain_loss / cost_basis) * 100 if cost_basis > 0 else 0
+    sign = "+" if gain_loss >= 0 else "-"
+    
+    summary_data = {
+        "Account": account,
+        "Symbols": holdings["ticker"].nunique(),
+        "Total Value": f"${total_value:,.2f}",
+        "Cost Basis": f"${cost_basis:,.2f}",
+        "Gain/Loss": f"{sign}${abs(gain_loss):,.2f} ({sign}{abs(gain_loss_pct):.2f}%)"
+    }
+    
+    summary_df = pd.DataFrame([summary_data])
+    st.dataframe(summary_df, use_container_width=True, hide_index=True)
+    st.dataframe(holdings, use_container_width=True, hide_index=True)
 
 # Upload page
 def show_upload():
@@ -1201,30 +1542,40 @@ def show_upload():
         
         # Process button
         if st.button("Process File"):
-            with st.spinner("Processing file..."):
-                # Simulate processing
-                import time
-                time.sleep(2)
-                
-                # Show success message
-                st.success("File processed successfully! Portfolio created.")
-                
-                # Show portfolio summary
-                st.markdown('<div class="sub-header">Portfolio Summary</div>', unsafe_allow_html=True)
-                
-                summary_data = {
-                    "Account": "Schwab",
-                    "Symbols": 15,
-                    "Total Value": "$125,000.00",
-                    "Cost Basis": "$110,000.00",
-                    "Gain/Loss": "+$15,000.00 (+13.64%)"
-                }
+            progress_bar = st.progress(0.0, text="Reading file...")
+            
+            if uploaded_file.name.lower().endswith(".csv"):
+                # Report progress by bytes consumed, since the row count is unknown up front
+                def report_progress(rows_read, bytes_read):
+                    progress_bar.progress(min(bytes_read / max(uploaded_file.size, 1), 1.0), text=f"{rows_read:,} rows read")
                 
-                summary_df = pd.DataFrame([summary_data])
-                st.dataframe(summary_df, use_container_width=True, hide_index=True)
+                importer = import_csv
+            else:
+                def report_progress(pages_done, page_count):
+                    progress_bar.progress(pages_done / page_count, text=f"{pages_done} of {page_count} pages parsed")
                 
-                # View portfolio button
-                st.button("View Portfolio")
+                importer = import_pdf
+            
+            with st.spinner("Processing file..."):
+                try:
+                    result = importer(uploaded_file, progress=report_progress)
+                except UnrecognizedStatementError:
+                    result = None
+            
+            progress_bar.empty()
+            
+            if result is None:
+                st.error("Could not detect the brokerage for this file. Please upload a statement or positions export from one of the supported brokerages.")
+            else:
+                # Saving rewrites the account's holdings and rematerializes the combined portfolio
+                get_portfolio_store().save_account(result.brokerage, result.holdings)
+                get_view_cache().invalidate(PORTFOLIO_STORE_DIR)
+                st.success("File processed successfully! Portfolio created.")
+                if result.pages:
+                    st.caption(f"{result.pages:,} pages in {result.seconds:.2f}s")
+                else:
+                    st.caption(f"{result.rows_read:,} rows in {result.seconds:.2f}s ({result.rows_per_sec:,.0f} rows/sec)")
+                show_import_summary(result.brokerage, result.holdings)
     
     # How it works section
     st.markdown('<div class="sub-header" style="margin-top: 2rem;">How It Works</div>', unsafe_allow_html=True)
@@ -0,0 +1,76 @@
+import re
+import time
+
+from intents import FALLBACK_ANSWER
+
+TOKEN = re.compile(r"\s*\S+\s*")
+
+
+# Chunks of a text as a model emits them: words with their surrounding whitespace
+def tokenize(text):
+    return TOKEN.findall(text)
+
+
+# Offline stand-in for a language model backend. Answers come from the
+# intent router and are emitted token by token, optionally at a fixed
+# generation speed, so the chat renders exactly as it would from a streaming
+# model. Handlers are tried before the router: callables taking the prompt
+# and returning an answer computed from it, or None to pass. Any backend
+# exposing stream(prompt, history) -> iterator of text chunks can replace it.
+class LocalBackend:
+    def __init__(self, router, token_delay=0.0, fallback=FALLBACK_ANSWER, sleep=time.sleep, handlers=()):
+        self.router = router
+        self.token_delay = token_delay
+        self.fallback = fallback
+        self.sleep = sleep
+        self.handlers = list(handlers)
+
+    def answer(self, prompt):
+        for handler in self.handlers:
+            text = handler(prompt)
+            if text is not None:
+                return text
+        answers = self.router.answers_for(prompt)
+        return "\n\n".join(answers) if answers else self.fallback
+
+    def stream(self, prompt, history=()):
+        for token in tokenize(self.answer(prompt)):
+            if self.token_delay:
+                self.sleep(self.token_delay)
+            yield token
+
+
+# Whole response of a backend, for callers that cannot stream
+def respond(backend, prompt, history=()):
+    return "".join(backend.stream(prompt, history))
+
+
+# Passes chunks through, recording time to first chunk and total time in stats
+def timed(chunks, stats, clock=time.perf_counter):
+    start = clock()
+    for chunk in chunks:
+        stats.setdefault("first_token", clock() - start)
+        yield chunk
+    stats["total"] = clock() - start
+
+
+def benchmark(token_delay=0.02, prompts=("What is a P/E ratio?", "How can I diversify my portfolio?",
+                                         "what is the sharpe ratio and beta")):
+    from intents import GLOSSARY, INTENTS, IntentRouter, glossary_intents
+
+    backend = LocalBackend(IntentRouter({**INTENTS, **glossary_intents(GLOSSARY)}), token_delay=token_delay)
+    for prompt in prompts:
+        start = time.perf_counter()
+        text = respond(backend, prompt)
+        blocking = time.perf_counter() - start
+
+        stats = {}
+        for _ in timed(backend.stream(prompt), stats):
+            pass
+        print(f"{prompt!r:>38}: {len(tokenize(text))} tokens at {token_delay * 1000:.0f} ms each | "
+              f"blocking: first text after {blocking * 1000:.0f} ms | streaming: first token after "
+              f"{stats['first_token'] * 1000:.0f} ms, done after {stats['total'] * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
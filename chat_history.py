@@ -0,0 +1,145 @@
+import json
+import os
+import sys
+import time
+
+DEFAULT_WINDOW = 40
+DEFAULT_VISIBLE = 10
+SUMMARY_TOPICS = 8
+TOPIC_CHARS = 60
+
+# Spill files not appended to for this many seconds belong to sessions that have ended
+SPILL_MAX_AGE = 24 * 60 * 60
+
+
+# Approximate memory held by a list of chat messages in bytes
+def messages_size(messages):
+    return sys.getsizeof(messages) + sum(
+        sys.getsizeof(message) + sum(sys.getsizeof(value) for value in message.values()) for message in messages
+    )
+
+
+# Chat transcript with a bounded memory footprint. The newest `window`
+# messages are kept verbatim; older ones are compacted into a short summary
+# of the questions asked (the last few, truncated) and, when a spill path is
+# given, appended to it as JSON lines so the full transcript stays on disk.
+# Renderers draw only the newest `visible` messages.
+class ChatHistory:
+    def __init__(self, greeting=None, window=DEFAULT_WINDOW, spill_path=None):
+        self.window = window
+        self.spill_path = spill_path
+        self.messages = []
+        self.compacted = 0
+        self.topics = []
+        if greeting:
+            self.append("assistant", greeting)
+
+    def __len__(self):
+        return self.compacted + len(self.messages)
+
+    # Forget every message, deleting the spilled ones from disk, and start over from the greeting
+    def clear(self, greeting=None):
+        if self.spill_path:
+            try:
+                os.remove(self.spill_path)
+            except FileNotFoundError:
+                pass
+        self.messages = []
+        self.compacted = 0
+        self.topics = []
+        if greeting:
+            self.append("assistant", greeting)
+
+    def append(self, role, content):
+        self.messages.append({"role": role, "content": content})
+        if len(self.messages) > self.window:
+            self._compact(len(self.messages) - self.window)
+
+    def _compact(self, count):
+        dropped, self.messages = self.messages[:count], self.messages[count:]
+        if self.spill_path:
+            os.makedirs(os.path.dirname(self.spill_path), exist_ok=True)
+            with open(self.spill_path, "a", encoding="utf-8") as f:
+                f.writelines(json.dumps(message) + "\n" for message in dropped)
+        for message in dropped:
+            if message["role"] == "user":
+                topic = " ".join(message["content"].split())
+                self.topics.append(topic if len(topic) <= TOPIC_CHARS else topic[:TOPIC_CHARS - 1] + "…")
+        self.topics = self.topics[-SUMMARY_TOPICS:]
+        self.compacted += count
+
+    # One line standing in for the compacted messages, or None if nothing was compacted
+    def summary(self):
+        if not self.compacted:
+            return None
+        asked = "; ".join(f'"{topic}"' for topic in self.topics)
+        return f"{self.compacted} earlier messages compacted." + (f" Recent questions: {asked}." if asked else "")
+
+    # Newest messages to draw, all of the kept window when limit is None
+    def visible(self, limit=DEFAULT_VISIBLE):
+        return self.messages if limit is None else self.messages[-limit:]
+
+    # Messages kept and compacted so far, and the bytes the kept ones hold
+    def stats(self):
+        return {
+            "kept": len(self.messages),
+            "compacted": self.compacted,
+            "bytes": messages_size(self.messages) + sum(sys.getsizeof(topic) for topic in self.topics),
+        }
+
+    # Full transcript: spilled messages read back from disk, then the kept window
+    def transcript(self):
+        spilled = []
+        if self.spill_path and os.path.exists(self.spill_path):
+            with open(self.spill_path, encoding="utf-8") as f:
+                spilled = [json.loads(line) for line in f]
+        return spilled + self.messages
+
+
+# Delete the spill files in a directory that have not been written for max_age seconds; returns how many
+def prune_spills(directory, max_age=SPILL_MAX_AGE, now=None):
+    now = time.time() if now is None else now
+    removed = 0
+    try:
+        names = os.listdir(directory)
+    except FileNotFoundError:
+        return 0
+    for name in names:
+        path = os.path.join(directory, name)
+        try:
+            if name.endswith(".jsonl") and now - os.path.getmtime(path) > max_age:
+                os.remove(path)
+                removed += 1
+        except FileNotFoundError:
+            pass
+    return removed
+
+
+def benchmark(n_turns=2_000):
+    import tempfile
+
+    answer = "A long-form advisory answer. " * 40
+    unbounded = []
+    spill_path = os.path.join(tempfile.mkdtemp(), "session.jsonl")
+    history = ChatHistory(greeting="Hello!", spill_path=spill_path)
+
+    start = time.perf_counter()
+    for turn in range(n_turns):
+        for role, content in [("user", f"Question {turn} about my portfolio?"), ("assistant", answer)]:
+            unbounded.append({"role": role, "content": content})
+            history.append(role, content)
+    elapsed = time.perf_counter() - start
+
+    stats = history.stats()
+    print(f"{n_turns:,} turns: unbounded list {messages_size(unbounded) / 1024:,.0f} KB, "
+          f"{len(unbounded):,} messages drawn per rerun | window of {history.window}: "
+          f"{stats['bytes'] / 1024:,.0f} KB, {len(history.visible())} drawn per rerun, "
+          f"{stats['compacted']:,} compacted to disk ({elapsed * 1e6 / n_turns:.0f} us per turn)")
+    print(f"  {history.summary()[:120]}…")
+    assert len(history.transcript()) == len(history)
+    history.clear()
+    assert not os.path.exists(spill_path)
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,114 @@
+import threading
+import time
+from collections import OrderedDict, deque
+
+import numpy as np
+import pandas as pd
+
+DEFAULT_MAX_TRACKERS = 32
+
+
+# Correlation matrix maintained from running sums of x and xy (the diagonal of
+# xy holds x squared), so each new day costs O(n^2) instead of a pass over the
+# whole history. With a window, days falling out of it are subtracted again.
+class RunningCorrelation:
+    def __init__(self, columns, window=None):
+        self.columns = list(columns)
+        self.window = window
+        self.n = 0
+        self.sum_x = np.zeros(len(self.columns))
+        self.sum_xy = np.zeros((len(self.columns), len(self.columns)))
+        self.last_date = None
+        self._rows = deque()
+
+    def update(self, returns):
+        if self.last_date is not None:
+            returns = returns[returns.index > self.last_date]
+        returns = returns.reindex(columns=self.columns)
+        if returns.empty:
+            return self
+
+        values = returns.fillna(0.0).to_numpy(dtype=np.float64)
+        if self.window is not None:
+            values = values[-self.window:]
+        self._add(values, 1.0)
+
+        if self.window is not None:
+            self._rows.extend(values)
+            expired = len(self._rows) - self.window
+            if expired > 0:
+                self._add(np.array([self._rows.popleft() for _ in range(expired)]), -1.0)
+
+        self.last_date = returns.index[-1]
+        return self
+
+    def _add(self, values, sign):
+        self.n += int(sign) * len(values)
+        self.sum_x += sign * values.sum(axis=0)
+        self.sum_xy += sign * (values.T @ values)
+
+    def matrix(self):
+        if self.n < 2:
+            return pd.DataFrame(np.nan, index=self.columns, columns=self.columns)
+        covariance = (self.sum_xy - np.outer(self.sum_x, self.sum_x) / self.n) / (self.n - 1)
+        std = np.sqrt(np.clip(np.diag(covariance), 0.0, None))
+        with np.errstate(divide="ignore", invalid="ignore"):
+            correlation = covariance / np.outer(std, std)
+        np.fill_diagonal(correlation, 1.0)
+        return pd.DataFrame(np.clip(correlation, -1.0, 1.0), index=self.columns, columns=self.columns)
+
+
+# Running correlation trackers keyed by portfolio/universe. A tracker is
+# rebuilt only when its columns change or history is rewritten; otherwise
+# only the new trading days are folded in. Keys carry the portfolio version
+# and the source of the returns, so trackers of superseded versions age out
+# least recently used first, at most max_trackers kept.
+class CorrelationService:
+    def __init__(self, window=None, max_trackers=DEFAULT_MAX_TRACKERS):
+        self.window = window
+        self.max_trackers = max_trackers
+        self._trackers = OrderedDict()
+        self._lock = threading.Lock()
+
+    def update(self, key, returns):
+        with self._lock:
+            tracker = self._trackers.get(key)
+            if (tracker is None or tracker.columns != list(returns.columns)
+                    or tracker.last_date is None or tracker.last_date not in returns.index):
+                tracker = RunningCorrelation(returns.columns, window=self.window)
+                self._trackers[key] = tracker
+            self._trackers.move_to_end(key)
+            while len(self._trackers) > self.max_trackers:
+                self._trackers.popitem(last=False)
+            tracker.update(returns)
+            return tracker.matrix()
+
+
+def benchmark(n_days=252 * 10, n_holdings=500):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end="2025-01-01", periods=n_days)
+    market = rng.normal(0, 0.01, (n_days, 1))
+    returns = pd.DataFrame(market * rng.uniform(0.5, 1.5, n_holdings) + rng.normal(0, 0.01, (n_days, n_holdings)),
+                           index=index, columns=[f"T{i:03d}" for i in range(n_holdings)])
+
+    service = CorrelationService(window=252)
+    start = time.perf_counter()
+    service.update("bench", returns.iloc[:-1])
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    incremental = service.update("bench", returns)
+    update = time.perf_counter() - start
+
+    start = time.perf_counter()
+    full = returns.iloc[-252:].corr()
+    recompute = time.perf_counter() - start
+
+    error = np.abs(incremental.to_numpy() - full.to_numpy()).max()
+    print(f"{n_holdings} holdings, {n_days} days: initial build {build * 1000:.1f} ms | "
+          f"one-day update {update * 1000:.1f} ms | full recompute {recompute * 1000:.1f} ms | "
+          f"max abs diff {error:.2e}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,118 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+# Points a chart can show at typical widths: about one per pixel for lines,
+# two pixels per candle
+LINE_POINT_BUDGET = 1500
+CANDLE_POINT_BUDGET = 600
+
+
+def _as_numbers(index):
+    if isinstance(index, pd.DatetimeIndex):
+        return index.asi8.astype(np.float64)
+    return np.asarray(index, dtype=np.float64)
+
+
+# Positions of the points kept by Largest-Triangle-Three-Buckets: the first
+# and last points, plus from each bucket in between the point forming the
+# largest triangle with the previously kept point and the next bucket's mean
+def lttb(x, y, threshold):
+    x = np.asarray(x, dtype=np.float64)
+    y = np.asarray(y, dtype=np.float64)
+    n = len(y)
+    if threshold >= n or threshold < 3:
+        return np.arange(n)
+
+    edges = np.linspace(1, n - 1, threshold - 1).astype(np.int64)
+    ends = np.append(edges[1:], n)
+    # Mean of every bucket from cumulative sums; the last point closes the final triangle
+    cumulative_x = np.concatenate([[0.0], np.cumsum(x)])
+    cumulative_y = np.concatenate([[0.0], np.cumsum(y)])
+    mean_x = (cumulative_x[ends] - cumulative_x[edges]) / (ends - edges)
+    mean_y = (cumulative_y[ends] - cumulative_y[edges]) / (ends - edges)
+
+    selected = np.empty(threshold, dtype=np.int64)
+    selected[0], selected[-1] = 0, n - 1
+    anchor = 0
+    for bucket in range(threshold - 2):
+        start, stop = edges[bucket], edges[bucket + 1]
+        next_x, next_y = mean_x[bucket + 1], mean_y[bucket + 1]
+        area = np.abs(
+            (x[anchor] - next_x) * (y[start:stop] - y[anchor])
+            - (x[anchor] - x[start:stop]) * (next_y - y[anchor])
+        )
+        anchor = start + int(np.argmax(area))
+        selected[bucket + 1] = anchor
+    return selected
+
+
+# Series reduced to at most max_points with LTTB
+def downsample_line(series, max_points=LINE_POINT_BUDGET):
+    series = series.dropna()
+    if len(series) <= max_points:
+        return series
+    return series.iloc[lttb(_as_numbers(series.index), series.to_numpy(), max_points)]
+
+
+# OHLC(V) bars merged into at most max_bars consecutive groups; each keeps
+# the first open and timestamp, the extreme high and low, the last close and
+# the summed volume, so the reduced chart has the same price envelope
+def resample_ohlc(bars, max_bars=CANDLE_POINT_BUDGET):
+    if len(bars) <= max_bars:
+        return bars
+    per_bar = -(-len(bars) // max_bars)
+    starts = np.arange(0, len(bars), per_bar)
+    ends = np.append(starts[1:], len(bars)) - 1
+
+    merged = {
+        "Open": bars["Open"].to_numpy()[starts],
+        "High": np.maximum.reduceat(bars["High"].to_numpy(), starts),
+        "Low": np.minimum.reduceat(bars["Low"].to_numpy(), starts),
+        "Close": bars["Close"].to_numpy()[ends],
+    }
+    if "Volume" in bars.columns:
+        merged["Volume"] = np.add.reduceat(bars["Volume"].to_numpy(), starts)
+    return pd.DataFrame(merged, index=bars.index[starts])
+
+
+def benchmark(n_bars=16_000):
+    import plotly.graph_objects as go
+
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end="2025-01-01", periods=n_bars, tz="America/New_York")
+    close = 10 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, n_bars)))
+    spread = close * rng.uniform(0.002, 0.02, n_bars)
+    bars = pd.DataFrame({
+        "Open": close * (1 + rng.normal(0, 0.005, n_bars)), "High": close + spread,
+        "Low": close - spread, "Close": close, "Volume": rng.integers(1e5, 1e7, n_bars).astype(float),
+    }, index=index)
+
+    def candlestick(frame):
+        return go.Figure(go.Candlestick(x=frame.index, open=frame["Open"], high=frame["High"],
+                                        low=frame["Low"], close=frame["Close"])).to_json()
+
+    def line(series):
+        return go.Figure(go.Scatter(x=series.index, y=series, mode="lines")).to_json()
+
+    for name, render, reduce in [
+        ("candlestick", candlestick, lambda: resample_ohlc(bars)),
+        ("line", line, lambda: downsample_line(bars["Close"])),
+    ]:
+        full = bars if name == "candlestick" else bars["Close"]
+        start = time.perf_counter()
+        full_json = render(full)
+        full_time = time.perf_counter() - start
+
+        start = time.perf_counter()
+        reduced = reduce()
+        reduced_json = render(reduced)
+        reduced_time = time.perf_counter() - start
+
+        print(f"{name:>11}: {len(full):,} points, {len(full_json) / 1024:,.0f} KB in {full_time * 1000:.0f} ms | "
+              f"{len(reduced):,} points, {len(reduced_json) / 1024:,.0f} KB in {reduced_time * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
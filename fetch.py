@@ -0,0 +1,33 @@
+import time
+from concurrent.futures import ThreadPoolExecutor, TimeoutError
+
+DEFAULT_TIMEOUT = 10
+MAX_WORKERS = 8
+
+# Bounded pool shared by every session; requests that time out keep running
+# here in the background so their result can still land in the cache
+_executor = ThreadPoolExecutor(max_workers=MAX_WORKERS, thread_name_prefix="fetch")
+
+
+# Run independent zero-argument calls concurrently and collect what finishes.
+# Returns (results, errors) keyed by call name; a call that fails or exceeds
+# its timeout appears in errors instead of results so callers can render
+# whatever did arrive.
+def fetch_concurrently(calls, timeout=DEFAULT_TIMEOUT, timeouts=None, executor=None):
+    executor = executor or _executor
+    timeouts = timeouts or {}
+    started = time.monotonic()
+    futures = {name: executor.submit(call) for name, call in calls.items()}
+
+    results = {}
+    errors = {}
+    for name, future in futures.items():
+        deadline = started + timeouts.get(name, timeout)
+        try:
+            results[name] = future.result(timeout=max(deadline - time.monotonic(), 0))
+        except TimeoutError:
+            errors[name] = TimeoutError(f"{name} did not respond within {timeouts.get(name, timeout)}s")
+        except Exception as e:
+            errors[name] = e
+
+    return results, errors
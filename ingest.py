@@ -0,0 +1,276 @@
+import csv
+import io
+import itertools
+import time
+
+import numpy as np
+import pandas as pd
+
+# Columns of the holdings schema used by the dashboard pages
+HOLDINGS_COLUMNS = ["ticker", "quantity", "cost_basis", "market_value", "day_change_pct", "total_gain_loss"]
+
+CHUNK_ROWS = 50_000
+DETECT_LINES = 50
+
+# Header signatures and column mappings per brokerage export. Header names are
+# matched case-insensitively; a format is detected when every signature column
+# is present in one of the first DETECT_LINES lines. Formats with a "section"
+# are multi-section activity statements whose position rows are prefixed with
+# the section name and a Header/Data marker.
+BROKERAGE_FORMATS = {
+    "Interactive Brokers": {
+        "section": "Open Positions",
+        "signature": ["Statement", "Header", "Field Name", "Field Value"],
+        "filter": ("DataDiscriminator", "Summary"),
+        "columns": {
+            "Symbol": "ticker",
+            "Quantity": "quantity",
+            "Cost Basis": "cost_basis",
+            "Value": "market_value",
+            "Unrealized P/L": "total_gain_loss",
+        },
+    },
+    "Fidelity": {
+        "signature": ["Account Number", "Symbol", "Current Value", "Cost Basis Total"],
+        "columns": {
+            "Symbol": "ticker",
+            "Quantity": "quantity",
+            "Cost Basis Total": "cost_basis",
+            "Current Value": "market_value",
+            "Today's Gain/Loss Percent": "day_change_pct",
+            "Total Gain/Loss Dollar": "total_gain_loss",
+        },
+    },
+    "E*TRADE": {
+        "signature": ["Symbol", "Quantity", "Price Paid $", "Value $"],
+        "columns": {
+            "Symbol": "ticker",
+            "Quantity": "quantity",
+            "Price Paid $": "average_cost",
+            "Value $": "market_value",
+            "Change %": "day_change_pct",
+            "Total Gain $": "total_gain_loss",
+        },
+    },
+    "TD Ameritrade": {
+        "signature": ["Symbol", "Qty", "Mkt Value"],
+        "columns": {
+            "Symbol": "ticker",
+            "Qty": "quantity",
+            "Cost Basis": "cost_basis",
+            "Mkt Value": "market_value",
+            "Change %": "day_change_pct",
+            "Gain $": "total_gain_loss",
+        },
+    },
+    "Robinhood": {
+        "signature": ["Symbol", "Shares", "Average Cost", "Equity"],
+        "columns": {
+            "Symbol": "ticker",
+            "Shares": "quantity",
+            "Average Cost": "average_cost",
+            "Equity": "market_value",
+            "Total Return": "total_gain_loss",
+        },
+    },
+    "Schwab": {
+        "signature": ["Symbol", "Quantity", "Market Value", "Cost Basis"],
+        "columns": {
+            "Symbol": "ticker",
+            "Quantity": "quantity",
+            "Cost Basis": "cost_basis",
+            "Market Value": "market_value",
+            "Day Change %": "day_change_pct",
+            "Gain/Loss $": "total_gain_loss",
+        },
+    },
+}
+
+# Summary lines that some exports mix in with positions
+NON_POSITION_TICKERS = {"CASH & CASH INVESTMENTS", "ACCOUNT TOTAL", "TOTAL", "PENDING ACTIVITY", "CASH", "--"}
+
+
+class UnrecognizedStatementError(ValueError):
+    pass
+
+
+def _normalized(cells):
+    return [cell.strip().lower() for cell in cells]
+
+
+# Brokerage name and the index of its header line among the first lines of a file
+def detect_brokerage(lines):
+    for name, layout in BROKERAGE_FORMATS.items():
+        signature = _normalized(layout["signature"])
+        for position, line in enumerate(lines):
+            cells = _normalized(line)
+            if all(column in cells for column in signature):
+                return name, position
+    raise UnrecognizedStatementError("Could not detect the brokerage from the file header")
+
+
+# Parse "$1,234.56", "(12.00)", "+1.35%" and "--" style values for a whole column at once
+def parse_numbers(values):
+    text = values.astype(str).str.strip()
+    negative = text.str.startswith("(") & text.str.endswith(")")
+    cleaned = text.str.replace(r"[$,%()+\s]", "", regex=True)
+    try:
+        numbers = cleaned.replace("", np.nan).astype("float64")
+    except ValueError:
+        # Placeholders such as "--" or "N/A" take the slower coercing path
+        numbers = pd.to_numeric(cleaned, errors="coerce")
+    return numbers.where(~negative, -numbers)
+
+
+# Map a chunk of raw rows onto the holdings schema, deriving what the export omits
+def normalize_chunk(frame, layout):
+    lookup = {column.strip().lower(): column for column in frame.columns}
+    if layout.get("filter"):
+        column, value = layout["filter"]
+        if column.lower() in lookup:
+            frame = frame[frame[lookup[column.lower()]].str.strip() == value]
+
+    out = pd.DataFrame(index=frame.index)
+    for source, target in layout["columns"].items():
+        if source.lower() in lookup:
+            values = frame[lookup[source.lower()]]
+            out[target] = values.str.strip().str.upper() if target == "ticker" else parse_numbers(values)
+
+    out = out[out["ticker"].notna() & (out["ticker"] != "") & ~out["ticker"].isin(NON_POSITION_TICKERS)]
+    out = out[out["quantity"].notna()]
+
+    if "cost_basis" not in out and "average_cost" in out:
+        out["cost_basis"] = out["average_cost"] * out["quantity"]
+    for column in ["cost_basis", "market_value", "day_change_pct"]:
+        if column not in out:
+            out[column] = np.nan
+    if "total_gain_loss" not in out:
+        out["total_gain_loss"] = out["market_value"] - out["cost_basis"]
+    out["total_gain_loss"] = out["total_gain_loss"].fillna(out["market_value"] - out["cost_basis"])
+    out["day_change_pct"] = out["day_change_pct"].fillna(0.0)
+
+    return out[HOLDINGS_COLUMNS]
+
+
+class ImportResult:
+    def __init__(self, brokerage, holdings, rows_read, seconds, pages=0):
+        self.brokerage = brokerage
+        self.holdings = holdings
+        self.rows_read = rows_read
+        self.seconds = seconds
+        self.pages = pages
+
+    @property
+    def rows_per_sec(self):
+        return self.rows_read / self.seconds if self.seconds > 0 else float("inf")
+
+
+# Stream a brokerage CSV from a seekable binary file object in fixed-size row
+# chunks. Only one chunk of raw rows is held at a time; positions with the
+# same ticker are combined. progress(rows_read, bytes_read) is called per chunk.
+def import_csv(file, chunk_rows=CHUNK_ROWS, progress=None):
+    started = time.perf_counter()
+    text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+    try:
+        preamble = list(itertools.islice(csv.reader(text), DETECT_LINES))
+    finally:
+        text.detach()
+    brokerage, header_at = detect_brokerage(preamble)
+    layout = BROKERAGE_FORMATS[brokerage]
+    file.seek(0)
+
+    if layout.get("section"):
+        chunks, rows_read = _section_chunks(file, layout["section"], chunk_rows)
+    else:
+        # Flat exports go through the C parser, which is several times faster
+        rows_read = [header_at + 1]
+        reader = pd.read_csv(
+            file, skiprows=header_at, chunksize=chunk_rows, dtype=str, encoding="utf-8-sig",
+            encoding_errors="replace", skip_blank_lines=False, on_bad_lines="skip", keep_default_na=False
+        )
+        chunks = _counted_chunks(reader, rows_read)
+
+    parts = []
+    for chunk in chunks:
+        parts.append(normalize_chunk(chunk, layout))
+        if progress is not None:
+            progress(rows_read[0], file.tell())
+
+    holdings = pd.concat(parts, ignore_index=True) if parts else pd.DataFrame(columns=HOLDINGS_COLUMNS)
+    holdings = combine_lots(holdings)
+    return ImportResult(brokerage, holdings, rows_read[0], time.perf_counter() - started)
+
+
+def _counted_chunks(reader, rows_read):
+    with reader:
+        for chunk in reader:
+            rows_read[0] += len(chunk)
+            yield chunk
+
+
+# Multi-section statements are scanned line by line with the csv module,
+# keeping only rows of the wanted section
+def _section_chunks(file, section, chunk_rows):
+    rows_read = [0]
+
+    def chunks():
+        text = io.TextIOWrapper(file, encoding="utf-8-sig", errors="replace", newline="")
+        try:
+            header, batch = None, []
+            for row in csv.reader(text):
+                rows_read[0] += 1
+                if len(row) < 3 or row[0] != section:
+                    continue
+                if row[1] == "Header":
+                    if batch:
+                        yield pd.DataFrame(batch, columns=header)
+                        batch = []
+                    header = row[2:]
+                elif row[1] == "Data" and header is not None:
+                    # Pad or truncate ragged rows to the header width
+                    batch.append((row[2:] + [""] * len(header))[:len(header)])
+                    if len(batch) >= chunk_rows:
+                        yield pd.DataFrame(batch, columns=header)
+                        batch = []
+            if batch:
+                yield pd.DataFrame(batch, columns=header)
+        finally:
+            text.detach()
+
+    return chunks(), rows_read
+
+
+# Sum lots of the same ticker; day change is weighted by market value
+def combine_lots(holdings):
+    if holdings.empty or not holdings["ticker"].duplicated().any():
+        return holdings.reset_index(drop=True)
+    weighted = holdings.assign(day_change_value=holdings["day_change_pct"] * holdings["market_value"].fillna(0))
+    combined = weighted.groupby("ticker", sort=False).agg(
+        quantity=("quantity", "sum"),
+        cost_basis=("cost_basis", "sum"),
+        market_value=("market_value", "sum"),
+        day_change_value=("day_change_value", "sum"),
+        total_gain_loss=("total_gain_loss", "sum"),
+    )
+    with np.errstate(divide="ignore", invalid="ignore"):
+        combined["day_change_pct"] = (combined["day_change_value"] / combined["market_value"]).fillna(0.0)
+    return combined.reset_index()[HOLDINGS_COLUMNS]
+
+
+def benchmark(n_rows=1_000_000):
+    lines = ["Positions for account Individual ...123 as of 09:30 AM ET, 01/02/2025", "",
+             '"Symbol","Description","Quantity","Price","Market Value","Day Change %","Cost Basis","Gain/Loss $"']
+    rng = np.random.default_rng(0)
+    for i in range(n_rows):
+        quantity = int(rng.integers(1, 500))
+        lines.append(f'"T{i % 5000:04d}","Company","{quantity}","$10.00","${quantity * 10:,.2f}","+0.50%",'
+                     f'"${quantity * 9:,.2f}","${quantity:,.2f}"')
+    payload = ("\n".join(lines) + "\n").encode()
+
+    result = import_csv(io.BytesIO(payload))
+    print(f"{result.brokerage}: {result.rows_read:,} rows ({len(payload) / 1e6:.0f} MB) in "
+          f"{result.seconds:.2f} s = {result.rows_per_sec:,.0f} rows/sec, {len(result.holdings):,} holdings")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,277 @@
+import csv
+import math
+import re
+import time
+from collections import deque
+
+NON_WORD = re.compile(r"[^a-z0-9]+")
+
+DEFAULT_LIMIT = 3
+
+FALLBACK_ANSWER = ("I don't have specific information about that. Would you like me to help you with understanding "
+                   "financial terms, suggesting investment strategies, or analyzing your portfolio?")
+
+# Topics the assistant can answer. Each phrase is matched on whole words,
+# case- and punctuation-insensitively ("p/e ratio" matches "P/E ratio?"); a
+# trailing * matches any word ending ("diversif*"), and a tuple matches only
+# when every one of its phrases occurs in the prompt.
+INTENTS = {
+    "pe_ratio": {
+        "phrases": ["p/e ratio", "pe ratio", "p/e", "price to earnings", "price-to-earnings", "earnings multiple"],
+        "answer": "The Price-to-Earnings (P/E) ratio is a valuation metric that compares a company's current share price to its earnings per share (EPS). A high P/E ratio could suggest that a stock's price is high relative to earnings, indicating that investors expect high growth rates in the future.",
+    },
+    "dividend_yield": {
+        "phrases": ["dividend yield"],
+        "answer": "Dividend Yield is a financial ratio that shows how much a company pays out in dividends each year relative to its stock price. It's calculated as the annual dividend per share divided by the stock price per share.",
+    },
+    "dollar_cost_averaging": {
+        "phrases": ["dollar cost averaging", "dollar-cost averaging", "dca"],
+        "answer": "Dollar-Cost Averaging (DCA) is an investment strategy where you divide the total amount to be invested across periodic purchases of a target asset to reduce the impact of volatility on the overall purchase. The purchases occur regardless of the asset's price and at regular intervals.",
+    },
+    "invest_apple": {
+        "phrases": [("invest*", "apple"), ("invest*", "aapl")],
+        "answer": "If you invest in Apple (AAPL) today, based on historical average annual returns of around 25% over the past decade, your investment could potentially grow significantly over time. However, past performance doesn't guarantee future results, and the technology sector can be volatile. It's important to consider your investment goals, time horizon, and risk tolerance.",
+    },
+    "diversification": {
+        "phrases": ["diversif*"],
+        "answer": "Diversifying your portfolio involves spreading your investments across different asset classes, sectors, and geographic regions to reduce risk. This strategy helps protect against significant losses if one particular investment or sector performs poorly. Consider adding a mix of stocks, bonds, real estate, and possibly alternative investments based on your risk tolerance and investment goals.",
+    },
+}
+
+# Common financial terms answered from the glossary; more can be loaded from a CSV with load_glossary
+GLOSSARY = {
+    "Alpha": (["alpha"], "Alpha is the return of an investment above what its exposure to the market (its beta) would explain. Positive alpha means the investment beat its risk-adjusted benchmark."),
+    "Beta": (["beta"], "Beta measures how much an investment moves with the market. A beta of 1 moves in line with the S&P 500, above 1 swings more and below 1 swings less."),
+    "Sharpe Ratio": (["sharpe ratio", "sharpe"], "The Sharpe ratio is the return earned above the risk-free rate per unit of volatility. Higher values mean more return for the risk taken."),
+    "Volatility": (["volatility", "volatile"], "Volatility is how widely an investment's returns swing, usually measured as the annualized standard deviation of daily returns."),
+    "Max Drawdown": (["max drawdown", "maximum drawdown", "drawdown"], "Maximum drawdown is the largest peak-to-trough fall in value over a period, a measure of the worst loss an investor would have sat through."),
+    "Market Capitalization": (["market cap", "market capitalization", "market capitalisation"], "Market capitalization is the total value of a company's shares: the share price times the number of shares outstanding."),
+    "Earnings Per Share": (["earnings per share", "eps"], "Earnings per share (EPS) is a company's net income divided by its shares outstanding, the profit attributable to each share."),
+    "Price-to-Book Ratio": (["price to book", "price-to-book", "p/b"], "The price-to-book ratio compares a company's market value to the book value of its equity. Values below 1 can indicate the market values the company below its net assets."),
+    "Price-to-Sales Ratio": (["price to sales", "price-to-sales", "p/s"], "The price-to-sales ratio compares a company's market value to its revenue, useful for companies without earnings."),
+    "PEG Ratio": (["peg ratio", "peg"], "The PEG ratio divides the P/E ratio by the expected earnings growth rate, so growth is taken into account when judging valuation."),
+    "Return on Equity": (["return on equity", "roe"], "Return on equity (ROE) is net income divided by shareholders' equity, showing how efficiently a company turns its equity into profit."),
+    "Return on Assets": (["return on assets", "roa"], "Return on assets (ROA) is net income divided by total assets, showing how profitably a company uses what it owns."),
+    "Profit Margin": (["profit margin", "net margin"], "Profit margin is net income as a percentage of revenue: how much of each dollar of sales the company keeps as profit."),
+    "Free Cash Flow": (["free cash flow", "fcf"], "Free cash flow is the cash a company generates from operations after capital expenditures, available for dividends, buybacks or debt repayment."),
+    "Debt-to-Equity Ratio": (["debt to equity", "debt-to-equity", "leverage ratio"], "The debt-to-equity ratio divides total liabilities by shareholders' equity, a measure of how much a company relies on borrowing."),
+    "Dividend": (["dividend", "dividends"], "A dividend is a distribution of a company's profits to its shareholders, usually paid in cash every quarter."),
+    "Payout Ratio": (["payout ratio"], "The payout ratio is the share of earnings a company pays out as dividends. Very high ratios can be hard to sustain."),
+    "Ex-Dividend Date": (["ex-dividend", "ex dividend date"], "The ex-dividend date is the first day a stock trades without its next dividend; you must own the shares before it to receive the payment."),
+    "Stock Split": (["stock split", "split"], "A stock split divides each share into several, lowering the share price without changing the company's total value or your stake."),
+    "Bond": (["bond", "bonds"], "A bond is a loan to a government or company that pays interest (the coupon) and returns the principal at maturity."),
+    "Yield to Maturity": (["yield to maturity", "ytm"], "Yield to maturity is the total annual return of a bond held until it matures, counting its coupons and the gap between its price and face value."),
+    "Duration": (["duration"], "Duration measures a bond's sensitivity to interest rates: a duration of 5 means its price falls about 5% if rates rise by one percentage point."),
+    "Exchange-Traded Fund": (["etf", "etfs", "exchange traded fund", "exchange-traded fund"], "An exchange-traded fund (ETF) is a basket of securities that trades on an exchange like a single stock, often tracking an index at low cost."),
+    "Mutual Fund": (["mutual fund", "mutual funds"], "A mutual fund pools investors' money into a professionally managed portfolio, priced once a day at its net asset value."),
+    "Index Fund": (["index fund", "index funds"], "An index fund tracks a market index such as the S&P 500 instead of picking stocks, which keeps costs and turnover low."),
+    "Expense Ratio": (["expense ratio"], "The expense ratio is a fund's annual operating cost as a percentage of its assets, deducted from the fund's returns."),
+    "Net Asset Value": (["net asset value", "nav"], "Net asset value (NAV) is a fund's assets minus its liabilities, divided by its shares outstanding."),
+    "S&P 500": (["s&p 500", "s&p", "sp500"], "The S&P 500 is an index of 500 of the largest US listed companies, weighted by market capitalization and widely used as the benchmark for US stocks."),
+    "Nasdaq": (["nasdaq"], "The Nasdaq Composite tracks the stocks listed on the Nasdaq exchange and is weighted toward technology companies; the Nasdaq-100 holds its 100 largest non-financial members."),
+    "Bull Market": (["bull market", "bullish"], "A bull market is a sustained period of rising prices, often defined as a 20% rise from a recent low."),
+    "Bear Market": (["bear market", "bearish"], "A bear market is a sustained decline, commonly defined as a fall of 20% or more from a recent high."),
+    "Correction": (["correction"], "A correction is a decline of 10% to 20% from a recent high, milder and usually shorter than a bear market."),
+    "Asset Allocation": (["asset allocation", "allocation"], "Asset allocation is how a portfolio is divided among asset classes such as stocks, bonds and cash, the main driver of its risk and return."),
+    "Rebalancing": (["rebalanc*"], "Rebalancing means trading back to your target asset allocation after market moves have pushed the weights away from it."),
+    "Compound Interest": (["compound interest", "compounding"], "Compounding is earning returns on previous returns, so growth accelerates the longer money stays invested."),
+    "Capital Gains": (["capital gain", "capital gains"], "A capital gain is the profit from selling an investment for more than its cost basis; it is realized when you sell."),
+    "Cost Basis": (["cost basis"], "Cost basis is what you paid for an investment, including commissions, used to work out your gain or loss when you sell."),
+    "Unrealized Gain": (["unrealized gain", "unrealized loss", "paper gain"], "An unrealized gain or loss is the change in value of an investment you still hold; it becomes realized when you sell."),
+    "Tax-Loss Harvesting": (["tax loss harvesting", "tax-loss harvesting"], "Tax-loss harvesting is selling investments at a loss to offset taxable gains, often replacing them with similar holdings."),
+    "Short Selling": (["short selling", "short sell", "shorting"], "Short selling is borrowing shares and selling them, hoping to buy them back cheaper later; losses are unlimited if the price keeps rising."),
+    "Options": (["option", "options", "call option", "put option"], "An option gives the right, but not the obligation, to buy (a call) or sell (a put) a security at a set price before a set date."),
+    "Limit Order": (["limit order"], "A limit order buys or sells only at a set price or better, giving price control at the risk of not being filled."),
+    "Market Order": (["market order"], "A market order buys or sells immediately at the best available price, guaranteeing execution but not price."),
+    "Stop-Loss Order": (["stop loss", "stop-loss"], "A stop-loss order sells a position once its price falls to a set level, limiting the loss on it."),
+    "Liquidity": (["liquidity", "liquid"], "Liquidity is how easily an asset can be bought or sold without moving its price; cash is the most liquid asset."),
+    "Inflation": (["inflation"], "Inflation is the rise in the general price level, which erodes the purchasing power of money and of fixed payments such as bond coupons."),
+    "Interest Rates": (["interest rate", "interest rates", "fed funds"], "Interest rates set the cost of borrowing; rising rates lower bond prices and tend to weigh on stock valuations."),
+    "Risk Tolerance": (["risk tolerance"], "Risk tolerance is how much variability in returns, and how large a loss, you are willing and able to bear in pursuit of higher returns."),
+    "Correlation": (["correlation", "correlated"], "Correlation measures how closely two investments move together, from -1 (opposite) to 1 (in lockstep); low correlation improves diversification."),
+}
+
+
+# Intents for glossary entries given as {term: (phrases, definition)}
+def glossary_intents(glossary):
+    return {
+        f"glossary:{term}": {"phrases": list(phrases), "answer": f"**{term}**: {definition}"}
+        for term, (phrases, definition) in glossary.items()
+    }
+
+
+# Glossary from a CSV with term and definition columns and optional
+# "|"-separated aliases; the term itself always matches
+def load_glossary(path):
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            lookup = {column.strip().lower(): column for column in reader.fieldnames or []}
+            term, definition, aliases = lookup.get("term"), lookup.get("definition"), lookup.get("aliases")
+            if term is None or definition is None:
+                return {}
+            glossary = {}
+            for row in reader:
+                if row[term] and row[definition]:
+                    phrases = [row[term].strip()] + [alias.strip() for alias in (row.get(aliases) or "").split("|") if alias.strip()]
+                    glossary[row[term].strip()] = (phrases, row[definition].strip())
+            return glossary
+    except FileNotFoundError:
+        return {}
+
+
+# Lowercase words separated by single spaces, with a space on either side
+def normalize(text):
+    return f" {NON_WORD.sub(' ', text.lower()).strip()} "
+
+
+# Pattern matched for a phrase: whole words, or a word prefix with a trailing *
+def _pattern(phrase):
+    if phrase.endswith("*"):
+        return normalize(phrase[:-1]).rstrip()
+    return normalize(phrase)
+
+
+# Routes a prompt to the intents whose phrases it contains. All phrases are
+# compiled into one Aho-Corasick automaton over characters, so a prompt is
+# matched against every intent in a single pass whatever their number.
+# Matched phrases are weighted by their length in words times an inverse
+# document frequency, so specific and rare phrases outrank generic ones.
+class IntentRouter:
+    def __init__(self, intents):
+        self.names = list(intents)
+        self.answers = [intents[name]["answer"] for name in self.names]
+
+        patterns = {}
+        alternatives = []
+        for intent, name in enumerate(self.names):
+            for phrase in intents[name]["phrases"]:
+                group = phrase if isinstance(phrase, tuple) else (phrase,)
+                terms = tuple(sorted({patterns.setdefault(_pattern(part), len(patterns)) for part in group}))
+                alternatives.append((intent, terms))
+
+        documents = [set() for _ in patterns]
+        for intent, terms in alternatives:
+            for term in terms:
+                documents[term].add(intent)
+        self.weights = [
+            len(pattern.split()) * math.log(1 + len(self.names) / len(documents[term]))
+            for pattern, term in patterns.items()
+        ]
+        self._alternatives = [[] for _ in patterns]
+        for intent, terms in alternatives:
+            for term in terms:
+                self._alternatives[term].append((intent, terms))
+        self._build(patterns)
+
+    # Trie of the patterns with failure links; each node's outputs include those of its failure chain
+    def _build(self, patterns):
+        self._goto = [{}]
+        self._outputs = [[]]
+        for pattern, term in patterns.items():
+            node = 0
+            for char in pattern:
+                following = self._goto[node].get(char)
+                if following is None:
+                    following = len(self._goto)
+                    self._goto[node][char] = following
+                    self._goto.append({})
+                    self._outputs.append([])
+                node = following
+            self._outputs[node].append(term)
+
+        self._fail = [0] * len(self._goto)
+        queue = deque(self._goto[0].values())
+        while queue:
+            node = queue.popleft()
+            for char, following in self._goto[node].items():
+                queue.append(following)
+                fallback = self._fail[node]
+                while fallback and char not in self._goto[fallback]:
+                    fallback = self._fail[fallback]
+                target = self._goto[fallback].get(char, 0)
+                self._fail[following] = target if target != following else 0
+                self._outputs[following] = self._outputs[following] + self._outputs[self._fail[following]]
+
+    # Ids of the patterns occurring in a prompt
+    def _matches(self, prompt):
+        goto, fail, outputs = self._goto, self._fail, self._outputs
+        found = set()
+        node = 0
+        # A space of the previous match may start the next one, so the text is scanned once
+        for char in normalize(prompt):
+            while node and char not in goto[node]:
+                node = fail[node]
+            node = goto[node].get(char, 0)
+            if outputs[node]:
+                found.update(outputs[node])
+        return found
+
+    # Best-scoring intent ids for a prompt as [(intent, score)], highest first
+    def _ranked(self, prompt, limit):
+        found = self._matches(prompt)
+        scores = {}
+        for term in found:
+            for intent, terms in self._alternatives[term]:
+                if all(t in found for t in terms):
+                    scores[intent] = max(scores.get(intent, 0.0), sum(self.weights[t] for t in terms))
+        return sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+
+    # Best-scoring intents for a prompt as [(name, score)], highest first
+    def route(self, prompt, limit=DEFAULT_LIMIT):
+        return [(self.names[intent], score) for intent, score in self._ranked(prompt, limit)]
+
+    # Answers of the best-scoring intents, highest first, leaving out those
+    # scoring no more than a share of the best (e.g. "dividend" under "dividend yield")
+    def answers_for(self, prompt, limit=DEFAULT_LIMIT, relative=0.5):
+        ranked = self._ranked(prompt, limit)
+        return [self.answers[intent] for intent, score in ranked if score > relative * ranked[0][1]]
+
+
+def benchmark(n_terms=5_000, n_prompts=2_000):
+    import random
+
+    rng = random.Random(0)
+    words = ["ratio", "yield", "margin", "growth", "return", "risk", "equity", "debt", "cash", "flow", "asset",
+             "option", "bond", "index", "fund", "rate", "spread", "volatility", "premium", "credit", "market",
+             "value", "income", "capital", "duration", "beta", "alpha", "hedge", "swap", "futures", "coupon"]
+    glossary = {}
+    while len(glossary) < n_terms:
+        term = " ".join(rng.sample(words, rng.randint(1, 3))) + f" {rng.choice(['', 'adjusted', 'forward', 'net', 'gross'])}"
+        term = f"{term.strip()} {len(glossary)}" if rng.random() < 0.7 else term.strip()
+        glossary.setdefault(term, ([term], f"Definition of {term}."))
+    intents = dict(INTENTS, **glossary_intents(GLOSSARY), **glossary_intents(glossary))
+
+    filler = ["what is", "explain", "how does", "tell me about", "should I worry about", "compare", "and"]
+    prompts = [
+        f"{rng.choice(filler)} {rng.choice(list(glossary))} {rng.choice(filler)} {rng.choice(words)} in my portfolio?"
+        for _ in range(n_prompts)
+    ]
+
+    start = time.perf_counter()
+    router = IntentRouter(intents)
+    build = time.perf_counter() - start
+
+    timings = []
+    for prompt in prompts:
+        start = time.perf_counter()
+        router.route(prompt)
+        timings.append(time.perf_counter() - start)
+    timings.sort()
+
+    # Substring checks per intent, as an if/elif chain over every topic does
+    phrase_lists = [[phrase.lower() for phrase in intent["phrases"] if isinstance(phrase, str)] for intent in intents.values()]
+    start = time.perf_counter()
+    for prompt in prompts[:200]:
+        lowered = prompt.lower()
+        [any(phrase in lowered for phrase in phrases) for phrases in phrase_lists]
+    scanned = (time.perf_counter() - start) / 200
+
+    print(f"{len(intents):,} intents ({len(router._goto):,} automaton states): build {build * 1000:.0f} ms | "
+          f"route mean {sum(timings) / len(timings) * 1e6:.0f} us, p99 {timings[int(len(timings) * 0.99)] * 1e6:.0f} us | "
+          f"substring scan of every intent {scanned * 1e6:.0f} us")
+    print(f"  e.g. {prompts[0]!r} -> {router.route(prompts[0])}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,374 @@
+import pickle
+import sys
+import threading
+import time
+from collections import OrderedDict
+
+import pandas as pd
+import yfinance as yf
+
+# Time-to-live per endpoint in seconds: quotes go stale in seconds,
+# fundamentals in hours and news in minutes
+DEFAULT_TTLS = {
+    "quote": 15,
+    "info": 30,
+    "history": 5 * 60,
+    "income_stmt": 6 * 60 * 60,
+    "balance_sheet": 6 * 60 * 60,
+    "cashflow": 6 * 60 * 60,
+    "news": 10 * 60,
+}
+
+DEFAULT_MAX_BYTES = 64 * 1024 * 1024
+
+# Seconds a caller waits on another caller's identical upstream call before giving up
+DEFAULT_FLIGHT_TIMEOUT = 30
+
+
+# Last and previous close per ticker from a yf.download frame, without a
+# per-ticker loop: rank valid rows from the end and pick ranks 1 and 2
+def last_two_closes(data, tickers):
+    if isinstance(data.columns, pd.MultiIndex):
+        closes = data["Close"]
+    else:
+        closes = data[["Close"]].set_axis(tickers[:1], axis=1)
+    closes = closes.reindex(columns=tickers)
+    valid = closes.notna()
+    rank = valid[::-1].cumsum()[::-1].where(valid)
+    return pd.DataFrame({
+        "price": closes.where(rank == 1).max(),
+        "previous_close": closes.where(rank == 2).max(),
+    })
+
+
+# Thin wrapper around yfinance exposing one method per cached endpoint
+class YFinanceProvider:
+    # Batched quotes for many tickers with a single download call
+    def quote(self, tickers):
+        data = yf.download(
+            tickers, period="5d", interval="1d", group_by="column",
+            auto_adjust=False, threads=True, progress=False
+        )
+        if data is None or data.empty:
+            return {}
+        quotes = last_two_closes(data, list(tickers)).dropna(subset=["price"])
+        return quotes.to_dict("index")
+
+    def info(self, ticker):
+        return yf.Ticker(ticker).info
+
+    # Bars since start (a YYYY-MM-DD date) when given, otherwise over the trailing period
+    def history(self, ticker, period="1y", interval="1d", start=None):
+        if start is not None:
+            return yf.Ticker(ticker).history(start=start, interval=interval)
+        return yf.Ticker(ticker).history(period=period, interval=interval)
+
+    def income_stmt(self, ticker):
+        return yf.Ticker(ticker).income_stmt
+
+    def balance_sheet(self, ticker):
+        return yf.Ticker(ticker).balance_sheet
+
+    def cashflow(self, ticker):
+        return yf.Ticker(ticker).cashflow
+
+    def news(self, ticker):
+        return yf.Ticker(ticker).news
+
+
+# Approximate in-memory size of a cached value in bytes
+def estimate_size(value):
+    if isinstance(value, (pd.DataFrame, pd.Series)):
+        usage = value.memory_usage(deep=True)
+        return int(usage.sum()) if isinstance(value, pd.DataFrame) else int(usage)
+    try:
+        return len(pickle.dumps(value, protocol=pickle.HIGHEST_PROTOCOL))
+    except Exception:
+        return sys.getsizeof(value)
+
+
+# An upstream call in progress; callers wanting the same key wait for its outcome
+class _Flight:
+    def __init__(self):
+        self.done = threading.Event()
+        self.value = None
+        self.error = None
+
+    def wait(self, timeout=None):
+        if not self.done.wait(timeout):
+            raise TimeoutError(f"Timed out after {timeout} s waiting for an identical upstream call")
+        if self.error is not None:
+            raise self.error
+        return self.value
+
+
+# Process-wide cache in front of a market data provider with per-endpoint
+# TTLs, LRU eviction by total byte size and hit/miss counters. Concurrent
+# misses on the same (endpoint, ticker, params) are coalesced: one caller
+# goes upstream and the others wait, up to flight_timeout seconds, for its
+# value or its error. Cached objects are shared between callers and must be
+# treated as read-only.
+class MarketDataCache:
+    def __init__(self, provider=None, ttls=None, max_bytes=DEFAULT_MAX_BYTES, clock=time.monotonic,
+                 flight_timeout=DEFAULT_FLIGHT_TIMEOUT):
+        self.provider = provider if provider is not None else YFinanceProvider()
+        self.ttls = dict(DEFAULT_TTLS)
+        if ttls:
+            self.ttls.update(ttls)
+        self.max_bytes = max_bytes
+        self.clock = clock
+        self.flight_timeout = flight_timeout
+        self._entries = OrderedDict()
+        self._bytes = 0
+        self._flights = {}
+        self._lock = threading.RLock()
+        self.hits = 0
+        self.misses = 0
+        self.coalesced = 0
+        self.evictions = 0
+
+    def get(self, endpoint, ticker, **params):
+        key = (endpoint, ticker.upper(), tuple(sorted(params.items())))
+        with self._lock:
+            found = self._lookup(key, self.clock())
+            if found:
+                self.hits += 1
+                return found[0]
+            self.misses += 1
+
+        return self._fetch(key, params, self.ttls.get(endpoint, 60), reuse=True)
+
+    # (value,) of a fresh entry, marked recently used, or () with any expired entry removed; call under the lock
+    def _lookup(self, key, now):
+        entry = self._entries.get(key)
+        if entry is None:
+            return ()
+        if entry[2] > now:
+            self._entries.move_to_end(key)
+            return (entry[0],)
+        self._remove(key)
+        return ()
+
+    # Claim the keys nobody is fetching yet; returns (claimed, already in flight,
+    # fresh). With reuse, keys a flight filled since the caller missed are
+    # returned as fresh values instead of being claimed.
+    def _claim(self, keys, reuse=False):
+        mine, theirs, fresh = {}, {}, {}
+        with self._lock:
+            now = self.clock()
+            for key in keys:
+                flight = self._flights.get(key)
+                found = self._lookup(key, now) if reuse and flight is None else ()
+                if found:
+                    fresh[key] = found[0]
+                elif flight is None:
+                    mine[key] = self._flights[key] = _Flight()
+                else:
+                    theirs[key] = flight
+                    self.coalesced += 1
+        return mine, theirs, fresh
+
+    # Release claimed keys and wake their waiters with the values (None if absent) or the error
+    def _land(self, flights, values=None, error=None):
+        with self._lock:
+            for key, flight in flights.items():
+                if self._flights.get(key) is flight:
+                    del self._flights[key]
+        for key, flight in flights.items():
+            flight.value = (values or {}).get(key)
+            flight.error = error
+            flight.done.set()
+
+    # Fetch outside the lock so a slow endpoint does not block other tickers,
+    # or wait for the identical call already in flight
+    def _fetch(self, key, params, ttl, reuse=False):
+        mine, theirs, fresh = self._claim([key], reuse)
+        if fresh:
+            return fresh[key]
+        if theirs:
+            return theirs[key].wait(self.flight_timeout)
+        endpoint, ticker, _ = key
+        try:
+            value = getattr(self.provider, endpoint)(ticker, **params)
+        except Exception as e:
+            self._land(mine, error=e)
+            raise
+        self.put(key, value, ttl)
+        self._land(mine, {key: value})
+        return value
+
+    # Batched lookup for endpoints whose provider method accepts a list of
+    # tickers and returns {ticker: value}; only misses go upstream, in chunks
+    def get_many(self, endpoint, tickers, batch_size=100):
+        tickers = [ticker.upper() for ticker in tickers]
+        now = self.clock()
+        found = {}
+        missing = []
+
+        with self._lock:
+            for ticker in tickers:
+                value = self._lookup((endpoint, ticker, ()), now)
+                if value:
+                    self.hits += 1
+                    found[ticker] = value[0]
+                else:
+                    self.misses += 1
+                    missing.append(ticker)
+
+        found.update(self._fetch_many(endpoint, missing, None, batch_size, reuse=True))
+        return found
+
+    # Fetch and store a value whatever is cached, e.g. from a background
+    # refresher; a ttl longer than the refresh period keeps readers hitting
+    def refresh(self, endpoint, ticker, ttl=None, **params):
+        key = (endpoint, ticker.upper(), tuple(sorted(params.items())))
+        return self._fetch(key, params, ttl if ttl is not None else self.ttls.get(endpoint, 60))
+
+    # Batched counterpart of refresh, in chunks of batch_size tickers. Tickers
+    # another caller is already fetching are awaited rather than requested again.
+    def refresh_many(self, endpoint, tickers, ttl=None, batch_size=100):
+        return self._fetch_many(endpoint, tickers, ttl, batch_size)
+
+    def _fetch_many(self, endpoint, tickers, ttl, batch_size, reuse=False):
+        fetch_many = getattr(self.provider, endpoint)
+        ttl = ttl if ttl is not None else self.ttls.get(endpoint, 60)
+        keys = {(endpoint, ticker.upper(), ()): ticker.upper() for ticker in tickers}
+        mine, theirs, fresh = self._claim(keys, reuse)
+        claimed = [keys[key] for key in mine]
+        found = {keys[key]: value for key, value in fresh.items()}
+
+        try:
+            for start in range(0, len(claimed), batch_size):
+                chunk = claimed[start:start + batch_size]
+                landed = {}
+                for ticker, value in fetch_many(chunk).items():
+                    key = (endpoint, ticker.upper(), ())
+                    self.put(key, value, ttl)
+                    landed[key] = value
+                    found[ticker.upper()] = value
+                self._land({(endpoint, ticker, ()): mine[(endpoint, ticker, ())] for ticker in chunk}, landed)
+        except Exception as e:
+            self._land({key: flight for key, flight in mine.items() if not flight.done.is_set()}, error=e)
+            raise
+
+        # One deadline for all awaited tickers, so several hung flights do not add up
+        deadline = time.monotonic() + self.flight_timeout
+        for key, flight in theirs.items():
+            try:
+                value = flight.wait(max(deadline - time.monotonic(), 0))
+            except Exception:
+                continue
+            if value is not None:
+                found[keys[key]] = value
+        return found
+
+    # Cached values for the tickers without going upstream, expired ones
+    # included; tickers never fetched are left out
+    def peek_many(self, endpoint, tickers, **params):
+        params = tuple(sorted(params.items()))
+        found = {}
+        with self._lock:
+            for ticker in tickers:
+                entry = self._entries.get((endpoint, ticker.upper(), params))
+                if entry is not None:
+                    self._entries.move_to_end((endpoint, ticker.upper(), params))
+                    self.hits += 1
+                    found[ticker.upper()] = entry[0]
+                else:
+                    self.misses += 1
+        return found
+
+    def put(self, key, value, ttl):
+        size = estimate_size(value)
+        with self._lock:
+            if key in self._entries:
+                self._remove(key)
+            if size > self.max_bytes:
+                return
+            self._entries[key] = (value, size, self.clock() + ttl)
+            self._bytes += size
+            while self._bytes > self.max_bytes:
+                oldest = next(iter(self._entries))
+                self._remove(oldest)
+                self.evictions += 1
+
+    def _remove(self, key):
+        _, size, _ = self._entries.pop(key)
+        self._bytes -= size
+
+    def invalidate(self, ticker=None):
+        with self._lock:
+            for key in list(self._entries):
+                if ticker is None or key[1] == ticker.upper():
+                    self._remove(key)
+
+    def stats(self):
+        with self._lock:
+            lookups = self.hits + self.misses
+            return {
+                "entries": len(self._entries),
+                "bytes": self._bytes,
+                "max_bytes": self.max_bytes,
+                "hits": self.hits,
+                "misses": self.misses,
+                "coalesced": self.coalesced,
+                "evictions": self.evictions,
+                "hit_rate": self.hits / lookups if lookups else 0.0,
+            }
+
+    # Endpoint helpers mirroring the yfinance Ticker attributes used by the app
+    def info(self, ticker):
+        return self.get("info", ticker)
+
+    def history(self, ticker, period="1y", interval="1d"):
+        return self.get("history", ticker, period=period, interval=interval)
+
+    def income_stmt(self, ticker):
+        return self.get("income_stmt", ticker)
+
+    def balance_sheet(self, ticker):
+        return self.get("balance_sheet", ticker)
+
+    def cashflow(self, ticker):
+        return self.get("cashflow", ticker)
+
+    def news(self, ticker):
+        return self.get("news", ticker)
+
+
+def benchmark(n_sessions=50, latency=0.2):
+    from concurrent.futures import ThreadPoolExecutor
+
+    # Provider with a fixed network latency per call, counting upstream calls
+    class SlowProvider:
+        def __init__(self):
+            self.calls = 0
+            self._lock = threading.Lock()
+
+        def info(self, ticker):
+            with self._lock:
+                self.calls += 1
+            time.sleep(latency)
+            return {"longName": ticker}
+
+    provider = SlowProvider()
+    cache = MarketDataCache(provider=provider)
+    barrier = threading.Barrier(n_sessions)
+
+    # Every session opens Stock Analysis on the default ticker at the same moment
+    def open_page(_):
+        barrier.wait()
+        return cache.info("AAPL")
+
+    start = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=n_sessions) as executor:
+        list(executor.map(open_page, range(n_sessions)))
+    elapsed = time.perf_counter() - start
+
+    stats = cache.stats()
+    print(f"{n_sessions} concurrent sessions, {latency * 1000:.0f} ms upstream: {provider.calls} upstream call(s) "
+          f"instead of {n_sessions}, {stats['coalesced']} coalesced, all served in {elapsed * 1000:.0f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,133 @@
+import io
+import multiprocessing
+import os
+import re
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import pandas as pd
+from pypdf import PdfReader
+from pypdf.errors import PdfReadError
+
+from ingest import HOLDINGS_COLUMNS, NON_POSITION_TICKERS, ImportResult, UnrecognizedStatementError, combine_lots
+
+PAGES_PER_TASK = 8
+MIN_PAGES_FOR_POOL = 32
+
+# Brokerage names as they appear on statement pages
+BROKERAGE_NAMES = {
+    "Charles Schwab": "Schwab",
+    "Interactive Brokers": "Interactive Brokers",
+    "Robinhood": "Robinhood",
+    "TD Ameritrade": "TD Ameritrade",
+    "Fidelity": "Fidelity",
+    "E*TRADE": "E*TRADE",
+}
+
+TICKER = re.compile(r"^[A-Z]{1,5}(?:[.\-][A-Z]{1,2})?$")
+NUMBER = re.compile(r"^\(?[-+]?\$?\d[\d,]*(?:\.\d+)?\)?%?$")
+
+# Reader over the statement in a pool worker, opened once per worker process
+_reader = None
+
+
+def _open_reader(pdf_bytes):
+    global _reader
+    _reader = PdfReader(io.BytesIO(pdf_bytes))
+
+
+# A leading "-" survives the strip and float(); only accounting parentheses need negating
+def _number(token):
+    value = float(token.strip("()%$+").replace("$", "").replace(",", ""))
+    return -value if token.startswith("(") else value
+
+
+# Position rows from a page of text. A line is a position when it starts with
+# a ticker and carries quantity, price and market value that agree with each
+# other; cost basis and gain/loss are picked up when present.
+def parse_positions(text):
+    positions = []
+    for line in text.splitlines():
+        tokens = line.split()
+        if len(tokens) < 4 or not TICKER.match(tokens[0]) or tokens[0] in NON_POSITION_TICKERS:
+            continue
+        numbers = [_number(token) for token in tokens[1:] if NUMBER.match(token) and not token.endswith("%")]
+        percents = [_number(token) for token in tokens[1:] if NUMBER.match(token) and token.endswith("%")]
+        if len(numbers) < 3:
+            continue
+        quantity, price, market_value = numbers[:3]
+        if abs(quantity * price - market_value) > 0.02 * abs(market_value) + 0.01:
+            continue
+        cost_basis = numbers[3] if len(numbers) > 3 else float("nan")
+        positions.append({
+            "ticker": tokens[0],
+            "quantity": quantity,
+            "cost_basis": cost_basis,
+            "market_value": market_value,
+            "day_change_pct": percents[0] if percents else 0.0,
+            "total_gain_loss": numbers[4] if len(numbers) > 4 else market_value - cost_basis,
+        })
+    return positions
+
+
+def _parse_pages(reader, start, stop):
+    positions = []
+    for number in range(start, stop):
+        positions.extend(parse_positions(reader.pages[number].extract_text() or ""))
+    return stop - start, positions
+
+
+def _parse_worker_pages(start, stop):
+    return _parse_pages(_reader, start, stop)
+
+
+def detect_pdf_brokerage(text):
+    for name, account in BROKERAGE_NAMES.items():
+        if name.lower() in text.lower():
+            return account
+    raise UnrecognizedStatementError("Could not detect the brokerage from the statement")
+
+
+# Extract positions from a PDF statement. Large statements are split into
+# page ranges parsed in a process pool; each worker loads the document once.
+# progress(pages_done, page_count) is called as ranges complete.
+def import_pdf(file, progress=None, workers=None, pages_per_task=PAGES_PER_TASK):
+    started = time.perf_counter()
+    pdf_bytes = file.read()
+    # Each import reads through its own reader, so concurrent sessions never share one
+    try:
+        reader = PdfReader(io.BytesIO(pdf_bytes))
+    except PdfReadError as e:
+        raise UnrecognizedStatementError("The file is not a readable PDF statement") from e
+    page_count = len(reader.pages)
+    if not page_count:
+        raise UnrecognizedStatementError("The statement has no pages")
+    brokerage = detect_pdf_brokerage(reader.pages[0].extract_text() or "")
+
+    ranges = [(start, min(start + pages_per_task, page_count)) for start in range(0, page_count, pages_per_task)]
+    workers = min(workers or os.cpu_count() or 1, len(ranges))
+    found_by_range = {}
+    pages_done = 0
+
+    if page_count < MIN_PAGES_FOR_POOL or workers < 2:
+        for start, stop in ranges:
+            done, found_by_range[start] = _parse_pages(reader, start, stop)
+            pages_done += done
+            if progress is not None:
+                progress(pages_done, page_count)
+    else:
+        # Spawned workers avoid forking the threads of a running server
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_open_reader, initargs=(pdf_bytes,)) as pool:
+            futures = {pool.submit(_parse_worker_pages, start, stop): start for start, stop in ranges}
+            for future in as_completed(futures):
+                done, found_by_range[futures[future]] = future.result()
+                pages_done += done
+                if progress is not None:
+                    progress(pages_done, page_count)
+
+    # Keep statement order regardless of which range finished first
+    positions = [position for start, _ in ranges for position in found_by_range[start]]
+    holdings = pd.DataFrame(positions, columns=HOLDINGS_COLUMNS)
+    holdings["total_gain_loss"] = holdings["total_gain_loss"].fillna(holdings["market_value"] - holdings["cost_basis"])
+    return ImportResult(brokerage, combine_lots(holdings), page_count, time.perf_counter() - started, pages=page_count)
@@ -0,0 +1,134 @@
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+
+TIMERANGES = ["5D", "1M", "6M", "YTD", "1Y", "All"]
+
+DEFAULT_MAX_CURVES = 64
+
+
+# Daily time-weighted returns of a book of positions. A return on day t is
+# earned by the shares held at the close of t-1, so buys and sells on day t
+# are treated as external cash flows and do not count as performance.
+def portfolio_returns(closes, quantities):
+    prices = closes.ffill().fillna(0.0).to_numpy(dtype=np.float64)
+    held = quantities.reindex(index=closes.index, columns=closes.columns).ffill().fillna(0.0)
+    held = held.to_numpy(dtype=np.float64)[:-1]
+
+    # Only count positions priced on both days so listings/delistings are neutral
+    priced = (prices[:-1] > 0) & (prices[1:] > 0)
+    start_value = np.where(priced, held * prices[:-1], 0.0).sum(axis=1)
+    end_value = np.where(priced, held * prices[1:], 0.0).sum(axis=1)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        returns = np.where(start_value > 0, end_value / start_value - 1, 0.0)
+    return pd.Series(returns, index=closes.index[1:])
+
+
+# Constant holdings expressed as a quantity frame over the given dates
+def constant_quantities(index, quantities):
+    return pd.DataFrame([quantities] * len(index), index=index)
+
+
+def range_start(index, timerange):
+    last = index[-1]
+    if timerange == "5D":
+        return index[max(len(index) - 5, 0)]
+    if timerange == "1M":
+        start = last - pd.DateOffset(months=1)
+    elif timerange == "6M":
+        start = last - pd.DateOffset(months=6)
+    elif timerange == "YTD":
+        start = pd.Timestamp(year=last.year, month=1, day=1, tz=last.tz) - pd.Timedelta(days=1)
+    elif timerange == "1Y":
+        start = last - pd.DateOffset(years=1)
+    else:
+        return index[0]
+    # Anchor on the last close at or before the nominal start date
+    position = max(index.searchsorted(start, side="right") - 1, 0)
+    return index[position]
+
+
+# Indexed value curves per portfolio, built once from inception and then
+# extended with only the new trading days. Range views are rebased to 100
+# and cached until the underlying curve grows. Keys include the portfolio
+# version, so curves of superseded versions age out least recently used first.
+class PerformanceEngine:
+    def __init__(self, max_curves=DEFAULT_MAX_CURVES):
+        self.max_curves = max_curves
+        self._curves = OrderedDict()
+        self._ranges = {}
+        self._lock = threading.Lock()
+
+    def update(self, key, closes, quantities):
+        closes = closes.sort_index()
+        with self._lock:
+            curve = self._curves.get(key)
+            if curve is not None and curve.index[0] == closes.index[0] and closes.index[-1] >= curve.index[-1]:
+                last_date = curve.index[-1]
+                tail = closes.loc[last_date:]
+                if len(tail) <= 1:
+                    self._curves.move_to_end(key)
+                    return curve
+                # Extend from the last stored close instead of recomputing from inception
+                growth = (1 + portfolio_returns(tail, quantities.loc[last_date:])).cumprod()
+                curve = pd.concat([curve, curve.iloc[-1] * growth])
+            else:
+                growth = (1 + portfolio_returns(closes, quantities)).cumprod()
+                curve = pd.concat([pd.Series([100.0], index=closes.index[:1]), 100.0 * growth])
+
+            self._curves[key] = curve
+            self._curves.move_to_end(key)
+            self._ranges = {k: v for k, v in self._ranges.items() if k[0] != key}
+            while len(self._curves) > self.max_curves:
+                evicted, _ = self._curves.popitem(last=False)
+                self._ranges = {k: v for k, v in self._ranges.items() if k[0] != evicted}
+            return curve
+
+    def curve(self, key, timerange="1Y"):
+        with self._lock:
+            full = self._curves[key]
+            self._curves.move_to_end(key)
+            cache_key = (key, timerange)
+            cached = self._ranges.get(cache_key)
+            if cached is not None and cached.index[-1] == full.index[-1]:
+                return cached
+            window = full.loc[range_start(full.index, timerange):]
+            window = window / window.iloc[0] * 100
+            self._ranges[cache_key] = window
+            return window
+
+
+def benchmark(years=(10, 20), n_tickers=500):
+    rng = np.random.default_rng(0)
+    for n_years in years:
+        index = pd.bdate_range(end="2025-01-01", periods=252 * n_years)
+        closes = pd.DataFrame(
+            100 * np.exp(np.cumsum(rng.normal(0.0003, 0.02, (len(index), n_tickers)), axis=0)),
+            index=index, columns=[f"T{i:03d}" for i in range(n_tickers)]
+        )
+        quantities = constant_quantities(index, dict(zip(closes.columns, rng.integers(1, 100, n_tickers))))
+
+        engine = PerformanceEngine()
+        start = time.perf_counter()
+        engine.update("bench", closes.iloc[:-1], quantities)
+        full = time.perf_counter() - start
+
+        start = time.perf_counter()
+        engine.update("bench", closes, quantities)
+        incremental = time.perf_counter() - start
+
+        start = time.perf_counter()
+        for timerange in TIMERANGES:
+            engine.curve("bench", timerange)
+        ranges = time.perf_counter() - start
+
+        print(f"{n_years} years x {n_tickers} tickers: full build {full * 1000:7.1f} ms | "
+              f"one-day extend {incremental * 1000:6.1f} ms | all ranges {ranges * 1000:5.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
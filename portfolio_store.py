@@ -0,0 +1,204 @@
+import json
+import os
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.feather as feather
+
+from ingest import HOLDINGS_COLUMNS
+
+COMBINED = "Combined"
+
+
+def _summarize(holdings, realized_gain=0):
+    market_value = float(holdings["market_value"].sum())
+    cost_basis = float(holdings["cost_basis"].sum())
+    # Day change is value-weighted through each position's previous value
+    previous_value = float((holdings["market_value"] / (1 + holdings["day_change_pct"] / 100)).sum())
+    return {
+        "symbols": int(holdings["ticker"].nunique()),
+        "cost_basis": cost_basis,
+        "market_value": market_value,
+        "day_change_pct": (market_value / previous_value - 1) * 100 if previous_value > 0 else 0.0,
+        "unrealized_gain": market_value - cost_basis,
+        "realized_gain": realized_gain,
+    }
+
+
+# On-disk portfolio store: one uncompressed Arrow IPC (Feather v2) file of
+# holdings per account, read back memory-mapped, plus a JSON manifest of
+# account summaries. The Combined portfolio and its summary are materialized
+# whenever an account is written, so reads never rebuild it.
+class PortfolioStore:
+    def __init__(self, root):
+        self.root = root
+        self._lock = threading.Lock()
+        os.makedirs(os.path.join(root, "holdings"), exist_ok=True)
+        self._manifest_mtime = None
+        self._manifest = self._read_manifest()
+
+    # Manifest as last written by any process sharing the store directory
+    def _current(self):
+        try:
+            mtime = os.stat(self._manifest_path()).st_mtime_ns
+        except FileNotFoundError:
+            return self._manifest
+        if mtime != self._manifest_mtime:
+            self._manifest = self._read_manifest()
+        return self._manifest
+
+    @property
+    def version(self):
+        return self._current()["version"]
+
+    def accounts(self):
+        return list(self._current()["accounts"])
+
+    def realized_gains(self):
+        return {account: summary["realized_gain"] for account, summary in self._current()["accounts"].items()}
+
+    def _manifest_path(self):
+        return os.path.join(self.root, "manifest.json")
+
+    def _holdings_path(self, account):
+        slug = re.sub(r"[^a-z0-9]+", "_", account.lower()).strip("_")
+        return os.path.join(self.root, "holdings", f"{slug}.arrow")
+
+    def _read_manifest(self):
+        try:
+            with open(self._manifest_path()) as f:
+                self._manifest_mtime = os.fstat(f.fileno()).st_mtime_ns
+                return json.load(f)
+        except FileNotFoundError:
+            return {"version": 0, "accounts": {}, "combined": None}
+
+    # Write to a temporary file and rename so readers never see partial files
+    def _atomic_write(self, path, write):
+        temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+        write(temporary)
+        os.replace(temporary, path)
+
+    def _write_holdings(self, account, holdings):
+        table = pa.Table.from_pandas(holdings, preserve_index=False)
+        self._atomic_write(
+            self._holdings_path(account),
+            lambda path: feather.write_feather(table, path, compression="uncompressed")
+        )
+
+    # Without a realized gain, the one already stored for the account is kept
+    def save_account(self, account, holdings, realized_gain=None):
+        self.save_accounts({account: (holdings, realized_gain)})
+
+    # Write several accounts, then rebuild Combined and the manifest once
+    def save_accounts(self, accounts):
+        with self._lock:
+            manifest = self._read_manifest()
+            for account, (holdings, realized_gain) in accounts.items():
+                frame = pd.DataFrame({
+                    "ticker": holdings["ticker"].astype(str).to_numpy(),
+                    **{column: holdings[column].to_numpy(dtype=np.float64) for column in HOLDINGS_COLUMNS[1:]}
+                })
+                self._write_holdings(account, frame)
+                if realized_gain is None:
+                    realized_gain = manifest["accounts"].get(account, {}).get("realized_gain", 0)
+                manifest["accounts"][account] = _summarize(frame, realized_gain)
+
+            self._commit(manifest)
+
+    # Rematerialize Combined from the accounts in the manifest, then publish the manifest
+    def _commit(self, manifest):
+        if manifest["accounts"]:
+            parts = []
+            for account in manifest["accounts"]:
+                part = self._read_holdings(account)
+                part["account"] = account
+                parts.append(part)
+            combined = pd.concat(parts, ignore_index=True)
+            self._write_holdings(COMBINED, combined)
+            manifest["combined"] = _summarize(
+                combined, sum(summary["realized_gain"] for summary in manifest["accounts"].values())
+            )
+        else:
+            manifest["combined"] = None
+
+        manifest["version"] += 1
+        manifest["updated_at"] = time.time()
+        self._atomic_write(self._manifest_path(), lambda path: self._dump(manifest, path))
+        self._manifest = manifest
+
+    def _dump(self, manifest, path):
+        with open(path, "w") as f:
+            json.dump(manifest, f)
+
+    def _read_holdings(self, account):
+        table = feather.read_table(self._holdings_path(account), memory_map=True)
+        return table.to_pandas(split_blocks=True)
+
+    def delete_account(self, account):
+        with self._lock:
+            manifest = self._read_manifest()
+            if account not in manifest["accounts"]:
+                return
+            del manifest["accounts"][account]
+            self._commit(manifest)
+            os.remove(self._holdings_path(account))
+
+    def load_holdings(self, account):
+        return self._read_holdings(account)
+
+    # Summaries and holdings frames in the layout consumed by the dashboard pages
+    def load_portfolio_data(self):
+        manifest = self._current()
+        portfolio_data = {}
+        for account, summary in manifest["accounts"].items():
+            portfolio_data[account] = dict(summary, holdings=self._read_holdings(account))
+        if manifest["combined"] is not None:
+            portfolio_data[COMBINED] = dict(manifest["combined"], holdings=self._read_holdings(COMBINED))
+        return portfolio_data
+
+
+def benchmark(n_lots=50_000, n_accounts=3, root=None):
+    import tempfile
+
+    rng = np.random.default_rng(0)
+    root = root or tempfile.mkdtemp()
+    store = PortfolioStore(root)
+    accounts = {}
+    for a in range(n_accounts):
+        n = n_lots // n_accounts
+        market_value = rng.uniform(100, 10_000, n)
+        cost_basis = market_value * rng.uniform(0.7, 1.3, n)
+        accounts[f"Account {a}"] = (pd.DataFrame({
+            "ticker": [f"T{i:05d}" for i in rng.integers(0, 60_000, n)],
+            "quantity": rng.integers(1, 500, n).astype(float),
+            "cost_basis": cost_basis,
+            "market_value": market_value,
+            "day_change_pct": rng.normal(0, 1.5, n),
+            "total_gain_loss": market_value - cost_basis,
+        }), 0)
+
+    start = time.perf_counter()
+    store.save_accounts(accounts)
+    write = time.perf_counter() - start
+
+    start = time.perf_counter()
+    data = PortfolioStore(root).load_portfolio_data()
+    read = time.perf_counter() - start
+
+    records = {account: frame.to_dict("records") for account, (frame, _) in accounts.items()}
+    start = time.perf_counter()
+    [pd.DataFrame(holdings) for holdings in records.values()]
+    pd.DataFrame([holding for holdings in records.values() for holding in holdings])
+    rebuild = time.perf_counter() - start
+
+    print(f"{n_lots:,} lots: write + materialize Combined {write * 1000:.0f} ms | "
+          f"memory-mapped load of all accounts {read * 1000:.0f} ms | "
+          f"dict rebuild {rebuild * 1000:.0f} ms ({len(data[COMBINED]['holdings']):,} combined rows)")
+
+
+if __name__ == "__main__":
+    benchmark()
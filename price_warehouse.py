@@ -0,0 +1,270 @@
+import os
+import re
+import shutil
+import threading
+import time
+import zlib
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import pyarrow.parquet as pq
+
+# Seconds before a ticker's stored bars are topped up again from upstream
+DEFAULT_REFRESH_AFTER = 5 * 60
+
+# Trailing windows of the periods accepted by yfinance, in daily bars (ints)
+# or calendar offsets from the last bar
+PERIODS = {
+    "1d": 1,
+    "5d": 5,
+    "1mo": pd.DateOffset(months=1),
+    "3mo": pd.DateOffset(months=3),
+    "6mo": pd.DateOffset(months=6),
+    "1y": pd.DateOffset(years=1),
+    "2y": pd.DateOffset(years=2),
+    "5y": pd.DateOffset(years=5),
+    "10y": pd.DateOffset(years=10),
+    "ytd": "ytd",
+    "max": None,
+}
+
+# Intervals built from daily bars: consecutive groups of bars (ints) or
+# calendar buckets labelled by their first day, as yfinance labels them
+INTERVALS = {
+    "1d": None,
+    "5d": 5,
+    "1wk": "W-MON",
+    "1mo": "MS",
+    "3mo": "QS",
+}
+
+# Columns that merge into a coarser bar other than by keeping the last value
+AGGREGATIONS = {"Open": "first", "High": "max", "Low": "min", "Close": "last", "Volume": "sum",
+                "Dividends": "sum", "Stock Splits": "max", "Capital Gains": "sum"}
+
+# Events after which yfinance's adjusted history changes retroactively
+CORPORATE_ACTIONS = ["Dividends", "Stock Splits"]
+
+
+# Bars of the trailing period ending at the last bar
+def select_period(bars, period):
+    window = PERIODS[period]
+    if window is None or bars.empty:
+        return bars
+    if isinstance(window, int):
+        return bars.iloc[-window:]
+    last = bars.index[-1]
+    start = last.replace(month=1, day=1) if window == "ytd" else last - window
+    return bars[bars.index >= start.normalize()]
+
+
+# Daily bars merged into the bars of a coarser interval
+def resample_bars(bars, interval):
+    rule = INTERVALS[interval]
+    if rule is None or bars.empty:
+        return bars
+    aggregations = {column: AGGREGATIONS.get(column, "last") for column in bars.columns}
+    if isinstance(rule, int):
+        groups = np.arange(len(bars)) // rule
+        merged = bars.groupby(groups).agg(aggregations)
+        merged.index = bars.index[::rule]
+        return merged
+    merged = bars.resample(rule, closed="left", label="left").agg(aggregations)
+    return merged[merged["Close"].notna()] if "Close" in merged.columns else merged.dropna(how="all")
+
+
+# Local OHLCV warehouse in front of a market data provider. Daily bars are
+# kept per ticker as one Parquet file per year, so a top-up rewrites only the
+# current year. The first request for a ticker downloads its full daily
+# history; later ones download only the bars since the last stored one
+# (which may have been an unfinished session) and at most every
+# refresh_after seconds. Any period and daily-or-coarser interval is cut and
+# resampled locally; intraday intervals go straight to the provider, as do
+# the provider's other endpoints.
+class PriceWarehouse:
+    def __init__(self, root, provider, refresh_after=DEFAULT_REFRESH_AFTER, clock=time.monotonic):
+        self.root = root
+        self.provider = provider
+        self.refresh_after = refresh_after
+        self.clock = clock
+        self._bars = {}
+        self._synced = {}
+        self._locks = {}
+        self._lock = threading.Lock()
+        self.upstream_calls = 0
+        self.upstream_bars = 0
+        os.makedirs(root, exist_ok=True)
+
+    def __getattr__(self, name):
+        return getattr(self.provider, name)
+
+    def _ticker_dir(self, ticker):
+        return os.path.join(self.root, re.sub(r"[^A-Z0-9.^-]+", "_", ticker))
+
+    # One lock per ticker, so tickers sync in parallel but never twice at once
+    def _ticker_lock(self, ticker):
+        with self._lock:
+            return self._locks.setdefault(ticker, threading.Lock())
+
+    def _read(self, ticker):
+        directory = self._ticker_dir(ticker)
+        if not os.path.isdir(directory):
+            return None
+        files = sorted(name for name in os.listdir(directory) if name.endswith(".parquet"))
+        if not files:
+            return None
+        return pd.concat([pq.read_table(os.path.join(directory, name)).to_pandas() for name in files])
+
+    # Rewrite the year files holding the given years, atomically, and drop files of other years if asked
+    def _write(self, ticker, bars, years, prune=False):
+        directory = self._ticker_dir(ticker)
+        os.makedirs(directory, exist_ok=True)
+        for year in sorted(years):
+            path = os.path.join(directory, f"{year}.parquet")
+            temporary = f"{path}.{os.getpid()}.{threading.get_ident()}.tmp"
+            pq.write_table(pa.Table.from_pandas(bars[bars.index.year == year]), temporary)
+            os.replace(temporary, path)
+        if prune:
+            for name in os.listdir(directory):
+                if name.endswith(".parquet") and int(name.split(".")[0]) not in years:
+                    os.remove(os.path.join(directory, name))
+
+    def _fetch(self, ticker, **params):
+        self.upstream_calls += 1
+        bars = self.provider.history(ticker, interval="1d", **params)
+        self.upstream_bars += len(bars)
+        return bars
+
+    # Stored daily bars of a ticker, topped up from upstream when due
+    def _sync(self, ticker):
+        with self._ticker_lock(ticker):
+            now = self.clock()
+            bars = self._bars.get(ticker)
+            if bars is not None and now - self._synced[ticker] < self.refresh_after:
+                return bars
+            if bars is None:
+                bars = self._read(ticker)
+
+            try:
+                if bars is None or bars.empty:
+                    bars = self._fetch(ticker, period="max")
+                    if not bars.empty:
+                        self._write(ticker, bars, set(bars.index.year), prune=True)
+                else:
+                    last = bars.index[-1]
+                    tail = self._fetch(ticker, start=last.strftime("%Y-%m-%d"))
+                    new = tail[tail.index > last]
+                    actions = [column for column in CORPORATE_ACTIONS if column in new.columns]
+                    if actions and new[actions].to_numpy().any():
+                        # A split or dividend re-adjusts every earlier bar, so start over
+                        bars = self._fetch(ticker, period="max")
+                        self._write(ticker, bars, set(bars.index.year), prune=True)
+                    elif not tail.empty:
+                        bars = pd.concat([bars[bars.index < tail.index[0]], tail])
+                        self._write(ticker, bars, set(tail.index.year))
+            except Exception:
+                # Stored bars are still right up to their last day; without any, report the failure
+                if bars is None or bars.empty:
+                    raise
+
+            self._bars[ticker] = bars
+            self._synced[ticker] = now
+            return bars
+
+    def history(self, ticker, period="1y", interval="1d", start=None):
+        if start is not None or period not in PERIODS or interval not in INTERVALS:
+            return self.provider.history(ticker, period=period, interval=interval, start=start)
+        return resample_bars(select_period(self._sync(ticker.upper()), period), interval)
+
+    # Forget a ticker's bars, e.g. after a symbol change, so the next request downloads them afresh
+    def invalidate(self, ticker):
+        ticker = ticker.upper()
+        with self._ticker_lock(ticker):
+            self._bars.pop(ticker, None)
+            self._synced.pop(ticker, None)
+            shutil.rmtree(self._ticker_dir(ticker), ignore_errors=True)
+
+    def stats(self):
+        return {"tickers": len(self._bars), "upstream_calls": self.upstream_calls, "upstream_bars": self.upstream_bars}
+
+
+# Deterministic daily bars from a fixed inception up to a settable last day,
+# standing in for yfinance in benchmarks and offline runs
+class FakeHistoryProvider:
+    def __init__(self, end, inception="2010-01-04"):
+        self.inception = inception
+        self.end = pd.Timestamp(end)
+        self.calls = 0
+        self._bars = {}
+
+    def _generate(self, ticker):
+        index = pd.bdate_range(self.inception, periods=10_000, tz="America/New_York")
+        rng = np.random.default_rng(zlib.crc32(ticker.encode()))
+        close = 50 * np.exp(np.cumsum(rng.normal(0.0003, 0.015, len(index))))
+        spread = close * rng.uniform(0.002, 0.02, len(index))
+        return pd.DataFrame({
+            "Open": close * (1 + rng.normal(0, 0.005, len(index))), "High": close + spread,
+            "Low": close - spread, "Close": close, "Volume": rng.integers(100_000, 10_000_000, len(index)),
+            "Dividends": 0.0, "Stock Splits": 0.0,
+        }, index=index)
+
+    def history(self, ticker, period="1y", interval="1d", start=None):
+        self.calls += 1
+        if ticker not in self._bars:
+            self._bars[ticker] = self._generate(ticker)
+        bars = self._bars[ticker]
+        bars = bars.iloc[:bars.index.searchsorted(self.end.tz_localize(bars.index.tz), side="right")]
+        if start is not None:
+            return bars.iloc[bars.index.searchsorted(pd.Timestamp(start, tz=bars.index.tz)):]
+        return resample_bars(select_period(bars, period), interval)
+
+
+def benchmark(n_tickers=20, n_days=5, root=None):
+    import tempfile
+
+    root = root or tempfile.mkdtemp()
+    requests = [(period, interval) for period in ["1mo", "6mo", "1y", "5y", "max"] for interval in ["1d", "1wk", "1mo"]]
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+    day = pd.Timestamp("2025-01-02")
+
+    # Every request downloads its whole range, every day
+    direct = FakeHistoryProvider(day)
+    direct_bars = 0
+    for offset in range(n_days):
+        direct.end = day + pd.offsets.BDay(offset)
+        for ticker in tickers:
+            for period, interval in requests:
+                direct_bars += len(direct.history(ticker, period=period, interval=interval))
+
+    # The warehouse downloads each history once, then one tail per ticker per day
+    provider = FakeHistoryProvider(day)
+    clock = [0.0]
+    warehouse = PriceWarehouse(root, provider, clock=lambda: clock[0])
+    for offset in range(n_days):
+        provider.end = day + pd.offsets.BDay(offset)
+        clock[0] += 24 * 60 * 60
+        for ticker in tickers:
+            for period, interval in requests:
+                warehouse.history(ticker, period=period, interval=interval)
+
+    reopened = PriceWarehouse(root, provider)
+    start = time.perf_counter()
+    for ticker in tickers:
+        reopened.history(ticker, period="1y")
+    cold = (time.perf_counter() - start) / n_tickers
+    start = time.perf_counter()
+    for ticker in tickers:
+        for period, interval in requests:
+            reopened.history(ticker, period=period, interval=interval)
+    warm = (time.perf_counter() - start) / (n_tickers * len(requests))
+
+    print(f"{n_tickers} tickers x {len(requests)} period/interval views x {n_days} days: "
+          f"downloading every view {direct.calls:,} upstream calls, {direct_bars:,} bars | "
+          f"warehouse {warehouse.upstream_calls:,} calls, {warehouse.upstream_bars:,} bars")
+    print(f"  new process: first view {cold * 1000:.1f} ms per ticker (Parquet read + tail top-up) | "
+          f"later views {warm * 1000:.2f} ms each, cut and resampled locally | {reopened.stats()}")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,223 @@
+import multiprocessing
+import os
+import time
+from concurrent.futures import ProcessPoolExecutor, as_completed
+
+import numpy as np
+import pandas as pd
+
+from risk import TRADING_DAYS
+from scenarios import PERCENTILES, ScenarioEngine
+
+CHUNK_PATHS = 4096
+HISTOGRAM_BINS = 2048
+MIN_CHUNKS_FOR_POOL = 4
+
+# Each day's histogram spans the expected log return +/- this many standard deviations of the book
+HISTOGRAM_SPREAD = 8.0
+
+# Model and buffers of a worker process, set up once per worker
+_model = None
+_workspace = None
+
+
+# What a path simulation needs: mean daily log returns and the Cholesky
+# factor of their covariance per holding, the dollar value held in each, and
+# the grid of the per-day histograms of log(value / value today) in which
+# simulated book values are counted
+class PathModel:
+    def __init__(self, mean, factor, values, horizon=TRADING_DAYS, bins=HISTOGRAM_BINS, spread=HISTOGRAM_SPREAD):
+        self.mean = np.asarray(mean, dtype=np.float32)
+        self.factor_t = np.ascontiguousarray(np.asarray(factor, dtype=np.float32).T)
+        self.values = np.asarray(values, dtype=np.float32)
+        self.start = float(np.sum(values))
+        self.horizon = horizon
+        self.bins = bins
+
+        weights = np.asarray(values, dtype=np.float64) / self.start
+        drift = weights @ np.asarray(mean, dtype=np.float64)
+        volatility = max(np.linalg.norm(np.asarray(factor, dtype=np.float64).T @ weights), 1e-6)
+        days = np.arange(1, horizon + 1)
+        self.low = days * drift - spread * volatility * np.sqrt(days)
+        self.width = 2 * spread * volatility * np.sqrt(days) / bins
+
+
+# Buffers for one chunk of paths, allocated once and reused for every chunk and day
+class _Workspace:
+    def __init__(self, n_paths, n_assets):
+        self.normals = np.empty((n_paths, n_assets), dtype=np.float32)
+        self.growth = np.empty((n_paths, n_assets), dtype=np.float32)
+        self.prices = np.empty((n_paths, n_assets), dtype=np.float32)
+        self.values = np.empty(n_paths, dtype=np.float32)
+        self.position = np.empty(n_paths, dtype=np.float64)
+        self.bins = np.empty(n_paths, dtype=np.intp)
+
+    def fits(self, n_paths, n_assets):
+        return self.normals.shape[0] >= n_paths and self.normals.shape[1] == n_assets
+
+    @property
+    def nbytes(self):
+        return sum(buffer.nbytes for buffer in vars(self).values())
+
+
+# Histogram counts per day, daily sums of book values and the number of values
+# beyond the histogram's range for n_paths paths drawn from seed
+def simulate_chunk(model, workspace, seed, n_paths):
+    rng = np.random.default_rng(seed)
+    normals, growth, prices = (buffer[:n_paths] for buffer in (workspace.normals, workspace.growth, workspace.prices))
+    values, position, bins = workspace.values[:n_paths], workspace.position[:n_paths], workspace.bins[:n_paths]
+    counts = np.zeros((model.horizon, model.bins), dtype=np.int32)
+    sums = np.zeros(model.horizon)
+    clipped = 0
+
+    prices.fill(1.0)
+    for day in range(model.horizon):
+        rng.standard_normal(out=normals, dtype=np.float32)
+        np.matmul(normals, model.factor_t, out=growth)
+        growth += model.mean
+        np.exp(growth, out=growth)
+        prices *= growth
+        np.matmul(prices, model.values, out=values)
+        sums[day] = values.sum(dtype=np.float64)
+
+        # Bin of each path's log return so far on this day's grid
+        np.divide(values, model.start, out=position)
+        np.log(position, out=position)
+        position -= model.low[day]
+        position /= model.width[day]
+        np.floor(position, out=position)
+        clipped += int(np.count_nonzero((position < 0) | (position >= model.bins)))
+        np.clip(position, 0, model.bins - 1, out=position)
+        bins[:] = position
+        counts[day] += np.bincount(bins, minlength=model.bins).astype(np.int32)
+    return counts, sums, clipped
+
+
+def _load_model(model, chunk_paths):
+    global _model, _workspace
+    _model = model
+    _workspace = _Workspace(chunk_paths, len(model.values))
+
+
+def _simulate(seed, n_paths):
+    return n_paths, simulate_chunk(_model, _workspace, seed, n_paths)
+
+
+# Per-day percentiles and means of a book's simulated value, aggregated from
+# the chunks' histograms as they complete
+class Projection:
+    def __init__(self, model):
+        self.model = model
+        self.counts = np.zeros((model.horizon, model.bins), dtype=np.int64)
+        self.sums = np.zeros(model.horizon)
+        self.paths = 0
+        self.clipped = 0
+
+    def add(self, n_paths, chunk):
+        counts, sums, clipped = chunk
+        self.counts += counts
+        self.sums += sums
+        self.paths += n_paths
+        self.clipped += clipped
+
+    # Book value per day at each percentile, interpolated within histogram bins
+    def percentiles(self, percentiles=PERCENTILES):
+        cumulative = np.cumsum(self.counts, axis=1)
+        days = np.arange(self.model.horizon)
+        columns = {}
+        for percentile in percentiles:
+            target = percentile / 100 * self.paths
+            bins = np.minimum((cumulative < target).sum(axis=1), self.model.bins - 1)
+            below = np.where(bins > 0, cumulative[days, np.maximum(bins - 1, 0)], 0)
+            inside = np.maximum(self.counts[days, bins], 1)
+            offset = np.clip((target - below) / inside, 0.0, 1.0)
+            columns[f"P{percentile}"] = self.model.start * np.exp(self.model.low + (bins + offset) * self.model.width)
+        frame = pd.DataFrame(columns, index=pd.RangeIndex(1, self.model.horizon + 1, name="day"))
+        frame["mean"] = self.sums / max(self.paths, 1)
+        return frame
+
+
+# Simulates n_paths daily paths of the book over the model's horizon in chunks
+# of chunk_paths, so memory holds one chunk's paths x holdings rather than
+# every path x day x holding. Each chunk draws from its own child of seed, so
+# results do not depend on how chunks are spread over workers; with enough
+# chunks they run in a process pool. progress(paths_done, n_paths) is called
+# as chunks complete.
+def project(model, n_paths, seed=None, chunk_paths=CHUNK_PATHS, workers=None, progress=None):
+    sizes = [min(chunk_paths, n_paths - start) for start in range(0, n_paths, chunk_paths)]
+    seeds = np.random.SeedSequence(seed).spawn(len(sizes))
+    workers = min(workers or os.cpu_count() or 1, len(sizes))
+    projection = Projection(model)
+
+    if len(sizes) < MIN_CHUNKS_FOR_POOL or workers < 2:
+        workspace = _Workspace(min(chunk_paths, n_paths), len(model.values))
+        for child, size in zip(seeds, sizes):
+            projection.add(size, simulate_chunk(model, workspace, child, size))
+            if progress is not None:
+                progress(projection.paths, n_paths)
+    else:
+        # Spawned workers avoid forking the threads of a running server
+        context = multiprocessing.get_context("spawn")
+        with ProcessPoolExecutor(workers, mp_context=context, initializer=_load_model,
+                                 initargs=(model, chunk_paths)) as pool:
+            for future in as_completed([pool.submit(_simulate, child, size) for child, size in zip(seeds, sizes)]):
+                projection.add(*future.result())
+                if progress is not None:
+                    progress(projection.paths, n_paths)
+    return projection
+
+
+# Model of a book's holdings from their daily closes, as in the scenario engine
+def book_model(holdings, closes, horizon=TRADING_DAYS, **options):
+    engine = ScenarioEngine(holdings, closes)
+    tickers = list(engine.values.index)
+    mean, factor = engine.moments(tickers)
+    return PathModel(mean, factor, engine.values.to_numpy(), horizon=horizon, **options)
+
+
+def benchmark(n_holdings=500, n_paths=100_000, horizon=TRADING_DAYS, workers=None):
+    import tracemalloc
+
+    from scenarios import benchmark_book
+
+    holdings, closes = benchmark_book(n_holdings)
+    model = book_model(holdings, closes, horizon=horizon)
+    whole = n_paths * horizon * n_holdings * 8
+
+    tracemalloc.start()
+    start = time.perf_counter()
+    projection = project(model, n_paths, seed=0, workers=workers)
+    elapsed = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+
+    workspace = _Workspace(CHUNK_PATHS, n_holdings).nbytes
+    workers = min(workers or os.cpu_count() or 1, -(-n_paths // CHUNK_PATHS))
+    print(f"{n_paths:,} paths x {horizon} days x {n_holdings} holdings: {elapsed:.1f} s on {workers} process(es) | "
+          f"one array of every path {whole / 2**30:,.0f} GiB, chunk buffers {workspace / 2**20:,.0f} MiB, "
+          f"peak traced in this process {peak / 2**20:,.0f} MiB")
+    terminal = projection.percentiles().iloc[-1]
+    print(f"  value today ${model.start:,.0f}; in {horizon} days P5 ${terminal['P5']:,.0f}, "
+          f"P50 ${terminal['P50']:,.0f}, P95 ${terminal['P95']:,.0f}, mean ${terminal['mean']:,.0f} "
+          f"({projection.clipped} of {n_paths * horizon:,} values outside the histograms)")
+
+    # Histogram percentiles against exact ones from paths held in memory, on a sample small enough to keep
+    sample = project(model, CHUNK_PATHS, seed=1, workers=1).percentiles().iloc[-1]
+    exact = _exact_terminal(model, CHUNK_PATHS, seed=1)
+    print("  histogram vs exact percentiles on one chunk: " + ", ".join(
+        f"P{p} {sample[f'P{p}'] / exact[i] - 1:+.4%}" for i, p in enumerate(PERCENTILES)))
+
+
+# Terminal book values with every path kept, for checking the histogram percentiles
+def _exact_terminal(model, n_paths, seed):
+    rng = np.random.default_rng(np.random.SeedSequence(seed).spawn(1)[0])
+    prices = np.ones((n_paths, len(model.values)), dtype=np.float32)
+    normals = np.empty_like(prices)
+    for _ in range(model.horizon):
+        rng.standard_normal(out=normals, dtype=np.float32)
+        prices *= np.exp(normals @ model.factor_t + model.mean)
+    return np.percentile(prices @ model.values, PERCENTILES)
+
+
+if __name__ == "__main__":
+    benchmark()
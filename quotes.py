@@ -0,0 +1,47 @@
+import pandas as pd
+
+DEFAULT_CHUNK_SIZE = 100
+
+
+# Unique tickers across every account, in first-seen order
+def collect_tickers(positions_by_account):
+    tickers = pd.unique(pd.Series(
+        [holding["ticker"].upper() for positions in positions_by_account.values() for holding in positions],
+        dtype=object
+    ))
+    return list(tickers)
+
+
+# Quote service that deduplicates tickers across accounts and fetches them in
+# chunked bulk downloads through the shared market data cache
+class QuoteService:
+    def __init__(self, market_data, chunk_size=DEFAULT_CHUNK_SIZE):
+        self.market_data = market_data
+        self.chunk_size = chunk_size
+
+    # Price frame indexed by ticker with price and previous_close columns;
+    # tickers without a quote are left as NaN rows
+    def fetch(self, tickers):
+        tickers = list(pd.unique(pd.Series([ticker.upper() for ticker in tickers], dtype=object)))
+        quotes = self.market_data.get_many("quote", tickers, batch_size=self.chunk_size)
+        return self._frame(quotes, tickers)
+
+    # Same frame from whatever quotes are cached, without going upstream;
+    # for callers whose quotes are kept fresh by a background refresher
+    def cached(self, tickers):
+        tickers = list(pd.unique(pd.Series([ticker.upper() for ticker in tickers], dtype=object)))
+        return self._frame(self.market_data.peek_many("quote", tickers), tickers)
+
+    @staticmethod
+    def _frame(quotes, tickers):
+        frame = pd.DataFrame.from_dict(quotes, orient="index", columns=["price", "previous_close"])
+        return frame.reindex(tickers)
+
+    def for_positions(self, positions_by_account):
+        return self.fetch(collect_tickers(positions_by_account))
+
+    # Price frame aligned row-for-row to a holdings frame's index
+    def for_holdings(self, holdings_df):
+        quotes = self.fetch(holdings_df["ticker"].unique())
+        aligned = quotes.reindex(holdings_df["ticker"].str.upper())
+        return aligned.set_index(holdings_df.index)
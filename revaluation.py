@@ -0,0 +1,224 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+
+# Positions stored as parallel columnar arrays so a whole book can be
+# revalued against a price vector in a single vectorized pass
+class PositionBook:
+    def __init__(self, tickers, accounts, ticker_idx, account_idx, quantity, cost_basis):
+        self.tickers = list(tickers)
+        self.accounts = list(accounts)
+        self.ticker_idx = np.asarray(ticker_idx, dtype=np.int64)
+        self.account_idx = np.asarray(account_idx, dtype=np.int64)
+        self.quantity = np.asarray(quantity, dtype=np.float64)
+        self.cost_basis = np.asarray(cost_basis, dtype=np.float64)
+
+    def __len__(self):
+        return len(self.quantity)
+
+    # Build a book from {account: [{"ticker", "quantity", "cost_basis"}, ...]}
+    @classmethod
+    def from_positions(cls, positions_by_account):
+        accounts = list(positions_by_account)
+        records = [
+            (account_id, holding["ticker"], holding["quantity"], holding["cost_basis"])
+            for account_id, account in enumerate(accounts)
+            for holding in positions_by_account[account]
+        ]
+        account_idx, symbols, quantity, cost_basis = zip(*records) if records else ((), (), (), ())
+        ticker_idx, tickers = pd.factorize(pd.Series(symbols, dtype=object))
+        return cls(tickers, accounts, ticker_idx, account_idx, quantity, cost_basis)
+
+    # Build a book from a holdings frame with an account column
+    @classmethod
+    def from_frame(cls, holdings):
+        account_idx, accounts = pd.factorize(holdings["account"])
+        ticker_idx, tickers = pd.factorize(holdings["ticker"])
+        return cls(tickers, accounts, ticker_idx, account_idx,
+                   holdings["quantity"].to_numpy(), holdings["cost_basis"].to_numpy())
+
+    # Prices may be arrays aligned to self.tickers or Series indexed by ticker
+    def _align(self, prices):
+        if isinstance(prices, pd.Series):
+            prices = prices.reindex(self.tickers)
+        elif isinstance(prices, dict):
+            prices = pd.Series(prices).reindex(self.tickers)
+        return np.asarray(prices, dtype=np.float64)
+
+    def revalue(self, prices, previous_close):
+        price = self._align(prices)[self.ticker_idx]
+        prev = self._align(previous_close)[self.ticker_idx]
+
+        market_value = self.quantity * price
+        previous_value = self.quantity * prev
+        with np.errstate(divide="ignore", invalid="ignore"):
+            day_change_pct = np.where(prev > 0, (price / prev - 1) * 100, 0.0)
+        unrealized = market_value - self.cost_basis
+
+        # Per-account totals via bincount; day change is value-weighted
+        n_accounts = len(self.accounts)
+        account_value = np.bincount(self.account_idx, weights=market_value, minlength=n_accounts)
+        account_previous = np.bincount(self.account_idx, weights=previous_value, minlength=n_accounts)
+        account_cost = np.bincount(self.account_idx, weights=self.cost_basis, minlength=n_accounts)
+        held = np.zeros((n_accounts, len(self.tickers)), dtype=bool)
+        held[self.account_idx, self.ticker_idx] = True
+        account_symbols = held.sum(axis=1)
+
+        return Revaluation(
+            book=self,
+            market_value=market_value,
+            day_change_pct=day_change_pct,
+            unrealized=unrealized,
+            account_value=account_value,
+            account_previous=account_previous,
+            account_cost=account_cost,
+            account_symbols=account_symbols,
+        )
+
+
+class Revaluation:
+    def __init__(self, book, market_value, day_change_pct, unrealized,
+                 account_value, account_previous, account_cost, account_symbols):
+        self.book = book
+        self.market_value = market_value
+        self.day_change_pct = day_change_pct
+        self.unrealized = unrealized
+        self.account_value = account_value
+        self.account_previous = account_previous
+        self.account_cost = account_cost
+        self.account_symbols = account_symbols
+
+    def _summary(self, value, previous, cost, symbols):
+        return {
+            "symbols": int(symbols),
+            "cost_basis": float(cost),
+            "market_value": float(value),
+            "day_change_pct": float((value / previous - 1) * 100) if previous > 0 else 0.0,
+            "unrealized_gain": float(value - cost),
+        }
+
+    def account_summaries(self):
+        return {
+            account: self._summary(
+                self.account_value[i], self.account_previous[i],
+                self.account_cost[i], self.account_symbols[i]
+            )
+            for i, account in enumerate(self.book.accounts)
+        }
+
+    def combined_summary(self):
+        return self._summary(
+            self.account_value.sum(), self.account_previous.sum(),
+            self.account_cost.sum(), len(np.unique(self.book.ticker_idx))
+        )
+
+    def holdings_frame(self):
+        book = self.book
+        return pd.DataFrame({
+            "ticker": np.asarray(book.tickers, dtype=object)[book.ticker_idx],
+            "quantity": book.quantity,
+            "cost_basis": book.cost_basis,
+            "market_value": self.market_value,
+            "day_change_pct": self.day_change_pct,
+            "total_gain_loss": self.unrealized,
+            "account": np.asarray(book.accounts, dtype=object)[book.account_idx],
+        })
+
+    # Convert to the nested dict layout consumed by the dashboard pages
+    def to_portfolio_data(self, realized_gains=None):
+        realized_gains = realized_gains or {}
+        holdings = self.holdings_frame()
+        portfolio_data = {}
+
+        for account, summary in self.account_summaries().items():
+            account_holdings = holdings[holdings["account"] == account].drop(columns="account")
+            summary["realized_gain"] = realized_gains.get(account, 0)
+            summary["holdings"] = account_holdings.reset_index(drop=True)
+            portfolio_data[account] = summary
+
+        combined = self.combined_summary()
+        combined["realized_gain"] = sum(realized_gains.get(account, 0) for account in self.book.accounts)
+        combined["holdings"] = holdings
+        portfolio_data["Combined"] = combined
+
+        return portfolio_data
+
+
+# Per-dict revaluation as done by hand before the engine, kept for benchmarking
+def revalue_per_dict(positions_by_account, prices, previous_close):
+    portfolio_data = {}
+    for account, positions in positions_by_account.items():
+        holdings = []
+        value = previous = cost = 0.0
+        for position in positions:
+            price = prices[position["ticker"]]
+            prev = previous_close[position["ticker"]]
+            market_value = position["quantity"] * price
+            holdings.append({
+                "ticker": position["ticker"],
+                "quantity": position["quantity"],
+                "cost_basis": position["cost_basis"],
+                "market_value": market_value,
+                "day_change_pct": (price / prev - 1) * 100 if prev > 0 else 0.0,
+                "total_gain_loss": market_value - position["cost_basis"],
+            })
+            value += market_value
+            previous += position["quantity"] * prev
+            cost += position["cost_basis"]
+        portfolio_data[account] = {
+            "symbols": len({h["ticker"] for h in holdings}),
+            "cost_basis": cost,
+            "market_value": value,
+            "day_change_pct": (value / previous - 1) * 100 if previous > 0 else 0.0,
+            "unrealized_gain": value - cost,
+            "holdings": holdings,
+        }
+    return portfolio_data
+
+
+def _random_positions(n_positions, n_tickers=3000, n_accounts=20, seed=0):
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:05d}" for i in range(n_tickers)]
+    prices = dict(zip(tickers, rng.uniform(5, 500, n_tickers)))
+    previous_close = {t: p / (1 + rng.normal(0, 0.02)) for t, p in prices.items()}
+    positions = {f"Account {a}": [] for a in range(n_accounts)}
+    accounts = list(positions)
+    for ticker_id, account_id, quantity in zip(
+        rng.integers(0, n_tickers, n_positions),
+        rng.integers(0, n_accounts, n_positions),
+        rng.integers(1, 500, n_positions),
+    ):
+        ticker = tickers[ticker_id]
+        positions[accounts[account_id]].append({
+            "ticker": ticker,
+            "quantity": int(quantity),
+            "cost_basis": float(quantity * prices[ticker] * rng.uniform(0.7, 1.3)),
+        })
+    return positions, prices, previous_close
+
+
+def benchmark(sizes=(10_000, 100_000), repeat=5):
+    for n in sizes:
+        positions, prices, previous_close = _random_positions(n)
+        book = PositionBook.from_positions(positions)
+        price_vector = pd.Series(prices).reindex(book.tickers).to_numpy()
+        previous_vector = pd.Series(previous_close).reindex(book.tickers).to_numpy()
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            revalue_per_dict(positions, prices, previous_close)
+        per_dict = (time.perf_counter() - start) / repeat
+
+        start = time.perf_counter()
+        for _ in range(repeat):
+            book.revalue(price_vector, previous_vector)
+        vectorized = (time.perf_counter() - start) / repeat
+
+        print(f"{n:>7,} positions: per-dict {per_dict * 1000:8.2f} ms | "
+              f"vectorized {vectorized * 1000:7.2f} ms | {per_dict / vectorized:6.1f}x")
+
+
+if __name__ == "__main__":
+    benchmark()
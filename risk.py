@@ -0,0 +1,132 @@
+import time
+
+import numpy as np
+import pandas as pd
+
+TRADING_DAYS = 252
+
+# Fewest periods (about three months of trading days) over which returns are annualized
+MIN_ANNUALIZED_PERIODS = 63
+
+
+def _as_frame(returns):
+    if isinstance(returns, pd.Series):
+        return returns.to_frame()
+    return returns
+
+
+# Risk metrics for every return series against every benchmark in one pass.
+# returns and benchmark_returns are daily simple returns sharing a date index
+# (columns are series). Returns a dict of frames:
+#   summary: series x [period_return, annualized_return, volatility, sharpe, max_drawdown]
+#   beta, alpha: series x benchmark, alpha annualized
+# Compounding a few days' return to a year is meaningless, so over fewer than
+# min_annualized periods annualized_return, sharpe and alpha are NaN.
+def compute_risk_metrics(returns, benchmark_returns, risk_free_rate=0.0, periods_per_year=TRADING_DAYS,
+                         min_annualized=MIN_ANNUALIZED_PERIODS):
+    returns = _as_frame(returns)
+    benchmark_returns = _as_frame(benchmark_returns).reindex(returns.index)
+    r = returns.fillna(0.0).to_numpy(dtype=np.float64)
+    b = benchmark_returns.fillna(0.0).to_numpy(dtype=np.float64)
+    n = len(r)
+
+    # Growth of 1 per series; drawdown is measured against its running peak
+    wealth = np.cumprod(1 + r, axis=0)
+    peak = np.maximum(np.maximum.accumulate(wealth, axis=0), 1.0)
+    max_drawdown = (wealth / peak - 1).min(axis=0) if n else np.full(r.shape[1], np.nan)
+
+    with np.errstate(divide="ignore", invalid="ignore"):
+        period_return = wealth[-1] - 1 if n else np.full(r.shape[1], np.nan)
+        if n and n >= min_annualized:
+            annualized_return = wealth[-1] ** (periods_per_year / n) - 1
+        else:
+            annualized_return = np.full(r.shape[1], np.nan)
+        volatility = r.std(axis=0, ddof=1) * np.sqrt(periods_per_year) if n > 1 else np.full(r.shape[1], np.nan)
+        sharpe = (annualized_return - risk_free_rate) / volatility
+
+        # OLS slope and intercept of excess returns on excess benchmark returns,
+        # for every (series, benchmark) pair via one centered cross-product
+        rf = risk_free_rate / periods_per_year
+        r_excess = r - rf
+        b_excess = b - rf
+        r_mean = r_excess.mean(axis=0)
+        b_mean = b_excess.mean(axis=0)
+        covariance = (r_excess - r_mean).T @ (b_excess - b_mean) / max(n - 1, 1)
+        variance = b_excess.var(axis=0, ddof=1) if n > 1 else np.full(b.shape[1], np.nan)
+        beta = covariance / variance
+        alpha = (r_mean[:, None] - beta * b_mean[None, :]) * periods_per_year
+        if n < min_annualized:
+            alpha = np.full_like(alpha, np.nan)
+
+    summary = pd.DataFrame({
+        "period_return": period_return,
+        "annualized_return": annualized_return,
+        "volatility": volatility,
+        "sharpe": sharpe,
+        "max_drawdown": max_drawdown,
+    }, index=returns.columns)
+
+    return {
+        "summary": summary,
+        "beta": pd.DataFrame(beta, index=returns.columns, columns=benchmark_returns.columns),
+        "alpha": pd.DataFrame(alpha, index=returns.columns, columns=benchmark_returns.columns),
+    }
+
+
+# Windowed sums along the date axis from a single cumulative sum
+def _window_sums(values, window):
+    cumulative = np.cumsum(np.vstack([np.zeros((1, values.shape[1])), values]), axis=0)
+    return cumulative[window:] - cumulative[:-window]
+
+
+def rolling_volatility(returns, window=63, periods_per_year=TRADING_DAYS):
+    returns = _as_frame(returns)
+    r = returns.fillna(0.0).to_numpy(dtype=np.float64)
+    sums = _window_sums(r, window)
+    squares = _window_sums(r * r, window)
+    variance = np.maximum((squares - sums * sums / window) / (window - 1), 0.0)
+    return pd.DataFrame(
+        np.sqrt(variance * periods_per_year), index=returns.index[window - 1:], columns=returns.columns
+    )
+
+
+def rolling_beta(returns, benchmark, window=63):
+    returns = _as_frame(returns)
+    r = returns.fillna(0.0).to_numpy(dtype=np.float64)
+    x = benchmark.reindex(returns.index).fillna(0.0).to_numpy(dtype=np.float64)[:, None]
+    x_sum = _window_sums(x, window)
+    xx_sum = _window_sums(x * x, window)
+    y_sum = _window_sums(r, window)
+    xy_sum = _window_sums(r * x, window)
+    with np.errstate(divide="ignore", invalid="ignore"):
+        beta = (xy_sum - x_sum * y_sum / window) / (xx_sum - x_sum * x_sum / window)
+    return pd.DataFrame(beta, index=returns.index[window - 1:], columns=returns.columns)
+
+
+def benchmark(n_years=20, n_holdings=500, n_benchmarks=4, repeat=5):
+    rng = np.random.default_rng(0)
+    index = pd.bdate_range(end="2025-01-01", periods=TRADING_DAYS * n_years)
+    benchmarks = pd.DataFrame(rng.normal(0.0003, 0.01, (len(index), n_benchmarks)), index=index)
+    holdings = pd.DataFrame(
+        benchmarks.to_numpy()[:, :1] * rng.uniform(0.5, 1.5, n_holdings)
+        + rng.normal(0.0002, 0.015, (len(index), n_holdings)),
+        index=index
+    )
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        compute_risk_metrics(holdings, benchmarks)
+    metrics = (time.perf_counter() - start) / repeat
+
+    start = time.perf_counter()
+    for _ in range(repeat):
+        rolling_volatility(holdings)
+        rolling_beta(holdings, benchmarks[0])
+    rolling = (time.perf_counter() - start) / repeat
+
+    print(f"{n_years} years x {n_holdings} holdings x {n_benchmarks} benchmarks: "
+          f"metrics {metrics * 1000:.1f} ms | rolling vol + beta {rolling * 1000:.1f} ms")
+
+
+if __name__ == "__main__":
+    benchmark()
@@ -0,0 +1,335 @@
+import re
+import time
+
+import numpy as np
+import pandas as pd
+
+from risk import TRADING_DAYS
+
+DEFAULT_PATHS = 10_000
+DEFAULT_LOOKBACK = 3 * TRADING_DAYS
+PERCENTILES = (5, 50, 95)
+
+MARKET = "MARKET"
+MARKET_PROXY = "SPY"
+MARKET_WORDS = {"market", "markets", "stocks", "s&p", "sp500", "index", "everything", "equities"}
+SUBJECT_WORDS = 3
+
+# Words of company names too generic to identify one company
+NAME_STOPWORDS = {"the", "inc", "corp", "corporation", "company", "co", "holdings", "group", "trust", "fund", "etf",
+                  "platforms", "technologies", "systems", "international", "global", "com", "class", "shares",
+                  "ishares", "spdr", "invesco", "vanguard", "average", "industrial", "ltd", "plc", "limited"}
+
+# Words that are tickers too but mean something else in a question
+TICKER_STOPWORDS = {"A", "I", "ALL", "IT", "ON", "AT", "BE", "SO", "ARE", "FOR", "NOW", "NEW", "CAN", "IF", "MY",
+                    "AN", "ANY", "ONE", "BY", "OR", "AND", "WHAT", "WELL", "HALF", "BIG", "REAL", "GOOD", "SEE", "DO"}
+
+MOVE_DOWN = r"drops?|dropped|falls?|fell|crash(?:es|ed)?|declines?|declined|loses?|lost|tanks?|tanked|sinks?|sank|plunges?|plunged|goes down|went down"
+MOVE_UP = r"rises?|rose|rall(?:y|ies|ied)|gains?|gained|jumps?|jumped|climbs?|climbed|soars?|soared|goes up|went up"
+# "<subject> drops 20%" and "a 20% drop in <subject>"
+SHOCK_AFTER = re.compile(rf"\b(?P<move>{MOVE_DOWN}|{MOVE_UP})\s+(?:by\s+)?(?P<pct>\d+(?:\.\d+)?)\s*%")
+SHOCK_BEFORE = re.compile(r"\b(?P<pct>\d+(?:\.\d+)?)\s*%\s+(?P<move>drop|fall|crash|decline|correction|loss|rally|rise|gain|jump)\s+(?:in|of|for)\b")
+DOWN_MOVES = re.compile(rf"^(?:{MOVE_DOWN}|drop|fall|crash|decline|correction|loss)$")
+
+# Cheap test for a trade or move with a size, run before anything is resolved or fetched
+SCENARIO_HINT = re.compile(rf"\b(?:invest\w*|put|buy|bought|add|sell|sold|trim|dump|{MOVE_DOWN}|{MOVE_UP}|"
+                           r"drop|fall|crash|decline|correction|rally|rise|gain|jump)\b")
+SIZE_HINT = re.compile(r"\d|\b(?:all|everything|entire|half|third|quarter)\b")
+
+TRADE_VERB = re.compile(r"\b(?P<verb>invest(?:ed|ing)?|put|buy|bought|add|sell|sold|trim|dump)\b")
+DOLLARS = re.compile(r"\$\s*(?P<amount>\d[\d,]*(?:\.\d+)?)\s*(?P<scale>k|m|thousand|million)?\b|\b(?P<amount2>\d[\d,]*(?:\.\d+)?)\s*(?P<scale2>k|m|thousand|million)?\s*(?:dollars|usd)\b")
+SHARES = re.compile(r"\b(?P<shares>\d[\d,]*(?:\.\d+)?)\s+shares?\b")
+FRACTIONS = {"all": 1.0, "everything": 1.0, "entire": 1.0, "half": 0.5, "a third": 1 / 3, "a quarter": 0.25}
+SCALES = {None: 1, "k": 1e3, "thousand": 1e3, "m": 1e6, "million": 1e6}
+
+
+class ScenarioError(ValueError):
+    pass
+
+
+# A hypothetical change to the book. Trades are (ticker, size, unit) with
+# unit "usd", "shares" or "fraction" (of the position held) and a positive
+# size to buy or a negative one to sell; money invested is new money and
+# sale proceeds are held as cash. Shocks map a ticker, or MARKET for every
+# holding in proportion to its beta, to an immediate return.
+class Scenario:
+    def __init__(self, trades=(), shocks=None, description=""):
+        self.trades = list(trades)
+        self.shocks = dict(shocks or {})
+        self.description = description
+
+    def tickers(self):
+        return [ticker for ticker, _, _ in self.trades] + [ticker for ticker in self.shocks if ticker != MARKET]
+
+
+# Finds the security a question refers to: a ticker written in capitals or as
+# a $cashtag, or a distinctive word of a company name ("apple", "disney")
+class SecurityResolver:
+    def __init__(self, names, preferred=()):
+        self.tickers = {ticker.upper() for ticker in names}
+        words = {}
+        for ticker, name in names.items():
+            for position, word in enumerate(re.findall(r"[a-z0-9]+", name.lower())):
+                if len(word) >= 4 and word not in NAME_STOPWORDS:
+                    words.setdefault(word, []).append((position, ticker))
+        preferred = set(preferred)
+        # A word names a company when it is unique, or the first word of only one name, held ones first
+        self.words = {}
+        for word, owners in words.items():
+            owners.sort(key=lambda owner: (owner[1] not in preferred, owner[0]))
+            firsts = [ticker for position, ticker in owners if position == 0]
+            if len(owners) == 1 or len(set(firsts)) == 1 or owners[0][1] in preferred:
+                self.words[word] = owners[0][1]
+
+    def resolve(self, text):
+        for match in re.finditer(r"\$?[A-Za-z][A-Za-z0-9.]*", text):
+            token = match.group()
+            symbol = token.lstrip("$").upper()
+            if symbol in self.tickers and (token.startswith("$") or (token.isupper() and symbol not in TICKER_STOPWORDS)):
+                return symbol
+            if token.lower() in self.words:
+                return self.words[token.lower()]
+        return None
+
+
+def _amount(match, amount, scale):
+    return float(match.group(amount).replace(",", "")) * SCALES[(match.group(scale) or "").lower() or None]
+
+
+# What the few words next to a move refer to, the market or a security,
+# trying the nearest word first; returns the target and the words it used
+def _shock_target(words, resolver):
+    for n in range(1, len(words) + 1):
+        subject = words[:n]
+        if MARKET_WORDS & {word.lower().strip("?,.!'") for word in subject}:
+            return MARKET, n
+        target = resolver.resolve(" ".join(subject))
+        if target is not None:
+            return target, n
+    return None, 0
+
+
+# Whether a question may describe a scenario: a trade or move word and a size
+def mentions_scenario(prompt):
+    text = prompt.lower()
+    return SCENARIO_HINT.search(text) is not None and SIZE_HINT.search(text) is not None
+
+
+# Scenario described by a question such as "What if I invest $10000 in
+# Apple?", "sell half my TSLA" or "what if the market drops 20%", or None
+# when the question describes no trade with a size and no shock
+def parse_scenario(prompt, resolver):
+    if not mentions_scenario(prompt):
+        return None
+    masked = prompt
+    shocks = {}
+    for pattern, after in [(SHOCK_AFTER, True), (SHOCK_BEFORE, False)]:
+        for match in pattern.finditer(masked.lower()):
+            if after:
+                words = list(re.finditer(r"\S+", masked[:match.start()]))[-SUBJECT_WORDS:][::-1]
+            else:
+                words = list(re.finditer(r"\S+", masked[match.end():]))[:SUBJECT_WORDS]
+            target, used = _shock_target([word.group() for word in words], resolver)
+            if target is None:
+                continue
+            sign = -1 if DOWN_MOVES.match(match.group("move")) else 1
+            shocks[target] = sign * float(match.group("pct")) / 100
+            # Blank the shock out so its words are not read as a trade
+            if after:
+                start, end = words[used - 1].start(), match.end()
+            else:
+                start, end = match.start(), match.end() + words[used - 1].end()
+            masked = masked[:start] + " " * (end - start) + masked[end:]
+
+    trades = []
+    verb = TRADE_VERB.search(masked.lower())
+    if verb is not None:
+        sign = -1 if verb.group("verb") in {"sell", "sold", "trim", "dump"} else 1
+        rest = masked[verb.end():].lower()
+        ticker = resolver.resolve(masked[verb.end():])
+        dollars, shares = DOLLARS.search(rest), SHARES.search(rest)
+        fraction = next((value for word, value in FRACTIONS.items() if re.search(rf"\b{word}\b", rest)), None)
+        if ticker is not None:
+            if dollars is not None:
+                size = _amount(dollars, "amount", "scale") if dollars.group("amount") else _amount(dollars, "amount2", "scale2")
+                trades.append((ticker, sign * size, "usd"))
+            elif shares is not None:
+                trades.append((ticker, sign * float(shares.group("shares").replace(",", "")), "shares"))
+            elif fraction is not None and sign < 0:
+                trades.append((ticker, -fraction, "fraction"))
+
+    if not trades and not shocks:
+        return None
+    return Scenario(trades, shocks, description=prompt.strip())
+
+
+# Projected values of a book over a horizon by Monte Carlo. Daily log
+# returns of the held tickers over the lookback give a mean and covariance;
+# over the horizon they sum to a multivariate normal, drawn for every path at
+# once as standard normals times the Cholesky factor of the covariance. The
+# current book and the scenario are valued on the same draws, so their
+# difference reflects the scenario rather than sampling noise.
+class ScenarioEngine:
+    def __init__(self, holdings, closes, horizon=TRADING_DAYS, n_paths=DEFAULT_PATHS, lookback=DEFAULT_LOOKBACK, seed=None):
+        self.horizon = horizon
+        self.n_paths = n_paths
+        self.seed = seed
+        by_ticker = holdings.groupby("ticker", sort=True)[["quantity", "market_value"]].sum()
+        self.values = by_ticker["market_value"]
+        self.quantities = by_ticker["quantity"]
+
+        closes = closes.ffill().iloc[-(lookback + 1):]
+        self.prices = closes.iloc[-1]
+        self.returns = np.log(closes).diff().iloc[1:]
+
+    # Current dollar value per simulated ticker and cash after the scenario's trades and shocks
+    def _apply(self, scenario, tickers):
+        values = self.values.reindex(tickers, fill_value=0.0).to_numpy(dtype=np.float64).copy()
+        cash = 0.0
+        position = {ticker: i for i, ticker in enumerate(tickers)}
+        for ticker, size, unit in scenario.trades:
+            i = position[ticker]
+            if unit == "usd":
+                amount = size
+            elif unit == "shares":
+                price = self.prices.get(ticker, np.nan)
+                if not np.isfinite(price) and self.quantities.get(ticker, 0):
+                    price = self.values[ticker] / self.quantities[ticker]
+                if not np.isfinite(price):
+                    raise ScenarioError(f"No price is available for {ticker}.")
+                amount = size * price
+            else:
+                amount = size * values[i]
+            if amount < 0:
+                amount = max(amount, -values[i])
+                cash -= amount
+            values[i] += amount
+
+        if MARKET in scenario.shocks:
+            values *= 1 + self.betas(tickers) * scenario.shocks[MARKET]
+        for ticker, shock in scenario.shocks.items():
+            if ticker != MARKET:
+                values[position[ticker]] *= 1 + shock
+        return np.maximum(values, 0.0), cash
+
+    # Beta of each ticker to the market proxy, or to the book's average when the proxy has no history
+    def betas(self, tickers):
+        returns = self.returns.reindex(columns=tickers).fillna(0.0).to_numpy()
+        if MARKET_PROXY in self.returns.columns:
+            market = self.returns[MARKET_PROXY].fillna(0.0).to_numpy()
+        else:
+            market = returns.mean(axis=1)
+        centered = market - market.mean()
+        variance = centered @ centered
+        return (returns - returns.mean(axis=0)).T @ centered / variance if variance > 0 else np.ones(len(tickers))
+
+    # Lower Cholesky factor, with a small ridge for covariances that are only semi-definite
+    @staticmethod
+    def _cholesky(covariance):
+        ridge = 1e-12 * max(np.trace(covariance) / max(len(covariance), 1), 1e-12)
+        for _ in range(8):
+            try:
+                return np.linalg.cholesky(covariance + ridge * np.eye(len(covariance)))
+            except np.linalg.LinAlgError:
+                ridge *= 100
+        raise ScenarioError("The holdings' return history is too short to simulate.")
+
+    # Mean daily log return and Cholesky factor of the covariance of the given tickers
+    def moments(self, tickers):
+        missing = [ticker for ticker in tickers if ticker not in self.returns.columns or self.returns[ticker].isna().all()]
+        if missing:
+            raise ScenarioError(f"No price history is available for {', '.join(missing)}.")
+        returns = self.returns[list(tickers)]
+        return returns.mean().fillna(0.0).to_numpy(), self._cholesky(returns.cov().fillna(0.0).to_numpy())
+
+    def run(self, scenario):
+        tickers = sorted(set(self.values.index) | set(scenario.tickers()))
+        mean, factor = self.moments(tickers)
+
+        current = self.values.reindex(tickers, fill_value=0.0).to_numpy(dtype=np.float64)
+        scenario_values, cash = self._apply(scenario, tickers)
+
+        # Horizon log returns for every path and ticker, turned into growth factors in place
+        rng = np.random.default_rng(self.seed)
+        growth = rng.standard_normal((self.n_paths, len(tickers))) @ factor.T
+        growth *= np.sqrt(self.horizon)
+        growth += self.horizon * mean
+        np.exp(growth, out=growth)
+        terminal = growth @ np.column_stack([current, scenario_values])
+        terminal[:, 1] += cash
+
+        start = np.array([current.sum(), scenario_values.sum() + cash])
+        return {
+            "paths": self.n_paths,
+            "horizon": self.horizon,
+            "start": start,
+            "percentiles": dict(zip(PERCENTILES, np.percentile(terminal, PERCENTILES, axis=0))),
+            "mean": terminal.mean(axis=0),
+            "loss_probability": (terminal < start).mean(axis=0),
+        }
+
+
+# Chat answer comparing the scenario with the current book
+def describe_result(scenario, result):
+    start, percentiles = result["start"], result["percentiles"]
+    years = result["horizon"] / TRADING_DAYS
+    horizon = "1 year" if years == 1 else f"{years:g} years"
+    sizes = {"usd": "${:,.0f} of", "shares": "{:,g} shares of", "fraction": "{:.0%} of"}
+    changes = [f"{'buy' if size > 0 else 'sell'} {sizes[unit].format(abs(size))} {ticker}"
+               for ticker, size, unit in scenario.trades]
+    changes += [f"{'the market' if ticker == MARKET else ticker} {'falls' if shock < 0 else 'rises'} {abs(shock):.0%}"
+                for ticker, shock in scenario.shocks.items()]
+    lines = [
+        f"**Scenario: {', '.join(changes)}** — {result['paths']:,} simulated paths over {horizon}, "
+        f"using the correlations of your holdings' recent daily returns.",
+        "",
+        "| | Current portfolio | With scenario |",
+        "|---|---|---|",
+        f"| Value today | ${start[0]:,.0f} | ${start[1]:,.0f} |",
+    ]
+    for percentile, label in [(50, "Median in " + horizon), (5, "Downside (5th percentile)"), (95, "Upside (95th percentile)")]:
+        values = percentiles[percentile]
+        lines.append(f"| {label} | ${values[0]:,.0f} | ${values[1]:,.0f} |")
+    lines.append(f"| Chance of ending below today's value | {result['loss_probability'][0]:.0%} | "
+                 f"{result['loss_probability'][1]:.0%} |")
+    lines += ["", "Projections assume returns behave as they have recently; they are not a forecast or advice."]
+    return "\n".join(lines)
+
+
+# Synthetic book of n_holdings loading on a common market factor, with SPY and daily closes over the lookback
+def benchmark_book(n_holdings, seed=0):
+    rng = np.random.default_rng(seed)
+    tickers = [f"T{i:03d}" for i in range(n_holdings)] + [MARKET_PROXY]
+    n_days = DEFAULT_LOOKBACK + 1
+    market = rng.normal(0.0004, 0.01, n_days)
+    steps = np.outer(market, rng.uniform(0.6, 1.6, len(tickers))) + rng.normal(0.0002, 0.015, (n_days, len(tickers)))
+    closes = pd.DataFrame(100 * np.exp(np.cumsum(steps, axis=0)), index=pd.bdate_range(end="2025-01-02", periods=n_days),
+                          columns=tickers)
+    holdings = pd.DataFrame({
+        "ticker": tickers[:n_holdings],
+        "quantity": rng.integers(1, 500, n_holdings).astype(float),
+        "market_value": rng.uniform(1_000, 50_000, n_holdings),
+    })
+    return holdings, closes
+
+
+def benchmark(n_holdings=500, n_paths=10_000, repeat=3):
+    holdings, closes = benchmark_book(n_holdings)
+    tickers = list(closes.columns)
+    resolver = SecurityResolver({ticker: f"Company {ticker}" for ticker in tickers} | {"AAPL": "Apple Inc."})
+    closes["AAPL"] = closes["T000"] * 1.7
+    scenario = parse_scenario("What if I invest $10,000 in Apple and the market drops 20%?", resolver)
+
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        result = ScenarioEngine(holdings, closes, n_paths=n_paths, seed=0).run(scenario)
+        timings.append(time.perf_counter() - start)
+
+    print(f"{n_holdings} holdings x {n_paths:,} paths, {len(closes) - 1:,} days of history: "
+          f"{min(timings) * 1000:.0f} ms per scenario (best of {repeat})")
+    print(describe_result(scenario, result))
+
+
+if __name__ == "__main__":
+    benchmark()
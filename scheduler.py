@@ -0,0 +1,369 @@
+import random
+import threading
+import time
+from datetime import datetime, timedelta
+from datetime import time as time_of_day
+from zoneinfo import ZoneInfo
+
+NEW_YORK = ZoneInfo("America/New_York")
+MARKET_OPEN = time_of_day(9, 30)
+MARKET_CLOSE = time_of_day(16, 0)
+NIGHTLY_AT = time_of_day(18, 0)
+
+BENCHMARK_TICKERS = ["SPY", "QQQ", "IWM", "DIA"]
+
+# Refresh period in seconds while the market is open and while it is closed
+QUOTE_PERIODS = (15, 15 * 60)
+HISTORY_PERIODS = (60 * 60, 6 * 60 * 60)
+
+# Daily history kept warm for the performance and correlation charts
+HISTORY_PARAMS = {"period": "10y", "interval": "1d"}
+
+# Further history views of every tracked ticker, here the Stock Analysis overview; with the price
+# warehouse underneath they are cut from the same stored bars, so they share one rate-limited call
+HISTORY_VIEWS = [HISTORY_PARAMS, {"period": "1y", "interval": "1d"}]
+
+# Tickers open on Stock Analysis are watched: their chart views, news and info are refreshed too,
+# until they have not been viewed for WATCH_EXPIRY seconds; at most WATCH_LIMIT at a time. info
+# carries the current price, so it follows the quote cadence and keeps the cache's own short TTL
+NEWS_PERIODS = (10 * 60, 60 * 60)
+WATCH_EXPIRY = 30 * 60
+WATCH_LIMIT = 20
+
+# Endpoints refreshed once a night, after the close
+FUNDAMENTALS = ["income_stmt", "balance_sheet", "cashflow"]
+FUNDAMENTALS_TTL = 36 * 60 * 60
+
+DEFAULT_RATE = 1.0
+DEFAULT_BURST = 5
+DEFAULT_PASS_BUDGET = 5.0
+QUOTE_BATCH_SIZE = 100
+
+
+# Regular US trading session, weekdays 9:30-16:00 New York time (holidays are not observed)
+def market_is_open(now):
+    now = now.astimezone(NEW_YORK)
+    return now.weekday() < 5 and MARKET_OPEN <= now.time() < MARKET_CLOSE
+
+
+# Latest nightly refresh time at or before now
+def last_nightly(now):
+    now = now.astimezone(NEW_YORK)
+    cutoff = datetime.combine(now.date(), NIGHTLY_AT, tzinfo=NEW_YORK)
+    return cutoff if now >= cutoff else cutoff - timedelta(days=1)
+
+
+# Token bucket: up to burst calls at once, then rate calls per second
+class RateLimiter:
+    def __init__(self, rate=DEFAULT_RATE, burst=DEFAULT_BURST, clock=time.monotonic, sleep=time.sleep):
+        self.rate = rate
+        self.burst = burst
+        self.clock = clock
+        self.sleep = sleep
+        self._tokens = float(burst)
+        self._updated = clock()
+        self._lock = threading.Lock()
+
+    def acquire(self):
+        while True:
+            with self._lock:
+                now = self.clock()
+                self._tokens = min(self.burst, self._tokens + (now - self._updated) * self.rate)
+                self._updated = now
+                if self._tokens >= 1:
+                    self._tokens -= 1
+                    return
+                wait = (1 - self._tokens) / self.rate
+            self.sleep(wait)
+
+
+# Exponential backoff with jitter per key: after n consecutive failures the
+# key is held back for base * 2**(n-1) seconds, capped at maximum
+class Backoff:
+    def __init__(self, base=5, maximum=15 * 60, jitter=random.random):
+        self.base = base
+        self.maximum = maximum
+        self.jitter = jitter
+        self._failures = {}
+        self._retry_at = {}
+
+    def ready(self, key, now):
+        return self._retry_at.get(key, now) <= now
+
+    def failed(self, key, now):
+        failures = self._failures.get(key, 0) + 1
+        self._failures[key] = failures
+        delay = min(self.base * 2 ** (failures - 1), self.maximum)
+        self._retry_at[key] = now + delay * (0.5 + self.jitter() / 2)
+
+    def succeeded(self, key):
+        self._failures.pop(key, None)
+        self._retry_at.pop(key, None)
+
+    def failures(self, key):
+        return self._failures.get(key, 0)
+
+
+# Background refresh loop for the held tickers plus the benchmarks, and for
+# the tickers watched on Stock Analysis. Quotes (one batched call), daily
+# history and the watched chart views, news and info are refreshed on a
+# market-hours cadence and financial statements once a night. Everything but
+# info is written into the shared MarketDataCache with a TTL outlasting the
+# cadence, so renders of those views hit warm entries; info keeps its short
+# TTL, since renders read the current price from it. Only the first view of
+# a ticker or chart setting not yet watched goes upstream. Calls are rate
+# limited and an endpoint that fails backs off as a whole, since failures are
+# usually the provider throttling or down. Each pass spends at most
+# pass_budget seconds on per-ticker work, so quotes keep their cadence.
+class RefreshScheduler:
+    def __init__(self, market_data, benchmarks=BENCHMARK_TICKERS, limiter=None, backoff=None,
+                 pass_budget=DEFAULT_PASS_BUDGET, clock=time.monotonic, now=lambda: datetime.now(NEW_YORK)):
+        self.market_data = market_data
+        self.benchmarks = [ticker.upper() for ticker in benchmarks]
+        self.limiter = limiter or RateLimiter(clock=clock)
+        self.backoff = backoff or Backoff()
+        self.pass_budget = pass_budget
+        self.clock = clock
+        self.now = now
+        self._universe = set(self.benchmarks)
+        self._watched = {}
+        self._due = {}
+        self._fundamentals_at = {}
+        self._lock = threading.Lock()
+        self._wake = threading.Event()
+        self._stop = threading.Event()
+        self._thread = None
+        self.calls = 0
+        self.errors = 0
+        self.last_error = None
+
+    # Tickers to keep warm besides the benchmarks; new ones are refreshed right away
+    def set_universe(self, tickers):
+        universe = {ticker.upper() for ticker in tickers} | set(self.benchmarks)
+        with self._lock:
+            if universe == self._universe:
+                return
+            added = universe - self._universe
+            self._universe = universe
+        if added:
+            self._due.pop("quote", None)
+            self._wake.set()
+
+    def universe(self):
+        with self._lock:
+            return sorted(self._universe)
+
+    # Keep a ticker's views warm while it is being looked at. views are
+    # (endpoint, params) pairs such as ("history", {"period": "5y", "interval": "1wk"})
+    # or ("news", {}); views not seen within WATCH_EXPIRY seconds are dropped.
+    def watch(self, ticker, views):
+        ticker = ticker.upper()
+        now = self.clock()
+        with self._lock:
+            watched = self._watched.pop(ticker, {})
+            added = False
+            for endpoint, params in views:
+                view = (endpoint, tuple(sorted(params.items())))
+                added = added or view not in watched
+                watched[view] = now
+            self._watched[ticker] = watched
+            while len(self._watched) > WATCH_LIMIT:
+                del self._watched[next(iter(self._watched))]
+        if added:
+            self._wake.set()
+
+    # Watched (ticker, endpoint, params) views still in use, dropping expired ones
+    def _watched_views(self, now):
+        with self._lock:
+            for ticker, watched in list(self._watched.items()):
+                for view, seen in list(watched.items()):
+                    if now - seen > WATCH_EXPIRY:
+                        del watched[view]
+                if not watched:
+                    del self._watched[ticker]
+            return [(ticker, endpoint, params) for ticker, watched in self._watched.items()
+                    for endpoint, params in watched]
+
+    def start(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._run, name="refresh-scheduler", daemon=True)
+            self._thread.start()
+
+    def stop(self):
+        self._stop.set()
+        self._wake.set()
+
+    def _run(self):
+        while not self._stop.is_set():
+            delay = self.run_once()
+            self._wake.wait(delay)
+            self._wake.clear()
+
+    def _call(self, endpoint, fetch):
+        if not self.backoff.ready(endpoint, self.clock()):
+            return False
+        self.limiter.acquire()
+        self.calls += 1
+        try:
+            fetch()
+        except Exception as e:
+            self.errors += 1
+            self.last_error = f"{endpoint}: {e}"
+            self.backoff.failed(endpoint, self.clock())
+            return False
+        self.backoff.succeeded(endpoint)
+        return True
+
+    # Run whatever is due and return the seconds until something is due again
+    def run_once(self):
+        started = self.clock()
+        is_open = market_is_open(self.now())
+        universe = self.universe()
+
+        quote_period = QUOTE_PERIODS[0] if is_open else QUOTE_PERIODS[1]
+        if self._due.get("quote", started) <= started:
+            for start in range(0, len(universe), QUOTE_BATCH_SIZE):
+                chunk = universe[start:start + QUOTE_BATCH_SIZE]
+                self._call("quote", lambda: self.market_data.refresh_many(
+                    "quote", chunk, ttl=quote_period * 4, batch_size=QUOTE_BATCH_SIZE
+                ))
+            self._due["quote"] = started + quote_period
+
+        history_period = HISTORY_PERIODS[0] if is_open else HISTORY_PERIODS[1]
+        news_period = NEWS_PERIODS[0] if is_open else NEWS_PERIODS[1]
+        nightly = last_nightly(self.now())
+
+        # Views on screen right now come first, then the history every page's charts need
+        watched = self._watched_views(started)
+        for ticker, endpoint, params in watched:
+            if self.clock() - started > self.pass_budget:
+                break
+            key = ("watch", ticker, endpoint, params)
+            if endpoint == "info":
+                period, ttl = quote_period, self.market_data.ttls["info"]
+            else:
+                period = news_period if endpoint == "news" else history_period
+                ttl = period * 2
+            if self._due.get(key, started) <= started:
+                if self._call(endpoint, lambda: self.market_data.refresh(
+                    endpoint, ticker, ttl=ttl, **dict(params)
+                )):
+                    self._due[key] = started + period
+        for ticker in universe:
+            if self.clock() - started > self.pass_budget:
+                break
+            if self._due.get(("history", ticker), started) <= started:
+                if self._call("history", lambda: [self.market_data.refresh(
+                    "history", ticker, ttl=history_period * 2, **params
+                ) for params in HISTORY_VIEWS]):
+                    self._due[("history", ticker)] = started + history_period
+
+        # Fundamentals only serve Stock Analysis, so they come last
+        tracked = sorted(set(universe) | {ticker for ticker, _, _ in watched})
+        for ticker in tracked:
+            if self.clock() - started > self.pass_budget:
+                break
+            if self._fundamentals_at.get(ticker, nightly - timedelta(seconds=1)) < nightly:
+                if all([self._call(endpoint, lambda endpoint=endpoint: self.market_data.refresh(
+                    endpoint, ticker, ttl=FUNDAMENTALS_TTL
+                )) for endpoint in FUNDAMENTALS]):
+                    self._fundamentals_at[ticker] = self.now()
+
+        now = self.clock()
+        due = [self._due.get("quote", now)] + [self._due.get(("history", ticker), now) for ticker in universe]
+        due += [self._due.get(("watch", ticker, endpoint, params), now) for ticker, endpoint, params in watched]
+        if any(self._fundamentals_at.get(ticker, nightly - timedelta(seconds=1)) < nightly for ticker in tracked):
+            due.append(now)
+        # Backed-off endpoints are retried once their hold expires
+        return max(min(due) - now, 1.0)
+
+    # Whether the endpoint's last refresh failed and it is backing off
+    def failing(self, endpoint):
+        return self.backoff.failures(endpoint) > 0
+
+    def stats(self):
+        return {
+            "tickers": len(self._universe),
+            "watched": len(self._watched),
+            "calls": self.calls,
+            "errors": self.errors,
+            "last_error": self.last_error,
+            "backoff": {endpoint: self.backoff.failures(endpoint)
+                        for endpoint in ["quote", "history", "news", "info"] + FUNDAMENTALS if self.backoff.failures(endpoint)},
+        }
+
+
+def benchmark(n_tickers=500, latency=0.05, n_renders=20):
+    import pandas as pd
+
+    from market_data import MarketDataCache
+    from quotes import QuoteService
+
+    # Provider with a fixed network latency per call
+    class SlowProvider:
+        def __init__(self):
+            self.calls = 0
+
+        def _wait(self):
+            self.calls += 1
+            time.sleep(latency)
+
+        def quote(self, tickers):
+            self._wait()
+            return {ticker: {"price": 100.0, "previous_close": 99.0} for ticker in tickers}
+
+        def history(self, ticker, period="1y", interval="1d"):
+            self._wait()
+            return pd.DataFrame({"Close": [100.0]})
+
+        def info(self, ticker):
+            self._wait()
+            return {"longName": ticker}
+
+        income_stmt = balance_sheet = cashflow = info
+
+    tickers = [f"T{i:03d}" for i in range(n_tickers)]
+
+    # Renders fetching their own quotes wait on upstream whenever the 15 s TTL has lapsed
+    provider = SlowProvider()
+    cache = MarketDataCache(provider=provider)
+    start = time.perf_counter()
+    QuoteService(cache).fetch(tickers)
+    blocking = time.perf_counter() - start
+
+    # With the scheduler warming the cache, renders only read it
+    provider = SlowProvider()
+    cache = MarketDataCache(provider=provider)
+    scheduler = RefreshScheduler(cache, limiter=RateLimiter(rate=1000, burst=1000), pass_budget=0)
+    scheduler.set_universe(tickers)
+    start = time.perf_counter()
+    scheduler.run_once()
+    warm_up = time.perf_counter() - start
+    start = time.perf_counter()
+    for _ in range(n_renders):
+        quotes = QuoteService(cache).cached(tickers)
+    reading = (time.perf_counter() - start) / n_renders
+
+    print(f"{n_tickers} held tickers, {latency * 1000:.0f} ms per upstream call: render fetching quotes "
+          f"{blocking * 1000:.0f} ms on every TTL lapse | background quote refresh {warm_up * 1000:.0f} ms "
+          f"({provider.calls} calls), renders read {reading * 1000:.2f} ms ({quotes['price'].notna().sum()} quotes)")
+
+    # Upstream calls over a simulated trading day, driven by a virtual clock
+    virtual = [0.0]
+    provider = SlowProvider()
+    provider._wait = lambda: setattr(provider, "calls", provider.calls + 1)
+    cache = MarketDataCache(provider=provider, clock=lambda: virtual[0])
+    day = datetime(2025, 1, 6, 0, 0, tzinfo=NEW_YORK)
+    scheduler = RefreshScheduler(
+        cache, clock=lambda: virtual[0], now=lambda: day + timedelta(seconds=virtual[0]),
+        limiter=RateLimiter(clock=lambda: virtual[0], sleep=lambda seconds: virtual.__setitem__(0, virtual[0] + seconds)),
+    )
+    scheduler.set_universe(tickers)
+    while virtual[0] < 24 * 60 * 60:
+        virtual[0] += scheduler.run_once()
+    print(f"  one simulated weekday, {len(scheduler.universe())} tickers at <= 1 call/s: "
+          f"{provider.calls:,} upstream calls ({scheduler.stats()['errors']} errors)")
+
+
+if __name__ == "__main__":
+    benchmark()
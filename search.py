@@ -0,0 +1,179 @@
+import csv
+import re
+import threading
+import time
+
+import numpy as np
+import pandas as pd
+
+COMPACT_RATIO = 0.1
+MIN_COMPACT_DOCUMENTS = 1_000
+
+TOKEN_SPLIT = re.compile(r"[^a-z0-9]+")
+
+_EMPTY = np.zeros(0, dtype=np.int64)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_SPLIT.split(text.lower()) if token]
+
+
+# As-you-type search over short text fields (ticker, company name, account).
+# Every query word must be a prefix of some word of a document, so "app"
+# finds Apple and "micro dev" finds Advanced Micro Devices. Words are kept
+# as a sorted vocabulary with each word's documents stored contiguously, so
+# a prefix is a binary search and one slice. Documents added or changed
+# later go into a small delta index and removed ones are tombstoned until
+# the next compaction rebuilds the arrays.
+class SearchIndex:
+    def __init__(self, documents=None):
+        self._keys = np.empty(0, dtype=object)
+        self._vocabulary = np.empty(0, dtype=object)
+        self._offsets = np.zeros(1, dtype=np.int64)
+        self._word_docs = _EMPTY
+        self._ids = {}
+        self._texts = {}
+        self._delta = {}
+        self._delta_keys = []
+        self._dead = set()
+        self._lock = threading.Lock()
+        if documents:
+            self.update(documents)
+
+    def __len__(self):
+        return len(self._ids)
+
+    def __contains__(self, key):
+        return key in self._ids
+
+    # Add or replace documents given as {key: (field, ...)}; unchanged ones are skipped
+    def update(self, documents):
+        with self._lock:
+            for key, fields in documents.items():
+                text = " ".join(field for field in fields if field)
+                doc = self._ids.get(key)
+                if doc is not None:
+                    if self._texts[key] == text:
+                        continue
+                    self._dead.add(doc)
+                doc = len(self._keys) + len(self._delta_keys)
+                self._ids[key] = doc
+                self._texts[key] = text
+                self._delta_keys.append(key)
+                for word in set(tokenize(text)):
+                    self._delta.setdefault(word, []).append(doc)
+            self._maybe_compact()
+
+    def remove(self, keys):
+        with self._lock:
+            for key in keys:
+                doc = self._ids.pop(key, None)
+                if doc is not None:
+                    del self._texts[key]
+                    self._dead.add(doc)
+            self._maybe_compact()
+
+    def _maybe_compact(self):
+        pending = len(self._delta_keys) + len(self._dead)
+        if pending > max(COMPACT_RATIO * len(self._keys), MIN_COMPACT_DOCUMENTS) or (pending and not len(self._keys)):
+            self._compact()
+
+    # Rebuild the vocabulary arrays from live documents, renumbering them densely
+    def _compact(self):
+        keys = list(self._ids)
+        words = pd.Series([self._texts[key] for key in keys], dtype=object).str.lower().str.split(TOKEN_SPLIT).explode()
+        pairs = pd.DataFrame({"doc": words.index.to_numpy(dtype=np.int64), "word": words.to_numpy()})
+        pairs = pairs[pairs["word"].notna() & (pairs["word"] != "")].drop_duplicates()
+        codes, vocabulary = pd.factorize(pairs["word"], sort=True)
+        order = np.lexsort((pairs["doc"].to_numpy(), codes))
+
+        self._keys = np.empty(len(keys), dtype=object)
+        self._keys[:] = keys
+        self._vocabulary = np.asarray(vocabulary, dtype=object)
+        self._word_docs = pairs["doc"].to_numpy()[order]
+        self._offsets = np.searchsorted(codes[order], np.arange(len(vocabulary) + 1))
+        self._ids = dict(zip(keys, range(len(keys))))
+        self._delta = {}
+        self._delta_keys = []
+        self._dead = set()
+
+    # Sorted ids of documents with a word starting with prefix
+    def _prefix_docs(self, prefix):
+        lo = self._vocabulary.searchsorted(prefix, side="left")
+        hi = self._vocabulary.searchsorted(prefix + "\uffff", side="left")
+        docs = self._word_docs[self._offsets[lo]:self._offsets[hi]]
+        if hi - lo > 1:
+            docs = np.unique(docs)
+        delta = [doc for word, ids in self._delta.items() if word.startswith(prefix) for doc in ids]
+        if delta:
+            docs = np.union1d(docs, delta)
+        return docs
+
+    # Keys of documents matching every word of the query
+    def search(self, query):
+        words = tokenize(query)
+        if not words:
+            return list(self._ids)
+
+        with self._lock:
+            docs = None
+            for word in sorted(set(words), key=len, reverse=True):
+                found = self._prefix_docs(word)
+                docs = found if docs is None else np.intersect1d(docs, found, assume_unique=True)
+                if not len(docs):
+                    return []
+            if self._dead:
+                docs = docs[~np.isin(docs, list(self._dead))]
+            base = docs[docs < len(self._keys)]
+            return list(self._keys[base]) + [self._delta_keys[doc - len(self._keys)] for doc in docs[len(base):]]
+
+
+# Ticker to company name from a security master CSV with symbol and name columns
+def load_security_master(path):
+    try:
+        with open(path, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f)
+            lookup = {column.strip().lower(): column for column in reader.fieldnames or []}
+            symbol, name = lookup.get("symbol", lookup.get("ticker")), lookup.get("name")
+            if symbol is None or name is None:
+                return {}
+            return {row[symbol].strip().upper(): row[name].strip() for row in reader if row[symbol]}
+    except FileNotFoundError:
+        return {}
+
+
+def benchmark(n_instruments=60_000, queries=("a", "ap", "appl", "micro sys", "hold", "zzzz")):
+    rng = np.random.default_rng(0)
+    words = ["Apple", "Micro", "Systems", "Global", "Holdings", "Energy", "Capital", "Bio", "Therapeutics",
+             "Financial", "Semiconductor", "Devices", "Networks", "Realty", "Trust", "Partners", "Foods"]
+    letters = np.array(list("ABCDEFGHIJKLMNOPQRSTUVWXYZ"))
+    tickers = pd.unique(pd.Series(
+        ["".join(letters[rng.integers(0, 26, rng.integers(1, 6))]) for _ in range(n_instruments * 2)]
+    ))[:n_instruments]
+    names = [" ".join(rng.choice(words, 3)) + " Inc." for _ in range(len(tickers))]
+    documents = {("ticker", ticker): (ticker, name) for ticker, name in zip(tickers, names)}
+
+    start = time.perf_counter()
+    index = SearchIndex(documents)
+    build = time.perf_counter() - start
+
+    start = time.perf_counter()
+    index.update({("ticker", f"NEW{i}"): (f"NEW{i}", "New Listing Corp.") for i in range(100)})
+    incremental = time.perf_counter() - start
+
+    frame = pd.DataFrame({"ticker": tickers, "name": names})
+    print(f"{len(index):,} instruments: build {build * 1000:.0f} ms | add 100 incrementally {incremental * 1000:.2f} ms")
+    for query in queries:
+        start = time.perf_counter()
+        for _ in range(20):
+            found = index.search(query)
+        indexed = (time.perf_counter() - start) / 20
+        start = time.perf_counter()
+        frame["ticker"].str.contains(query, case=False) | frame["name"].str.contains(query, case=False)
+        scanned = time.perf_counter() - start
+        print(f"  {query!r:>11}: {len(found):>6,} matches | index {indexed * 1e6:8.0f} us | "
+              f"str.contains scan {scanned * 1e6:8.0f} us")
+
+
+if __name__ == "__main__":
+    benchmark()
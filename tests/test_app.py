@@ -0,0 +1,82 @@
+import shutil
+from pathlib import Path
+
+import pytest
+import streamlit as st
+from streamlit.testing.v1 import AppTest
+
+import scheduler
+import views
+
+APP = Path(__file__).resolve().parent.parent / "app.py"
+
+
+# The app copied next to an empty data directory, with shared caches cleared
+# and the background refresher kept from going to Yahoo Finance
+@pytest.fixture
+def app_path(tmp_path, monkeypatch):
+    shutil.copy(APP, tmp_path / "app.py")
+    monkeypatch.setattr(scheduler.RefreshScheduler, "start", lambda self: None)
+    st.cache_resource.clear()
+    st.cache_data.clear()
+    yield str(tmp_path / "app.py")
+    st.cache_resource.clear()
+    st.cache_data.clear()
+
+
+# Keys of the figures built, as (version, chart, options)
+@pytest.fixture
+def built_figures(monkeypatch):
+    built = []
+    get = views.ViewCache.get
+
+    def recording(self, key, build):
+        def recorded():
+            if key[2] == "figure":
+                built.append((key[1], key[3], key[4]))
+            return build()
+        return get(self, key, recorded)
+
+    monkeypatch.setattr(views.ViewCache, "get", recording)
+    return built
+
+
+def render(path, page, live=False):
+    at = AppTest.from_file(path, default_timeout=120)
+    at.run()
+    if live:
+        at.sidebar.checkbox[0].check().run()
+    at.sidebar.radio[0].set_value(page).run()
+    assert not at.exception
+    return at
+
+
+def test_figures_are_built_once_and_shared_by_later_sessions(app_path, built_figures):
+    render(app_path, "Charts")
+    charts = {chart for _, chart, _ in built_figures}
+    assert {"performance", "returns", "correlation"} <= charts
+
+    del built_figures[:]
+    render(app_path, "Charts")
+    assert built_figures == []
+
+
+def test_simulated_fallback_history_is_cached_under_simulated_keys(app_path, built_figures):
+    at = render(app_path, "Charts", live=True)
+    assert any("simulated history" in message.value for message in at.info)
+
+    assert built_figures
+    for version, chart, _ in built_figures:
+        if chart != "returns":
+            assert version[0] == "mock"
+
+    # The same simulated data is shown without live prices, so its figures are reused
+    del built_figures[:]
+    render(app_path, "Charts")
+    assert built_figures == []
+
+
+def test_a_projection_from_simulated_fallback_history_is_not_kept_as_live(app_path, built_figures):
+    render(app_path, "Dashboard", live=True)
+    projections = [version for version, chart, _ in built_figures if chart == "projection"]
+    assert len(projections) == 1 and projections[0][0] == "mock"
@@ -0,0 +1,49 @@
+from assistant import LocalBackend, respond, timed, tokenize
+from intents import FALLBACK_ANSWER, GLOSSARY, INTENTS, IntentRouter, glossary_intents
+
+
+def backend(**options):
+    return LocalBackend(IntentRouter({**INTENTS, **glossary_intents(GLOSSARY)}), **options)
+
+
+def test_tokens_stream_in_order_with_a_delay_before_each():
+    sleeps = []
+    local = backend(token_delay=0.02, sleep=sleeps.append)
+    tokens = list(local.stream("What is a P/E ratio?"))
+
+    assert tokens == tokenize(INTENTS["pe_ratio"]["answer"])
+    assert "".join(tokens) == INTENTS["pe_ratio"]["answer"]
+    assert sleeps == [0.02] * len(tokens)
+
+
+def test_respond_joins_the_stream():
+    local = backend(sleep=lambda seconds: None)
+    assert respond(local, "What is a P/E ratio?") == "".join(local.stream("What is a P/E ratio?"))
+
+
+def test_no_delay_never_sleeps():
+    sleeps = []
+    list(backend(sleep=sleeps.append).stream("What is a P/E ratio?"))
+    assert sleeps == []
+
+
+def test_timed_reports_first_chunk_and_total():
+    ticks = iter([0.0, 0.5, 1.0, 2.0])
+    stats = {}
+    assert list(timed(iter(["a ", "b"]), stats, clock=lambda: next(ticks))) == ["a ", "b"]
+    assert stats == {"first_token": 0.5, "total": 2.0}
+
+
+def test_handlers_answer_first_and_none_falls_through_to_the_router():
+    seen = []
+    local = backend(handlers=[lambda prompt: seen.append(prompt)])
+    assert respond(local, "What is a P/E ratio?") == INTENTS["pe_ratio"]["answer"]
+    assert seen == ["What is a P/E ratio?"]
+
+    local = backend(handlers=[lambda prompt: "computed", lambda prompt: "never"])
+    assert respond(local, "What is a P/E ratio?") == "computed"
+
+
+def test_an_unknown_intent_gets_the_fallback():
+    assert respond(backend(handlers=[lambda prompt: None]), "zzz qqq") == FALLBACK_ANSWER
+    assert respond(backend(fallback="No idea."), "zzz qqq") == "No idea."
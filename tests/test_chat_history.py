@@ -0,0 +1,41 @@
+import os
+
+from chat_history import ChatHistory, prune_spills
+
+
+def test_old_messages_are_compacted_and_spilled(tmp_path):
+    spill_path = str(tmp_path / "chat" / "session.jsonl")
+    history = ChatHistory(greeting="Hi", window=4, spill_path=spill_path)
+    for turn in range(5):
+        history.append("user", f"question {turn}")
+        history.append("assistant", f"answer {turn}")
+
+    assert len(history.messages) == 4 and len(history) == 11
+    assert [message["content"] for message in history.visible(2)] == ["question 4", "answer 4"]
+    assert '"question 2"' in history.summary()
+    assert [message["content"] for message in history.transcript()][:3] == ["Hi", "question 0", "answer 0"]
+
+
+def test_clear_deletes_the_spill_file(tmp_path):
+    spill_path = str(tmp_path / "session.jsonl")
+    history = ChatHistory(window=2, spill_path=spill_path)
+    for turn in range(3):
+        history.append("user", f"question {turn}")
+    assert os.path.exists(spill_path)
+
+    history.clear(greeting="Hi again")
+    assert not os.path.exists(spill_path)
+    assert history.messages == [{"role": "assistant", "content": "Hi again"}]
+    assert history.summary() is None and len(history) == 1
+
+
+def test_prune_removes_only_expired_spill_files(tmp_path):
+    old, recent, other = tmp_path / "old.jsonl", tmp_path / "recent.jsonl", tmp_path / "notes.txt"
+    for path in (old, recent, other):
+        path.write_text("{}\n")
+    os.utime(old, (1_000, 1_000))
+    os.utime(other, (1_000, 1_000))
+
+    assert prune_spills(str(tmp_path), max_age=3_600) == 1
+    assert not old.exists() and recent.exists() and other.exists()
+    assert prune_spills(str(tmp_path / "missing")) == 0
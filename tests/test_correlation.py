@@ -0,0 +1,47 @@
+import numpy as np
+import pandas as pd
+
+from correlation import CorrelationService, RunningCorrelation
+
+
+def returns_frame(n_days=300, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-01-02", periods=n_days)
+    market = rng.normal(0, 0.01, (n_days, 1))
+    return pd.DataFrame(market * [0.5, 1.0, 1.5] + rng.normal(0, 0.01, (n_days, 3)),
+                        index=index, columns=["A", "B", "C"])
+
+
+def test_running_sums_match_a_full_recompute():
+    returns = returns_frame()
+    tracker = RunningCorrelation(returns.columns)
+    tracker.update(returns.iloc[:200]).update(returns)
+
+    np.testing.assert_allclose(tracker.matrix().to_numpy(), returns.corr().to_numpy(), atol=1e-10)
+
+
+def test_window_drops_days_falling_out_of_it():
+    returns = returns_frame()
+    service = CorrelationService(window=60)
+    service.update("book", returns.iloc[:-10])
+    matrix = service.update("book", returns)
+
+    np.testing.assert_allclose(matrix.to_numpy(), returns.iloc[-60:].corr().to_numpy(), atol=1e-10)
+
+
+def test_trackers_of_old_versions_are_evicted():
+    returns = returns_frame()
+    service = CorrelationService(max_trackers=3)
+    for version in range(10):
+        service.update(("live", False, version), returns)
+
+    assert list(service._trackers) == [("live", False, version) for version in (7, 8, 9)]
+
+
+def test_a_tracker_of_simulated_returns_is_not_reused_for_live_ones():
+    simulated, live = returns_frame(seed=1), returns_frame(seed=2)
+    service = CorrelationService()
+    service.update(("mock", False, 1), simulated)
+    matrix = service.update(("live", False, 1), live)
+
+    np.testing.assert_allclose(matrix.to_numpy(), live.corr().to_numpy(), atol=1e-10)
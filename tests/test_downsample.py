@@ -0,0 +1,78 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from downsample import downsample_line, lttb, resample_ohlc
+
+
+# Textbook LTTB, one bucket at a time
+def reference_lttb(x, y, threshold):
+    n = len(y)
+    size = (n - 2) / (threshold - 2)
+    selected, anchor = [0], 0
+    for bucket in range(threshold - 2):
+        start, stop = int(np.floor(bucket * size)) + 1, int(np.floor((bucket + 1) * size)) + 1
+        next_stop = min(int(np.floor((bucket + 2) * size)) + 1, n)
+        next_x, next_y = x[stop:next_stop].mean(), y[stop:next_stop].mean()
+        area = [abs((x[anchor] - next_x) * (y[i] - y[anchor]) - (x[anchor] - x[i]) * (next_y - y[anchor]))
+                for i in range(start, stop)]
+        anchor = start + int(np.argmax(area))
+        selected.append(anchor)
+    return np.array(selected + [n - 1])
+
+
+def random_walk(n, seed=0):
+    return np.cumsum(np.random.default_rng(seed).normal(0, 1, n))
+
+
+@pytest.mark.parametrize("n, threshold", [(1_000, 100), (5_003, 250), (64, 10)])
+def test_lttb_matches_the_textbook_algorithm(n, threshold):
+    x, y = np.arange(n, dtype=float), random_walk(n)
+    np.testing.assert_array_equal(lttb(x, y, threshold), reference_lttb(x, y, threshold))
+
+
+def test_lttb_keeps_the_endpoints_and_the_extremes():
+    y = random_walk(10_000)
+    y[3_333], y[7_777] = 1_000.0, -1_000.0
+    kept = lttb(np.arange(len(y)), y, 200)
+
+    assert len(kept) == 200 and kept[0] == 0 and kept[-1] == len(y) - 1
+    assert np.all(np.diff(kept) > 0)
+    assert {3_333, 7_777} <= set(kept)
+
+
+def test_short_series_and_tiny_budgets_are_left_alone():
+    assert lttb(np.arange(5), np.arange(5), 10).tolist() == [0, 1, 2, 3, 4]
+    assert lttb(np.arange(5), np.arange(5), 2).tolist() == [0, 1, 2, 3, 4]
+
+
+def test_downsample_line_drops_gaps_and_keeps_dates():
+    index = pd.bdate_range(end="2025-01-02", periods=3_000)
+    series = pd.Series(random_walk(3_000), index=index)
+    series.iloc[10] = np.nan
+
+    reduced = downsample_line(series, max_points=500)
+    assert len(reduced) == 500 and reduced.notna().all()
+    pd.testing.assert_series_equal(reduced, series.loc[reduced.index])
+    assert reduced.index[0] == index[0] and reduced.index[-1] == index[-1]
+
+
+def test_ohlc_groups_keep_the_price_envelope_and_total_volume():
+    rng = np.random.default_rng(0)
+    close = 100 + random_walk(1_001)
+    bars = pd.DataFrame({"Open": close + rng.normal(0, 0.5, 1_001), "High": close + 2, "Low": close - 2,
+                         "Close": close, "Volume": rng.integers(1, 1_000, 1_001).astype(float)},
+                        index=pd.bdate_range(end="2025-01-02", periods=1_001))
+
+    merged = resample_ohlc(bars, max_bars=100)
+    assert len(merged) <= 100
+    assert merged["High"].max() == bars["High"].max() and merged["Low"].min() == bars["Low"].min()
+    assert merged["Volume"].sum() == bars["Volume"].sum()
+    assert merged["Open"].iloc[0] == bars["Open"].iloc[0] and merged["Close"].iloc[-1] == bars["Close"].iloc[-1]
+
+    # Groups of 11 bars, each stamped with its first bar
+    first = bars.iloc[11:22]
+    assert merged.index[1] == first.index[0]
+    assert merged.iloc[1].tolist() == [first["Open"].iloc[0], first["High"].max(), first["Low"].min(),
+                                       first["Close"].iloc[-1], first["Volume"].sum()]
+    pd.testing.assert_frame_equal(resample_ohlc(bars.iloc[:50], max_bars=100), bars.iloc[:50])
@@ -0,0 +1,75 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from facets import FacetIndex, _popcounts, pack
+
+COLUMNS = ["account", "sector", "currency"]
+
+
+def random_frame(n_rows=1_003, seed=0):
+    rng = np.random.default_rng(seed)
+    frame = pd.DataFrame({
+        "account": rng.choice(["Fidelity", "Robinhood", "Schwab"], n_rows),
+        "sector": rng.choice(["Energy", "Technology", "Utilities", "Financials"], n_rows).astype(object),
+        "currency": rng.choice(["USD", "EUR"], n_rows),
+    })
+    frame.loc[rng.choice(n_rows, 50, replace=False), "sector"] = None
+    return frame
+
+
+# Rows matching every constrained facet, by pandas masks
+def pandas_mask(frame, selections, base):
+    mask = base.copy()
+    for column, selected in selections.items():
+        if selected:
+            mask &= frame[column].isin(selected).to_numpy()
+    return mask
+
+
+SELECTIONS = [
+    {},
+    {"account": ["Schwab"]},
+    {"account": ["Schwab", "Fidelity"], "sector": ["Energy", "Technology"]},
+    {"account": [], "sector": ["Utilities"], "currency": ["EUR"]},
+    {"sector": ["Unknown"]},
+]
+
+
+@pytest.mark.parametrize("selections", SELECTIONS)
+@pytest.mark.parametrize("with_base", [False, True])
+def test_bitmaps_agree_with_pandas_masks(selections, with_base):
+    frame = random_frame()
+    base = np.random.default_rng(1).random(len(frame)) < 0.6 if with_base else np.ones(len(frame), dtype=bool)
+    index = FacetIndex(frame, COLUMNS)
+
+    rows, counts = index.query(selections, pack(base) if with_base else None)
+    np.testing.assert_array_equal(rows, np.flatnonzero(pandas_mask(frame, selections, base)))
+
+    # Each facet counts its values under the other facets' selections only
+    for column in COLUMNS:
+        others = {other: selected for other, selected in selections.items() if other != column}
+        expected = frame.loc[pandas_mask(frame, others, base), column].value_counts()
+        assert counts[column] == {value: int(expected.get(value, 0)) for value in index.values[column]}
+
+
+def test_mask_is_none_without_constraints_and_a_packed_row_mask_otherwise():
+    frame = random_frame()
+    index = FacetIndex(frame, COLUMNS + ["missing"])
+
+    assert index.columns == COLUMNS
+    assert index.mask({"account": []}) is None
+    packed = index.mask({"currency": ["USD"]})
+    assert len(packed) % 8 == 0
+    np.testing.assert_array_equal(np.unpackbits(packed, count=len(frame)).astype(bool), frame["currency"] == "USD")
+
+
+def test_popcounts_without_the_numpy_2_ufunc(monkeypatch):
+    frame = random_frame()
+    index = FacetIndex(frame, COLUMNS)
+    mask = pack(frame["currency"] == "EUR")
+    expected = _popcounts(index.bitmaps["account"], mask)
+
+    monkeypatch.delattr(np, "bitwise_count", raising=False)
+    np.testing.assert_array_equal(_popcounts(index.bitmaps["account"], mask), expected)
+    assert expected.tolist() == frame[frame["currency"] == "EUR"]["account"].value_counts().sort_index().tolist()
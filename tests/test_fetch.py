@@ -0,0 +1,43 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from fetch import fetch_concurrently
+
+
+def test_results_and_errors_are_collected_per_call():
+    def fail():
+        raise KeyError("news")
+
+    results, errors = fetch_concurrently({"info": lambda: {"longName": "Apple"}, "news": fail})
+    assert results == {"info": {"longName": "Apple"}}
+    assert list(errors) == ["news"] and isinstance(errors["news"], KeyError)
+
+
+def test_calls_run_concurrently():
+    barrier = threading.Barrier(3, timeout=5)
+
+    # Each call only returns once all three are running at the same time
+    def call(name):
+        barrier.wait()
+        return name
+
+    results, errors = fetch_concurrently({name: (lambda name=name: call(name)) for name in "abc"}, timeout=5)
+    assert errors == {} and results == {"a": "a", "b": "b", "c": "c"}
+
+
+def test_a_hung_call_times_out_without_holding_back_the_others():
+    release = threading.Event()
+    executor = ThreadPoolExecutor(max_workers=4)
+    try:
+        started = time.monotonic()
+        results, errors = fetch_concurrently(
+            {"slow": lambda: release.wait(10), "fast": lambda: 1, "statements": lambda: 2},
+            timeout=5, timeouts={"slow": 0.2}, executor=executor,
+        )
+        assert time.monotonic() - started < 2
+        assert results == {"fast": 1, "statements": 2}
+        assert isinstance(errors["slow"], TimeoutError) and "0.2s" in str(errors["slow"])
+    finally:
+        release.set()
+        executor.shutdown()
@@ -0,0 +1,114 @@
+import io
+
+import numpy as np
+import pandas as pd
+import pytest
+
+import ingest
+from ingest import UnrecognizedStatementError, combine_lots, import_csv, parse_numbers
+
+SCHWAB = """Positions for account Individual ...123 as of 09:30 AM ET, 01/02/2025
+
+"Symbol","Description","Quantity","Price","Market Value","Day Change %","Cost Basis","Gain/Loss $"
+"AAPL","APPLE INC","10","$190.00","$1,900.00","+1.00%","$1,500.00","$400.00"
+"TSLA","TESLA INC","5","$240.00","$1,200.00","-1.25%","$1,320.00","($120.00)"
+"AAPL","APPLE INC","10","$190.00","$1,900.00","+1.00%","$1,700.00","$200.00"
+"Cash & Cash Investments","--","--","--","$500.00","--","--","--"
+"Account Total","--","--","--","$5,500.00","--","--","--"
+"""
+
+IBKR = """Statement,Header,Field Name,Field Value
+Statement,Data,Period,"January 2, 2025"
+Open Positions,Header,DataDiscriminator,Symbol,Quantity,Cost Basis,Value,Unrealized P/L
+Open Positions,Data,Summary,MSFT,4,1400,1600,200
+Open Positions,Data,Lot,MSFT,4,1400,1600,200
+Open Positions,Data,Summary,NVDA,2,900,1000,100
+Trades,Header,Symbol,Quantity
+Trades,Data,MSFT,1
+"""
+
+
+def read(text, **options):
+    return import_csv(io.BytesIO(text.encode()), **options)
+
+
+def test_parse_numbers_handles_currency_parentheses_signs_and_placeholders():
+    values = parse_numbers(pd.Series(["$1,234.56", "(12.00)", "+1.35%", "-2.5", "--", ""]))
+    np.testing.assert_array_equal(values.to_numpy()[:4], [1234.56, -12.0, 1.35, -2.5])
+    assert values.iloc[4:].isna().all()
+
+
+def test_flat_export_is_detected_normalized_and_lots_combined():
+    result = read(SCHWAB)
+    holdings = result.holdings.set_index("ticker")
+
+    assert result.brokerage == "Schwab"
+    assert list(holdings.index) == ["AAPL", "TSLA"]
+    assert holdings.loc["AAPL", "quantity"] == 20 and holdings.loc["AAPL", "cost_basis"] == 3200
+    assert holdings.loc["TSLA", "total_gain_loss"] == -120 and holdings.loc["TSLA", "day_change_pct"] == -1.25
+
+
+def test_sectioned_statement_keeps_only_summary_rows_of_the_position_section():
+    result = read(IBKR)
+    holdings = result.holdings.set_index("ticker")
+
+    assert result.brokerage == "Interactive Brokers"
+    assert list(holdings.index) == ["MSFT", "NVDA"]
+    assert holdings.loc["MSFT", "market_value"] == 1600 and holdings.loc["NVDA", "total_gain_loss"] == 100
+
+
+def test_small_chunks_give_the_same_holdings_and_report_progress():
+    calls = []
+    chunked = read(SCHWAB, chunk_rows=1, progress=lambda rows, bytes_read: calls.append(rows))
+
+    pd.testing.assert_frame_equal(chunked.holdings, read(SCHWAB).holdings)
+    assert len(calls) > 1 and calls == sorted(calls)
+
+
+def generated_export(n_rows, n_tickers=50):
+    lines = ['"Symbol","Description","Quantity","Price","Market Value","Day Change %","Cost Basis","Gain/Loss $"']
+    for i in range(n_rows):
+        lines.append(f'"T{i % n_tickers:03d}","Company","2","$10.00","$20.00","+0.50%","$18.00","$2.00"')
+    return ("\n".join(lines) + "\n").encode()
+
+
+def test_large_exports_stream_in_chunks_of_at_most_chunk_rows(monkeypatch):
+    payload = generated_export(2_500)
+    sizes, progress = [], []
+    normalize = ingest.normalize_chunk
+
+    def recording(frame, layout):
+        sizes.append(len(frame))
+        return normalize(frame, layout)
+
+    monkeypatch.setattr(ingest, "normalize_chunk", recording)
+    result = import_csv(io.BytesIO(payload), chunk_rows=1_000,
+                        progress=lambda rows, bytes_read: progress.append(bytes_read))
+
+    assert sizes == [1_000, 1_000, 500]
+    assert result.rows_read == 2_501
+    assert progress == sorted(progress) and progress[-1] == len(payload)
+    assert len(result.holdings) == 50 and (result.holdings["quantity"] == 100).all()
+
+
+def test_sectioned_statements_stream_in_chunks_too():
+    rows = "".join(f"Open Positions,Data,Summary,T{chr(65 + i % 26)},1,10,12,2\n" for i in range(260))
+    text = IBKR.split("Open Positions,Data")[0] + rows
+
+    chunked, whole = read(text, chunk_rows=7), read(text)
+    pd.testing.assert_frame_equal(chunked.holdings, whole.holdings)
+    assert len(whole.holdings) == 26 and (whole.holdings["quantity"] == 10).all()
+
+
+def test_unknown_layout_is_rejected():
+    with pytest.raises(UnrecognizedStatementError):
+        read("Name,Amount\nfoo,1\n")
+
+
+def test_combine_lots_weights_day_change_by_market_value():
+    lots = pd.DataFrame({
+        "ticker": ["A", "A"], "quantity": [1.0, 3.0], "cost_basis": [10.0, 30.0],
+        "market_value": [100.0, 300.0], "day_change_pct": [2.0, -2.0], "total_gain_loss": [90.0, 270.0],
+    })
+    combined = combine_lots(lots).iloc[0]
+    assert combined["quantity"] == 4 and combined["day_change_pct"] == pytest.approx(-1.0)
@@ -0,0 +1,24 @@
+from intents import GLOSSARY, INTENTS, IntentRouter, glossary_intents
+
+
+def router():
+    return IntentRouter({**INTENTS, **glossary_intents(GLOSSARY)})
+
+
+def test_a_specific_term_outranks_the_generic_one_it_contains():
+    answers = router().answers_for("Explain dividend yield")
+    assert answers == [INTENTS["dividend_yield"]["answer"]]
+
+
+def test_phrases_match_case_and_punctuation_insensitively():
+    names = [name for name, _ in router().route("What's a P/E RATIO?")]
+    assert names[0] == "pe_ratio"
+
+
+def test_several_distinct_topics_are_all_answered():
+    names = {name for name, _ in router().route("what is the sharpe ratio and beta")}
+    assert {"glossary:Sharpe Ratio", "glossary:Beta"} <= names
+
+
+def test_unrelated_prompts_match_nothing():
+    assert router().answers_for("hello there") == []
@@ -0,0 +1,169 @@
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+import pandas as pd
+import pytest
+
+from market_data import MarketDataCache
+
+
+# Provider counting upstream calls per endpoint
+class FakeProvider:
+    def __init__(self):
+        self.calls = []
+
+    def info(self, ticker):
+        self.calls.append(("info", ticker))
+        return {"longName": ticker}
+
+    def history(self, ticker, period="1y", interval="1d"):
+        self.calls.append(("history", ticker, period, interval))
+        return pd.DataFrame({"Close": [1.0, 2.0]})
+
+    def quote(self, tickers):
+        self.calls.append(("quote", tuple(tickers)))
+        return {ticker: {"price": 10.0} for ticker in tickers}
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+def test_hit_within_ttl_and_refetch_after_expiry():
+    provider, clock = FakeProvider(), Clock()
+    cache = MarketDataCache(provider=provider, ttls={"info": 30}, clock=clock)
+
+    assert cache.info("aapl") == {"longName": "AAPL"}
+    clock.now = 29
+    cache.info("AAPL")
+    assert provider.calls == [("info", "AAPL")]
+
+    clock.now = 31
+    cache.info("AAPL")
+    assert len(provider.calls) == 2
+    assert cache.stats()["hits"] == 1 and cache.stats()["misses"] == 2
+
+
+def test_params_are_part_of_the_key():
+    provider = FakeProvider()
+    cache = MarketDataCache(provider=provider)
+
+    cache.history("AAPL", period="1y")
+    cache.history("AAPL", period="5y")
+    cache.history("AAPL", period="1y")
+    assert len(provider.calls) == 2
+
+
+def test_least_recently_used_entries_are_evicted_by_size():
+    provider = FakeProvider()
+    cache = MarketDataCache(provider=provider, max_bytes=10_000)
+    cache.put(("info", "A", ()), b"x" * 4_000, 60)
+    cache.put(("info", "B", ()), b"x" * 4_000, 60)
+    cache.get("info", "A")
+    cache.put(("info", "C", ()), b"x" * 4_000, 60)
+
+    assert cache.peek_many("info", ["A", "B", "C"]).keys() == {"A", "C"}
+    assert cache.stats()["evictions"] == 1
+    assert cache.stats()["bytes"] <= 10_000
+
+
+def test_values_larger_than_the_cache_are_not_stored():
+    cache = MarketDataCache(provider=FakeProvider(), max_bytes=1_000)
+    cache.put(("info", "A", ()), b"x" * 5_000, 60)
+    assert cache.stats()["entries"] == 0
+
+
+def test_get_many_fetches_only_misses_in_batches():
+    provider = FakeProvider()
+    cache = MarketDataCache(provider=provider)
+    cache.get_many("quote", ["A", "B"])
+    quotes = cache.get_many("quote", ["a", "B", "C", "D", "E"], batch_size=2)
+
+    assert set(quotes) == {"A", "B", "C", "D", "E"}
+    assert provider.calls == [("quote", ("A", "B")), ("quote", ("C", "D")), ("quote", ("E",))]
+
+
+def test_invalidate_drops_one_ticker_or_everything():
+    provider = FakeProvider()
+    cache = MarketDataCache(provider=provider)
+    cache.info("A")
+    cache.info("B")
+
+    cache.invalidate("a")
+    cache.info("A")
+    cache.info("B")
+    assert provider.calls.count(("info", "A")) == 2 and provider.calls.count(("info", "B")) == 1
+
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+
+# Provider whose info calls block until released, counting calls
+class BlockingProvider:
+    def __init__(self):
+        self.release = threading.Event()
+        self.started = threading.Event()
+        self.calls = 0
+
+    def info(self, ticker):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {"longName": ticker}
+
+    def quote(self, tickers):
+        self.calls += 1
+        self.started.set()
+        self.release.wait(5)
+        return {ticker: {"price": 1.0} for ticker in tickers}
+
+
+def test_concurrent_misses_share_one_upstream_call():
+    provider = BlockingProvider()
+    cache = MarketDataCache(provider=provider)
+    with ThreadPoolExecutor(max_workers=8) as executor:
+        futures = [executor.submit(cache.info, "AAPL") for _ in range(8)]
+        provider.started.wait(5)
+        time.sleep(0.05)
+        provider.release.set()
+        values = [future.result() for future in futures]
+
+    assert provider.calls == 1 and all(value == {"longName": "AAPL"} for value in values)
+    assert cache.stats()["coalesced"] == 7
+
+
+def test_a_miss_landing_after_a_flight_reuses_its_value():
+    provider = FakeProvider()
+
+    # A flight lands between this caller's miss and its claim
+    class RacingCache(MarketDataCache):
+        def _claim(self, keys, reuse=False):
+            for key in keys:
+                self.put(key, {"longName": "from flight"}, 60)
+            return super()._claim(keys, reuse)
+
+    cache = RacingCache(provider=provider)
+    assert cache.info("AAPL") == {"longName": "from flight"}
+    assert cache.get_many("quote", ["A"]) == {"A": {"longName": "from flight"}}
+    assert provider.calls == []
+
+    # A refresh goes upstream whatever is cached
+    cache.refresh("info", "AAPL")
+    assert provider.calls == [("info", "AAPL")]
+
+
+def test_waiters_give_up_on_a_hung_flight():
+    provider = BlockingProvider()
+    cache = MarketDataCache(provider=provider, flight_timeout=0.05)
+    with ThreadPoolExecutor(max_workers=2) as executor:
+        first = executor.submit(cache.info, "AAPL")
+        provider.started.wait(5)
+        with pytest.raises(TimeoutError):
+            cache.info("AAPL")
+        provider.release.set()
+        assert first.result() == {"longName": "AAPL"}
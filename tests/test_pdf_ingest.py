@@ -0,0 +1,73 @@
+import io
+
+import pytest
+
+from ingest import UnrecognizedStatementError
+from pdf_ingest import import_pdf, parse_positions
+
+
+# Minimal PDF with one text line per row, one list of rows per page
+def make_pdf(pages):
+    objects = ["<< /Type /Catalog /Pages 2 0 R >>", None, "<< /Type /Font /Subtype /Type1 /BaseFont /Helvetica >>"]
+    kids = []
+    for rows in pages:
+        text = " ".join(f"({row}) Tj 0 -14 Td" for row in rows)
+        stream = f"BT /F1 10 Tf 40 780 Td {text} ET"
+        objects.append(f"<< /Length {len(stream)} >>\nstream\n{stream}\nendstream")
+        objects.append(f"<< /Type /Page /Parent 2 0 R /MediaBox [0 0 612 792] "
+                       f"/Resources << /Font << /F1 3 0 R >> >> /Contents {len(objects)} 0 R >>")
+        kids.append(f"{len(objects)} 0 R")
+    objects[1] = f"<< /Type /Pages /Kids [{' '.join(kids)}] /Count {len(kids)} >>"
+
+    out = io.BytesIO()
+    out.write(b"%PDF-1.4\n")
+    offsets = []
+    for number, body in enumerate(objects, start=1):
+        offsets.append(out.tell())
+        out.write(f"{number} 0 obj\n{body}\nendobj\n".encode("latin-1"))
+    xref = out.tell()
+    out.write(f"xref\n0 {len(objects) + 1}\n0000000000 65535 f \n".encode())
+    out.write("".join(f"{offset:010d} 00000 n \n" for offset in offsets).encode())
+    out.write(f"trailer\n<< /Size {len(objects) + 1} /Root 1 0 R >>\nstartxref\n{xref}\n%%EOF\n".encode())
+    out.seek(0)
+    return out
+
+
+ROWS = [
+    "Charles Schwab Positions",
+    "AAPL 10 190.00 1,900.00 1,500.00 400.00 +1.00%",
+    "TSLA 5 240.00 1,200.00 1,320.00 -120.00 -1.25%",
+    "TOTAL 1 1.00 1.00",
+]
+
+
+def test_negative_values_stay_negative():
+    positions = {row["ticker"]: row for row in parse_positions("\n".join(ROWS))}
+
+    assert set(positions) == {"AAPL", "TSLA"}
+    assert positions["TSLA"]["total_gain_loss"] == -120.0
+    assert positions["TSLA"]["day_change_pct"] == -1.25
+    assert parse_positions("MSFT 4 400.00 1,600.00 1,800.00 (200.00) (0.50%)")[0]["total_gain_loss"] == -200.0
+
+
+def test_statement_pages_are_parsed_in_order():
+    result = import_pdf(make_pdf([ROWS, ["MSFT 4 400.00 1,600.00 1,400.00 200.00 +0.50%"]]))
+    holdings = result.holdings.set_index("ticker")
+
+    assert result.brokerage == "Schwab" and result.pages == 2
+    assert list(holdings.index) == ["AAPL", "TSLA", "MSFT"]
+    assert holdings.loc["TSLA", "total_gain_loss"] == -120.0
+
+
+def test_pool_and_inline_parsing_agree():
+    pages = [ROWS] + [[f"X{chr(65 + i // 26)}{chr(65 + i % 26)} 1 10.00 10.00 8.00 2.00 +0.10%"] for i in range(40)]
+    inline = import_pdf(make_pdf(pages), workers=1)
+    pooled = import_pdf(make_pdf(pages), workers=2)
+
+    assert len(inline.holdings) == 42
+    assert inline.holdings.equals(pooled.holdings)
+
+
+def test_unreadable_files_are_rejected():
+    with pytest.raises(UnrecognizedStatementError):
+        import_pdf(io.BytesIO(b"not a pdf"))
@@ -0,0 +1,34 @@
+import numpy as np
+import pandas as pd
+
+from performance import PerformanceEngine, constant_quantities
+
+
+def closes_frame(n_days=60, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-01-02", periods=n_days)
+    return pd.DataFrame(100 * np.exp(np.cumsum(rng.normal(0, 0.01, (n_days, 2)), axis=0)),
+                        index=index, columns=["A", "B"])
+
+
+def test_extending_a_curve_matches_a_full_build():
+    closes = closes_frame()
+    quantities = constant_quantities(closes.index, {"A": 3, "B": 5})
+    incremental, full = PerformanceEngine(), PerformanceEngine()
+    incremental.update("book", closes.iloc[:-5], quantities)
+    incremental.update("book", closes, quantities)
+    full.update("book", closes, quantities)
+
+    pd.testing.assert_series_equal(incremental.curve("book", "All"), full.curve("book", "All"))
+
+
+def test_curves_of_old_versions_are_evicted():
+    closes = closes_frame()
+    quantities = constant_quantities(closes.index, {"A": 1, "B": 1})
+    engine = PerformanceEngine(max_curves=3)
+    for version in range(10):
+        engine.update(("mock", "Combined", version), closes, quantities)
+        engine.curve(("mock", "Combined", version), "1M")
+
+    assert list(engine._curves) == [("mock", "Combined", version) for version in (7, 8, 9)]
+    assert {key for key, _ in engine._ranges} <= set(engine._curves)
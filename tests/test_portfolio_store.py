@@ -0,0 +1,40 @@
+import pandas as pd
+
+from portfolio_store import COMBINED, PortfolioStore
+
+
+def holdings(*tickers):
+    return pd.DataFrame({
+        "ticker": list(tickers), "quantity": [1.0] * len(tickers), "cost_basis": [10.0] * len(tickers),
+        "market_value": [12.0] * len(tickers), "day_change_pct": [0.0] * len(tickers),
+        "total_gain_loss": [2.0] * len(tickers),
+    })
+
+
+def test_combined_is_materialized_across_accounts(tmp_path):
+    store = PortfolioStore(str(tmp_path))
+    store.save_account("Schwab", holdings("AAPL", "MSFT"))
+    store.save_account("Fidelity", holdings("AAPL"))
+
+    quantities = store.load_holdings(COMBINED).groupby("ticker")["quantity"].sum()
+    assert quantities.to_dict() == {"AAPL": 2, "MSFT": 1}
+    assert store.load_portfolio_data()[COMBINED]["market_value"] == 36
+
+
+def test_deleting_an_account_while_others_remain(tmp_path):
+    store = PortfolioStore(str(tmp_path))
+    store.save_account("Schwab", holdings("AAPL", "MSFT"))
+    store.save_account("Fidelity", holdings("TSLA"))
+    version = store.version
+
+    store.delete_account("Schwab")
+
+    assert store.accounts() == ["Fidelity"] and store.version > version
+    assert list(store.load_holdings(COMBINED)["ticker"]) == ["TSLA"]
+    assert PortfolioStore(str(tmp_path)).accounts() == ["Fidelity"]
+
+
+def test_other_instances_see_writes(tmp_path):
+    reader, writer = PortfolioStore(str(tmp_path)), PortfolioStore(str(tmp_path))
+    writer.save_account("Schwab", holdings("AAPL"))
+    assert reader.accounts() == ["Schwab"]
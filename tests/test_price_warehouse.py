@@ -0,0 +1,136 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from price_warehouse import PriceWarehouse, resample_bars, select_period
+
+
+# Stub of the provider's history endpoint over a settable series of daily bars, recording each call
+class StubProvider:
+    def __init__(self, bars):
+        self.bars = bars
+        self.end = bars.index[-1]
+        self.calls = []
+
+    def history(self, ticker, period="1y", interval="1d", start=None):
+        self.calls.append({"period": period, "start": start})
+        bars = self.bars[self.bars.index <= self.end]
+        if start is not None:
+            return bars[bars.index >= pd.Timestamp(start, tz=bars.index.tz)]
+        return bars
+
+    def info(self, ticker):
+        return {"symbol": ticker}
+
+
+def daily_bars(start="2023-11-01", end="2025-01-31"):
+    index = pd.bdate_range(start, end, tz="America/New_York")
+    close = np.linspace(100, 200, len(index))
+    return pd.DataFrame({
+        "Open": close - 1, "High": close + 2, "Low": close - 2, "Close": close,
+        "Volume": np.arange(len(index)) + 1, "Dividends": 0.0, "Stock Splits": 0.0,
+    }, index=index)
+
+
+class Clock:
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+@pytest.fixture
+def setup(tmp_path):
+    provider = StubProvider(daily_bars())
+    provider.end = pd.Timestamp("2025-01-24", tz="America/New_York")
+    clock = Clock()
+    return provider, clock, PriceWarehouse(str(tmp_path), provider, refresh_after=60, clock=clock)
+
+
+def test_later_requests_download_only_the_tail(setup, tmp_path):
+    provider, clock, warehouse = setup
+    warehouse.history("AAPL", period="1y")
+    assert provider.calls == [{"period": "max", "start": None}]
+
+    # Within refresh_after nothing goes upstream, whatever the view
+    warehouse.history("AAPL", period="5y", interval="1wk")
+    assert len(provider.calls) == 1
+
+    provider.end = pd.Timestamp("2025-01-31", tz="America/New_York")
+    clock.now = 61
+    bars = warehouse.history("AAPL", period="max")
+    assert provider.calls[-1]["start"] == "2025-01-24"
+    pd.testing.assert_frame_equal(bars, provider.bars, check_freq=False)
+
+    # Only the current year's file was rewritten, and a new process reads the stored bars back
+    assert sorted(path.name for path in (tmp_path / "AAPL").iterdir()) == ["2023.parquet", "2024.parquet",
+                                                                           "2025.parquet"]
+    reopened = StubProvider(provider.bars)
+    stored = PriceWarehouse(str(tmp_path), reopened).history("AAPL", period="max")
+    assert [call["start"] for call in reopened.calls] == ["2025-01-31"]
+    pd.testing.assert_frame_equal(stored, provider.bars, check_freq=False)
+
+
+def test_a_split_in_the_tail_downloads_the_full_history_again(setup):
+    provider, clock, warehouse = setup
+    warehouse.history("AAPL", period="max")
+
+    # A 2:1 split on the new day re-adjusts every earlier bar upstream
+    adjusted = provider.bars.copy()
+    split_day = pd.Timestamp("2025-01-27", tz="America/New_York")
+    adjusted.loc[adjusted.index < split_day, ["Open", "High", "Low", "Close"]] /= 2
+    adjusted.loc[split_day, "Stock Splits"] = 2.0
+    provider.bars = adjusted
+    provider.end = pd.Timestamp("2025-01-31", tz="America/New_York")
+    clock.now = 61
+
+    bars = warehouse.history("AAPL", period="max")
+    assert [call["period"] if call["start"] is None else "tail" for call in provider.calls] == ["max", "tail", "max"]
+    pd.testing.assert_frame_equal(bars, adjusted, check_freq=False)
+
+
+def test_a_dividend_also_triggers_a_full_download(setup):
+    provider, clock, warehouse = setup
+    warehouse.history("AAPL")
+    provider.bars.loc[pd.Timestamp("2025-01-28", tz="America/New_York"), "Dividends"] = 0.25
+    provider.end = pd.Timestamp("2025-01-31", tz="America/New_York")
+    clock.now = 61
+
+    warehouse.history("AAPL")
+    assert provider.calls[-1] == {"period": "max", "start": None}
+
+
+def test_periods_and_intervals_are_cut_and_resampled_from_daily_bars(setup):
+    provider, _, warehouse = setup
+    daily = provider.bars[provider.bars.index <= provider.end]
+
+    assert len(warehouse.history("AAPL", period="5d")) == 5
+    ytd = warehouse.history("AAPL", period="ytd")
+    assert ytd.index[0] == daily.index[daily.index.year == 2025][0]
+    month = warehouse.history("AAPL", period="1mo")
+    assert month.index[0] >= pd.Timestamp("2024-12-24", tz="America/New_York")
+
+    weekly = warehouse.history("AAPL", period="1y", interval="1wk")
+    assert (weekly.index.dayofweek == 0).all()
+    week = daily[(daily.index >= weekly.index[-2]) & (daily.index < weekly.index[-1])]
+    assert weekly.iloc[-2]["Open"] == week["Open"].iloc[0] and weekly.iloc[-2]["Close"] == week["Close"].iloc[-1]
+    assert weekly.iloc[-2]["High"] == week["High"].max() and weekly.iloc[-2]["Volume"] == week["Volume"].sum()
+
+    monthly = warehouse.history("AAPL", period="max", interval="1mo")
+    assert list(monthly.index.month[:3]) == [11, 12, 1] and (monthly.index.day == 1).all()
+    assert monthly["Volume"].sum() == daily["Volume"].sum()
+
+    five = resample_bars(select_period(daily, "1mo"), "5d")
+    assert five.index[0] == select_period(daily, "1mo").index[0] and five["Volume"].iloc[0] == \
+        select_period(daily, "1mo")["Volume"].iloc[:5].sum()
+
+    # Everything came from the one stored download
+    assert len(provider.calls) == 1
+
+
+def test_other_requests_pass_through_to_the_provider(setup):
+    provider, _, warehouse = setup
+    warehouse.history("AAPL", period="1d", interval="5m", start=None)
+    assert provider.calls[-1]["period"] == "1d"
+    assert warehouse.info("AAPL") == {"symbol": "AAPL"}
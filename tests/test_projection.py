@@ -0,0 +1,41 @@
+import numpy as np
+import pytest
+
+from projection import _exact_terminal, book_model, project
+from scenarios import PERCENTILES, benchmark_book
+
+
+@pytest.fixture(scope="module")
+def model():
+    holdings, closes = benchmark_book(20)
+    return book_model(holdings, closes, horizon=30)
+
+
+def test_histogram_percentiles_are_within_one_bin_of_exact_ones(model):
+    n_paths = 4096
+    projection = project(model, n_paths, seed=1, workers=1)
+    terminal = projection.percentiles().iloc[-1]
+    exact = _exact_terminal(model, n_paths, seed=1)
+
+    assert projection.clipped == 0
+    for i, percentile in enumerate(PERCENTILES):
+        assert abs(np.log(terminal[f"P{percentile}"] / exact[i])) <= model.width[-1]
+
+
+def test_every_day_has_ordered_percentiles_and_the_mean_of_all_paths(model):
+    frame = project(model, 2_000, seed=0, workers=1).percentiles()
+
+    assert len(frame) == model.horizon
+    columns = [f"P{percentile}" for percentile in sorted(PERCENTILES)]
+    assert (frame[columns].diff(axis=1).iloc[:, 1:] >= 0).all().all()
+    assert frame["mean"].iloc[0] == pytest.approx(model.start, rel=0.01)
+
+
+def test_results_do_not_depend_on_chunking_across_workers(model):
+    calls = []
+    serial = project(model, 2_000, seed=3, chunk_paths=500, workers=1, progress=lambda done, total: calls.append(done))
+    pooled = project(model, 2_000, seed=3, chunk_paths=500, workers=2)
+
+    np.testing.assert_array_equal(serial.counts, pooled.counts)
+    np.testing.assert_allclose(serial.sums, pooled.sums)
+    assert calls == [500, 1_000, 1_500, 2_000] and pooled.paths == 2_000
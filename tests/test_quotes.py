@@ -0,0 +1,77 @@
+import numpy as np
+import pandas as pd
+
+import market_data
+from market_data import MarketDataCache, YFinanceProvider, last_two_closes
+from quotes import QuoteService, collect_tickers
+
+
+def download_frame(tickers, closes):
+    index = pd.bdate_range(end="2025-01-03", periods=len(closes))
+    columns = pd.MultiIndex.from_product([["Close", "Open"], tickers])
+    return pd.DataFrame(np.hstack([closes, closes]), index=index, columns=columns)
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = []
+
+    def quote(self, tickers):
+        self.calls.append(tuple(tickers))
+        return {ticker: {"price": 10.0 + i, "previous_close": 9.0 + i} for i, ticker in enumerate(tickers)}
+
+
+def test_last_two_closes_skip_missing_days_per_ticker():
+    closes = np.array([[1.0, 5.0], [2.0, 6.0], [3.0, np.nan]])
+    frame = last_two_closes(download_frame(["A", "B"], closes), ["A", "B", "C"])
+
+    assert frame.loc["A"].tolist() == [3.0, 2.0]
+    assert frame.loc["B"].tolist() == [6.0, 5.0]
+    assert frame.loc["C"].isna().all()
+
+
+def test_a_single_ticker_download_without_a_column_level_is_read_too():
+    data = pd.DataFrame({"Close": [1.0, 2.0], "Open": [1.0, 2.0]})
+    assert last_two_closes(data, ["A"]).loc["A"].tolist() == [2.0, 1.0]
+
+
+def test_provider_quotes_many_tickers_with_one_download(monkeypatch):
+    calls = []
+
+    def download(tickers, **options):
+        calls.append(list(tickers))
+        return download_frame(tickers, np.array([[1.0, np.nan], [2.0, np.nan]]))
+
+    monkeypatch.setattr(market_data.yf, "download", download)
+    quotes = YFinanceProvider().quote(["A", "B"])
+
+    assert calls == [["A", "B"]]
+    assert quotes == {"A": {"price": 2.0, "previous_close": 1.0}}
+
+
+def test_tickers_are_deduplicated_across_accounts_and_fetched_in_chunks():
+    provider = FakeProvider()
+    service = QuoteService(MarketDataCache(provider=provider), chunk_size=2)
+    positions = {"One": [{"ticker": "aapl"}, {"ticker": "MSFT"}], "Two": [{"ticker": "AAPL"}, {"ticker": "TSLA"}]}
+
+    assert collect_tickers(positions) == ["AAPL", "MSFT", "TSLA"]
+    quotes = service.for_positions(positions)
+    assert list(quotes.index) == ["AAPL", "MSFT", "TSLA"]
+    assert provider.calls == [("AAPL", "MSFT"), ("TSLA",)]
+
+    service.for_positions(positions)
+    assert len(provider.calls) == 2
+
+
+def test_holdings_rows_get_their_quote_and_cached_reads_stay_local():
+    provider = FakeProvider()
+    service = QuoteService(MarketDataCache(provider=provider))
+    holdings = pd.DataFrame({"ticker": ["b", "A", "B"]}, index=[10, 11, 12])
+
+    aligned = service.for_holdings(holdings)
+    assert list(aligned.index) == [10, 11, 12]
+    assert aligned.loc[10, "price"] == aligned.loc[12, "price"] != aligned.loc[11, "price"]
+
+    cached = service.cached(["A", "Z"])
+    assert cached.loc["A", "price"] == aligned.loc[11, "price"] and np.isnan(cached.loc["Z", "price"])
+    assert len(provider.calls) == 1
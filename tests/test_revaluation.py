@@ -0,0 +1,51 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from revaluation import PositionBook, _random_positions, revalue_per_dict
+
+
+def test_vectorized_revaluation_matches_the_per_dict_loop():
+    positions, prices, previous_close = _random_positions(2_000, n_tickers=300, n_accounts=5)
+    expected = revalue_per_dict(positions, prices, previous_close)
+    revalued = PositionBook.from_positions(positions).revalue(prices, previous_close)
+
+    for account, summary in revalued.account_summaries().items():
+        for field in ["symbols", "cost_basis", "market_value", "day_change_pct", "unrealized_gain"]:
+            assert summary[field] == pytest.approx(expected[account][field])
+
+    holdings = revalued.to_portfolio_data()["Account 0"]["holdings"]
+    loop = pd.DataFrame(expected["Account 0"]["holdings"])
+    np.testing.assert_allclose(holdings["market_value"], loop["market_value"])
+    np.testing.assert_allclose(holdings["day_change_pct"], loop["day_change_pct"])
+
+
+def test_combined_summary_counts_each_ticker_once_and_weights_day_change_by_value():
+    book = PositionBook.from_positions({
+        "A": [{"ticker": "X", "quantity": 1, "cost_basis": 50.0}, {"ticker": "Y", "quantity": 1, "cost_basis": 10.0}],
+        "B": [{"ticker": "X", "quantity": 3, "cost_basis": 150.0}],
+    })
+    combined = book.revalue({"X": 110.0, "Y": 20.0}, {"X": 100.0, "Y": 20.0}).combined_summary()
+
+    assert combined["symbols"] == 2
+    assert combined["market_value"] == 460.0 and combined["unrealized_gain"] == 250.0
+    assert combined["day_change_pct"] == pytest.approx((460 / 420 - 1) * 100)
+
+
+def test_prices_align_by_ticker_and_a_missing_previous_close_means_no_change():
+    book = PositionBook.from_positions({"A": [{"ticker": "X", "quantity": 2, "cost_basis": 10.0},
+                                              {"ticker": "Y", "quantity": 1, "cost_basis": 5.0}]})
+    revalued = book.revalue(pd.Series({"Y": 7.0, "X": 4.0}), pd.Series({"Y": 0.0, "X": 5.0}))
+
+    np.testing.assert_allclose(revalued.market_value, [8.0, 7.0])
+    np.testing.assert_allclose(revalued.day_change_pct, [-20.0, 0.0])
+
+
+def test_from_frame_keeps_one_row_per_lot_and_account():
+    holdings = pd.DataFrame({"ticker": ["X", "X", "Y"], "account": ["A", "B", "B"],
+                             "quantity": [1.0, 2.0, 4.0], "cost_basis": [1.0, 2.0, 4.0]})
+    prices = {"X": 10.0, "Y": 1.0}
+    data = PositionBook.from_frame(holdings).revalue(prices, prices).to_portfolio_data({"B": 7})
+
+    assert data["A"]["market_value"] == 10.0 and data["B"]["market_value"] == 24.0
+    assert data["Combined"]["realized_gain"] == 7 and len(data["Combined"]["holdings"]) == 3
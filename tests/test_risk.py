@@ -0,0 +1,31 @@
+import numpy as np
+import pandas as pd
+
+from risk import TRADING_DAYS, compute_risk_metrics
+
+
+def daily_returns(n_days, seed=0):
+    rng = np.random.default_rng(seed)
+    index = pd.bdate_range(end="2025-01-02", periods=n_days)
+    market = rng.normal(0.0004, 0.01, n_days)
+    return (pd.DataFrame({"Portfolio": 1.2 * market + rng.normal(0, 0.005, n_days)}, index=index),
+            pd.DataFrame({"Market": market}, index=index))
+
+
+def test_short_ranges_report_the_period_return_without_annualizing():
+    returns, market = daily_returns(5)
+    summary = compute_risk_metrics(returns, market)["summary"].loc["Portfolio"]
+
+    assert np.isclose(summary["period_return"], (1 + returns["Portfolio"]).prod() - 1)
+    assert np.isnan(summary["annualized_return"]) and np.isnan(summary["sharpe"])
+    assert np.isnan(compute_risk_metrics(returns, market)["alpha"].iloc[0, 0])
+
+
+def test_a_year_of_returns_is_annualized_and_beta_recovered():
+    returns, market = daily_returns(TRADING_DAYS)
+    metrics = compute_risk_metrics(returns, market)
+    summary = metrics["summary"].loc["Portfolio"]
+
+    assert np.isclose(summary["annualized_return"], summary["period_return"])
+    assert np.isfinite(summary["sharpe"])
+    assert abs(metrics["beta"].loc["Portfolio", "Market"] - 1.2) < 0.1
@@ -0,0 +1,66 @@
+import numpy as np
+import pytest
+
+from assistant import LocalBackend, respond
+from intents import INTENTS, IntentRouter
+from scenarios import (MARKET, ScenarioEngine, ScenarioError, SecurityResolver, benchmark_book, mentions_scenario,
+                       parse_scenario)
+
+NAMES = {"AAPL": "Apple Inc.", "TSLA": "Tesla, Inc.", "MSFT": "Microsoft Corporation", "SPY": "SPDR S&P 500 ETF Trust",
+         "DIS": "The Walt Disney Company"}
+
+
+@pytest.mark.parametrize("prompt, trades, shocks", [
+    ("What if I invest $10,000 in Apple?", [("AAPL", 10_000.0, "usd")], {}),
+    ("What if I invest $10k in apple if the market drops 20%?", [("AAPL", 10_000.0, "usd")], {MARKET: -0.2}),
+    ("sell half my TSLA", [("TSLA", -0.5, "fraction")], {}),
+    ("buy 50 shares of MSFT", [("MSFT", 50.0, "shares")], {}),
+    ("What if tesla falls 30%?", [], {"TSLA": -0.3}),
+    ("a 20% crash in the S&P 500", [], {MARKET: -0.2}),
+])
+def test_trades_and_shocks_are_parsed(prompt, trades, shocks):
+    scenario = parse_scenario(prompt, SecurityResolver(NAMES, preferred=["TSLA"]))
+    assert scenario.trades == trades and scenario.shocks == shocks
+
+
+@pytest.mark.parametrize("prompt", ["What is a P/E ratio?", "should I invest in Apple?", "hello"])
+def test_questions_without_a_sized_trade_or_move_are_not_scenarios(prompt):
+    assert parse_scenario(prompt, SecurityResolver(NAMES)) is None
+
+
+def test_scenario_and_baseline_are_valued_on_the_same_draws():
+    holdings, closes = benchmark_book(20)
+    engine = ScenarioEngine(holdings, closes, n_paths=2_000, seed=0)
+    scenario = parse_scenario("What if I sell all my T003 and the market drops 10%?",
+                              SecurityResolver({ticker: ticker for ticker in closes.columns}))
+    assert scenario.trades == [("T003", -1.0, "fraction")] and scenario.shocks == {MARKET: -0.1}
+    result = engine.run(scenario)
+
+    # The sale is held as cash, so only the rest of the book takes the market's fall
+    sold = holdings.loc[holdings["ticker"] == "T003", "market_value"].sum()
+    assert result["start"][0] == pytest.approx(holdings["market_value"].sum())
+    assert sold + 0.8 * (result["start"][0] - sold) < result["start"][1] < result["start"][0]
+    assert result["percentiles"][5][0] < result["percentiles"][50][0] < result["percentiles"][95][0]
+
+    # No change at all reproduces the baseline exactly
+    unchanged = engine.run(parse_scenario("What if I buy 0 shares of T001", SecurityResolver({"T001": "x"})))
+    np.testing.assert_allclose(unchanged["percentiles"][50][0], unchanged["percentiles"][50][1])
+
+
+def test_tickers_without_history_are_reported():
+    holdings, closes = benchmark_book(5)
+    scenario = parse_scenario("buy $1000 of ZZZ", SecurityResolver({"ZZZ": "Zed"}))
+    with pytest.raises(ScenarioError, match="ZZZ"):
+        ScenarioEngine(holdings, closes, n_paths=100).run(scenario)
+
+
+def test_questions_the_handler_passes_on_get_the_router_answer():
+    calls = []
+
+    def handler(prompt):
+        calls.append(prompt)
+        return "simulated" if mentions_scenario(prompt) else None
+
+    backend = LocalBackend(IntentRouter(INTENTS), handlers=[handler])
+    assert respond(backend, "What if I invest $10000 in Apple?") == "simulated"
+    assert respond(backend, "Should I invest in Apple?") == INTENTS["invest_apple"]["answer"]
@@ -0,0 +1,109 @@
+from datetime import datetime, timedelta
+
+import pandas as pd
+
+from market_data import MarketDataCache
+from scheduler import HISTORY_VIEWS, NEW_YORK, WATCH_EXPIRY, RateLimiter, RefreshScheduler
+
+
+class FakeProvider:
+    def __init__(self):
+        self.calls = []
+
+    def quote(self, tickers):
+        self.calls.append(("quote", tuple(tickers)))
+        return {ticker: {"price": 1.0, "previous_close": 1.0} for ticker in tickers}
+
+    def history(self, ticker, period="1y", interval="1d"):
+        self.calls.append(("history", ticker, period, interval))
+        return pd.DataFrame({"Close": [1.0]})
+
+    def news(self, ticker):
+        self.calls.append(("news", ticker))
+        return []
+
+    def info(self, ticker):
+        self.calls.append(("info", ticker))
+        return {}
+
+    def income_stmt(self, ticker):
+        self.calls.append(("income_stmt", ticker))
+        return pd.DataFrame()
+
+    def balance_sheet(self, ticker):
+        self.calls.append(("balance_sheet", ticker))
+        return pd.DataFrame()
+
+    def cashflow(self, ticker):
+        self.calls.append(("cashflow", ticker))
+        return pd.DataFrame()
+
+
+def make_scheduler(monday_at="11:00"):
+    virtual = [0.0]
+    provider = FakeProvider()
+    cache = MarketDataCache(provider=provider, clock=lambda: virtual[0])
+    start = datetime.combine(datetime(2025, 1, 6).date(), datetime.strptime(monday_at, "%H:%M").time(), NEW_YORK)
+    scheduler = RefreshScheduler(
+        cache, benchmarks=["SPY"], clock=lambda: virtual[0], now=lambda: start + timedelta(seconds=virtual[0]),
+        limiter=RateLimiter(rate=1000, burst=1000, clock=lambda: virtual[0]), pass_budget=60,
+    )
+    return scheduler, cache, provider, virtual
+
+
+def test_held_tickers_get_every_history_view_warm():
+    scheduler, cache, provider, _ = make_scheduler()
+    scheduler.set_universe(["AAPL"])
+    scheduler.run_once()
+
+    for params in HISTORY_VIEWS:
+        assert set(cache.peek_many("history", ["AAPL", "SPY"], **params)) == {"AAPL", "SPY"}
+    assert cache.history("AAPL", period="1y") is not None
+    assert provider.calls.count(("history", "AAPL", "1y", "1d")) == 1
+
+
+def test_watched_views_are_kept_warm_until_they_expire():
+    scheduler, cache, provider, virtual = make_scheduler()
+    scheduler.watch("tsla", [("history", {"period": "5y", "interval": "1wk"}), ("news", {})])
+    scheduler.run_once()
+
+    fetched = len(provider.calls)
+    cache.history("TSLA", period="5y", interval="1wk")
+    cache.news("TSLA")
+    assert len(provider.calls) == fetched
+
+    # News follows its own cadence while the market is open
+    virtual[0] += 11 * 60
+    scheduler.run_once()
+    assert provider.calls.count(("news", "TSLA")) == 2
+
+    virtual[0] += WATCH_EXPIRY
+    scheduler.run_once()
+    assert scheduler.stats()["watched"] == 0
+
+
+def test_info_keeps_its_short_ttl_while_statements_last_the_night():
+    scheduler, cache, provider, virtual = make_scheduler(monday_at="19:00")
+    scheduler.set_universe(["AAPL"])
+    scheduler.watch("AAPL", [("info", {})])
+    scheduler.run_once()
+
+    assert provider.calls.count(("info", "AAPL")) == 1
+    cache.info("AAPL")
+    assert provider.calls.count(("info", "AAPL")) == 1
+
+    # Past the cache's own info TTL the current price is fetched again, statements are still warm
+    virtual[0] += cache.ttls["info"] + 1
+    cache.info("AAPL")
+    cache.income_stmt("AAPL")
+    assert provider.calls.count(("info", "AAPL")) == 2
+    assert provider.calls.count(("income_stmt", "AAPL")) == 1
+
+
+def test_held_tickers_are_not_sent_for_info_unless_watched():
+    scheduler, cache, provider, _ = make_scheduler(monday_at="19:00")
+    scheduler.set_universe(["AAPL"])
+    scheduler.run_once()
+
+    assert ("info", "AAPL") not in provider.calls
+    assert provider.calls.count(("cashflow", "AAPL")) == 1
@@ -0,0 +1,69 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from search import SearchIndex, load_security_master, tokenize
+from views import search_mask
+
+WORDS = ["Apple", "Applied", "Micro", "Microsoft", "Systems", "Global", "Holdings", "Energy", "Bio", "Devices"]
+
+
+def random_documents(n, seed=0):
+    rng = np.random.default_rng(seed)
+    return {("ticker", f"T{i}"): (f"T{i}", " ".join(rng.choice(WORDS, 3)) + " Inc.") for i in range(n)}
+
+
+# Every query word is a prefix of some word of the document
+def brute_force(documents, query):
+    words = tokenize(query)
+    return {key for key, fields in documents.items()
+            if all(any(token.startswith(word) for token in tokenize(" ".join(fields))) for word in words)}
+
+
+QUERIES = ["a", "app", "appl", "micro dev", "MICROSOFT", "s glob", "t1", "t12 hold", "zzz", "inc"]
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_prefix_search_matches_a_brute_force_filter(query):
+    documents = random_documents(300)
+    assert set(SearchIndex(documents).search(query)) == brute_force(documents, query)
+
+
+@pytest.mark.parametrize("query", QUERIES)
+def test_delta_updates_and_removals_match_a_brute_force_filter(query):
+    documents = random_documents(2_000)
+    index = SearchIndex(documents)
+
+    # Few enough changes to stay in the delta index and tombstones
+    changes = random_documents(40, seed=1)
+    changes.update({("ticker", "NEW"): ("NEW", "Applied Energy Devices"), ("account", "Schwab"): ("Schwab",)})
+    index.update(changes)
+    index.remove([("ticker", "T5"), ("ticker", "T7")])
+    assert index._delta_keys
+
+    documents.update(changes)
+    del documents[("ticker", "T5")], documents[("ticker", "T7")]
+    assert set(index.search(query)) == brute_force(documents, query)
+    assert len(index) == len(documents)
+
+
+def test_an_empty_query_returns_every_document():
+    documents = random_documents(10)
+    assert set(SearchIndex(documents).search("  ")) == set(documents)
+
+
+def test_holdings_match_by_ticker_or_account_through_the_index():
+    index = SearchIndex({("ticker", "AAPL"): ("AAPL", "Apple Inc."), ("ticker", "TSLA"): ("TSLA", "Tesla, Inc."),
+                         ("account", "Robinhood"): ("Robinhood",)})
+    holdings = pd.DataFrame({"ticker": ["AAPL", "TSLA", "MSFT"], "account": ["Schwab", "Schwab", "Robinhood"]})
+
+    assert search_mask(holdings, "apple", index).tolist() == [True, False, False]
+    assert search_mask(holdings, "robin", index).tolist() == [False, False, True]
+    assert search_mask(holdings, "sl").tolist() == [False, True, False]
+
+
+def test_security_master_maps_symbols_to_names(tmp_path):
+    path = tmp_path / "securities.csv"
+    path.write_text("Symbol,Name\naapl , Apple Inc.\n,Blank\n")
+    assert load_security_master(path) == {"AAPL": "Apple Inc."}
+    assert load_security_master(tmp_path / "missing.csv") == {}
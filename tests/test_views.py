@@ -0,0 +1,99 @@
+import numpy as np
+import pandas as pd
+import pytest
+
+from views import (HOLDINGS_COLUMN_CONFIG, ViewCache, format_holdings, format_holdings_strings, page_count,
+                   page_rows, sort_index)
+
+
+def test_views_are_built_once_per_key_and_shared():
+    cache = ViewCache()
+    builds = []
+
+    def build():
+        builds.append(1)
+        return pd.DataFrame({"a": [1]})
+
+    first = cache.get(("store", 1, "dashboard", "Combined", ()), build)
+    second = cache.get(("store", 1, "dashboard", "Combined", ()), build)
+    assert first is second and len(builds) == 1
+
+    # A new data version misses instead of serving the old frame
+    cache.get(("store", 2, "dashboard", "Combined", ()), build)
+    assert len(builds) == 2
+    assert cache.stats() == {"entries": 2, "hits": 1, "misses": 2}
+
+
+def test_least_recently_used_views_are_evicted():
+    cache = ViewCache(max_entries=2)
+    for key in ["a", "b", "a", "c"]:
+        cache.get((key,), lambda: key)
+
+    builds = []
+    cache.get(("a",), lambda: builds.append("a"))
+    cache.get(("b",), lambda: builds.append("b"))
+    assert builds == ["b"]
+
+
+def test_invalidate_drops_one_portfolio_or_everything():
+    cache = ViewCache()
+    for key in [("one", 1), ("one", 2), ("two", 1)]:
+        cache.get(key, lambda: np.zeros(1))
+
+    cache.invalidate("one")
+    assert cache.stats()["entries"] == 1
+    cache.invalidate()
+    assert cache.stats()["entries"] == 0
+
+
+def holdings_frame():
+    return pd.DataFrame({
+        "ticker": ["AAPL", "TSLA", "MSFT"],
+        "quantity": [10.0, 5.0, 2.5],
+        "cost_basis": [1500.0, 1320.0, 800.0],
+        "market_value": [1900.0, 1200.0, 1000.0],
+        "day_change_pct": [1.0, -1.25, 0.5],
+        "total_gain_loss": [400.0, -120.0, 200.0],
+        "account": ["Schwab", "Schwab", "Robinhood"],
+    })
+
+
+def test_formatted_holdings_stay_numeric_with_display_headers():
+    display = format_holdings(holdings_frame())
+
+    assert list(display.columns) == ["Ticker", "Quantity", "Cost Basis", "Market Value", "Day Change",
+                                     "Total Gain/Loss", "Account", "Gain/Loss %"]
+    assert set(HOLDINGS_COLUMN_CONFIG) <= set(display.columns)
+    for column in HOLDINGS_COLUMN_CONFIG:
+        assert display[column].dtype == np.float64
+    np.testing.assert_allclose(display["Gain/Loss %"], [400 / 1500 * 100, -120 / 1320 * 100, 25.0])
+    assert isinstance(display["Account"].dtype, pd.CategoricalDtype)
+
+
+def test_numeric_values_round_to_the_old_strings():
+    holdings = holdings_frame()
+    numeric, strings = format_holdings(holdings), format_holdings_strings(holdings)
+
+    assert strings["Market Value"].tolist() == [f"${value:,.2f}" for value in numeric["Market Value"]]
+    assert strings["Gain/Loss %"].tolist() == [f"{value:+.2f}%" for value in numeric["Gain/Loss %"]]
+
+
+@pytest.mark.parametrize("ascending", [True, False])
+def test_pages_concatenate_to_a_full_sort_with_missing_values_last(ascending):
+    rng = np.random.default_rng(0)
+    values = rng.integers(0, 50, 1_050).astype(float)
+    values[rng.choice(len(values), 40, replace=False)] = np.nan
+    frame = pd.DataFrame({"value": values})
+
+    index = sort_index(frame, "value")
+    pages = [page_rows(index, page, ascending, page_size=100) for page in range(1, page_count(len(frame), 100) + 1)]
+    rows = np.concatenate(pages)
+
+    assert [len(page) for page in pages] == [100] * 10 + [50]
+    assert sorted(rows) == list(range(len(frame)))
+    expected = frame["value"].sort_values(ascending=ascending, na_position="last")
+    np.testing.assert_array_equal(frame["value"].to_numpy()[rows], expected.to_numpy())
+
+
+def test_page_count_has_at_least_one_page():
+    assert [page_count(n, 100) for n in (0, 1, 100, 101)] == [1, 1, 1, 2]
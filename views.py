@@ -0,0 +1,206 @@
+import io
+import threading
+import time
+from collections import OrderedDict
+
+import numpy as np
+import pandas as pd
+import pyarrow as pa
+import streamlit as st
+
+DEFAULT_MAX_ENTRIES = 256
+DEFAULT_PAGE_SIZE = 100
+
+DISPLAY_COLUMNS = {
+    "ticker": "Ticker",
+    "quantity": "Quantity",
+    "cost_basis": "Cost Basis",
+    "market_value": "Market Value",
+    "day_change_pct": "Day Change",
+    "total_gain_loss": "Total Gain/Loss",
+    "gain_loss_pct": "Gain/Loss %",
+    "account": "Account",
+}
+
+# Currency and percent formats applied by the grid, so columns stay numeric
+# (printf-style, as understood by the pinned Streamlit release)
+HOLDINGS_COLUMN_CONFIG = {
+    "Quantity": st.column_config.NumberColumn(format="%g"),
+    "Cost Basis": st.column_config.NumberColumn(format="$%.2f"),
+    "Market Value": st.column_config.NumberColumn(format="$%.2f"),
+    "Day Change": st.column_config.NumberColumn(format="%+.2f%%"),
+    "Total Gain/Loss": st.column_config.NumberColumn(format="$%+.2f"),
+    "Gain/Loss %": st.column_config.NumberColumn(format="%+.2f%%"),
+}
+
+
+# Holdings sorted by market value, largest first
+def sorted_holdings(holdings):
+    return pd.DataFrame(holdings).sort_values(by="market_value", ascending=False)
+
+
+# Boolean row mask of holdings matching the search term. With a search index
+# keyed by ("ticker", symbol) and ("account", name), the term matches ticker,
+# company name or account; otherwise it is a ticker substring.
+def search_mask(holdings, search_term, search_index=None):
+    if search_index is None:
+        return holdings["ticker"].str.contains(search_term, case=False, regex=False).to_numpy()
+    matches = search_index.search(search_term)
+    mask = holdings["ticker"].isin([value for kind, value in matches if kind == "ticker"])
+    if "account" in holdings.columns:
+        mask |= holdings["account"].isin([value for kind, value in matches if kind == "account"])
+    return mask.to_numpy()
+
+
+# Holdings table with a gain/loss % column and display headers. Values stay
+# float64; render it with column_config=HOLDINGS_COLUMN_CONFIG.
+def format_holdings(holdings):
+    display_df = holdings.assign(
+        gain_loss_pct=holdings["total_gain_loss"] / (holdings["market_value"] - holdings["total_gain_loss"]) * 100
+    )
+    # Account names repeat on every row; a categorical ships them once as an Arrow dictionary
+    if "account" in display_df.columns:
+        display_df["account"] = display_df["account"].astype("category")
+    return display_df.rename(columns=DISPLAY_COLUMNS)
+
+
+# Per-cell string formatting as done before column configs, kept for benchmarking
+def format_holdings_strings(holdings):
+    display_df = holdings.copy()
+    display_df["gain_loss_pct"] = (display_df["total_gain_loss"] / (display_df["market_value"] - display_df["total_gain_loss"])) * 100
+
+    display_df["cost_basis"] = display_df["cost_basis"].map("${:,.2f}".format)
+    display_df["market_value"] = display_df["market_value"].map("${:,.2f}".format)
+    display_df["day_change_pct"] = display_df["day_change_pct"].map("{:+.2f}%".format)
+    display_df["total_gain_loss"] = display_df["total_gain_loss"].map("${:+,.2f}".format)
+    display_df["gain_loss_pct"] = display_df["gain_loss_pct"].map("{:+.2f}%".format)
+
+    return display_df.rename(columns=DISPLAY_COLUMNS)
+
+
+# Row order of a frame sorted by one column, as (ordered rows with a value,
+# rows without one). Computed once per column and reused for every page and
+# for both directions; missing values stay last either way.
+def sort_index(frame, column):
+    values = frame[column]
+    missing = values.isna().to_numpy()
+    present = np.flatnonzero(~missing)
+    order = present[np.argsort(values.to_numpy()[present], kind="stable")]
+    return order, np.flatnonzero(missing)
+
+
+def page_count(n_rows, page_size=DEFAULT_PAGE_SIZE):
+    return max(-(-n_rows // page_size), 1)
+
+
+# Positional rows of one page (numbered from 1) under a precomputed sort index
+def page_rows(index, page, ascending=True, page_size=DEFAULT_PAGE_SIZE):
+    order, missing = index
+    start = (page - 1) * page_size
+    stop = start + page_size
+    ordered = order if ascending else order[::-1]
+    if stop <= len(ordered):
+        return ordered[start:stop]
+    return np.concatenate([ordered, missing])[start:stop]
+
+
+# Derived frames memoized by (portfolio id, data version, view, account,
+# filters) and shared by every session. Keys embed the data version, so a
+# new portfolio or price snapshot simply misses and stale views age out of
+# the LRU. Cached frames are shared and must be treated as read-only.
+class ViewCache:
+    def __init__(self, max_entries=DEFAULT_MAX_ENTRIES):
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+        self.hits = 0
+        self.misses = 0
+
+    def get(self, key, build):
+        with self._lock:
+            if key in self._entries:
+                self._entries.move_to_end(key)
+                self.hits += 1
+                return self._entries[key]
+            self.misses += 1
+
+        # Build outside the lock so other views are not blocked meanwhile
+        value = build()
+        with self._lock:
+            self._entries[key] = value
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+        return value
+
+    def invalidate(self, portfolio_id=None):
+        with self._lock:
+            if portfolio_id is None:
+                self._entries.clear()
+            else:
+                for key in [key for key in self._entries if key[0] == portfolio_id]:
+                    del self._entries[key]
+
+    def stats(self):
+        with self._lock:
+            return {"entries": len(self._entries), "hits": self.hits, "misses": self.misses}
+
+
+# Size of a frame as the Arrow IPC stream st.dataframe sends to the browser
+def serialized_size(frame):
+    table = pa.Table.from_pandas(frame)
+    sink = io.BytesIO()
+    with pa.ipc.new_stream(sink, table.schema) as writer:
+        writer.write_table(table)
+    return sink.tell()
+
+
+def benchmark(n_holdings=20_000, n_sessions=30):
+    rng = np.random.default_rng(0)
+    market_value = rng.uniform(100, 10_000, n_holdings)
+    total_gain_loss = market_value * rng.uniform(-0.3, 0.3, n_holdings)
+    holdings = pd.DataFrame({
+        "ticker": [f"T{i:04d}" for i in range(n_holdings)],
+        "quantity": rng.integers(1, 500, n_holdings).astype(float),
+        "cost_basis": market_value - total_gain_loss,
+        "market_value": market_value,
+        "day_change_pct": rng.normal(0, 1.5, n_holdings),
+        "total_gain_loss": total_gain_loss,
+        "account": rng.choice(["Schwab", "Interactive Brokers", "Robinhood"], n_holdings),
+    })
+
+    start = time.perf_counter()
+    strings = format_holdings_strings(holdings)
+    string_time = time.perf_counter() - start
+    start = time.perf_counter()
+    numeric = format_holdings(holdings)
+    numeric_time = time.perf_counter() - start
+    print(f"{n_holdings:,} holdings: string formatting {string_time * 1000:.1f} ms, "
+          f"{serialized_size(strings) / 1024:,.0f} KB serialized | numeric + column config "
+          f"{numeric_time * 1000:.1f} ms, {serialized_size(numeric) / 1024:,.0f} KB serialized")
+
+    start = time.perf_counter()
+    for _ in range(n_sessions):
+        format_holdings(sorted_holdings(holdings))
+    uncached = time.perf_counter() - start
+
+    cache = ViewCache()
+    start = time.perf_counter()
+    for _ in range(n_sessions):
+        cache.get(("bench", 1, "dashboard", "Combined"), lambda: format_holdings(sorted_holdings(holdings)))
+    cached = time.perf_counter() - start
+
+    print(f"{n_holdings:,} holdings x {n_sessions} reruns: rebuilt every time {uncached * 1000:.0f} ms | "
+          f"shared cache {cached * 1000:.0f} ms ({cache.stats()})")
+
+    index = sort_index(numeric, "Market Value")
+    start = time.perf_counter()
+    for page in range(1, n_sessions + 1):
+        visible = numeric.iloc[page_rows(index, page, ascending=False)]
+    paged = (time.perf_counter() - start) / n_sessions
+    print(f"{n_holdings:,} holdings: one page from the cached sort index {paged * 1000:.2f} ms, "
+          f"{serialized_size(visible) / 1024:,.0f} KB serialized vs {serialized_size(numeric) / 1024:,.0f} KB for all rows")
+
+
+if __name__ == "__main__":
+    benchmark()